@@ -0,0 +1,120 @@
+"""Answer cache for Playbook Q&A (M5).
+
+Recruiters ask the same handful of questions (EP thresholds, CPF rates) over
+and over. Answers are keyed on the normalised question, a hash of the
+retrieved context and the compiled Playbook version, so a repeat question is
+answered from SQLite without an LLM call. When query embeddings are available
+a near-duplicate phrasing of a cached question is also served.
+"""
+
+import hashlib
+import logging
+import math
+import re
+from array import array
+from datetime import datetime
+
+from db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Cosine similarity at or above which two questions are treated as the same
+SIMILARITY_THRESHOLD = 0.95
+
+_TRAILING_PUNCT_RE = re.compile(r"[\s?？!！。.]+$")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return _TRAILING_PUNCT_RE.sub("", " ".join(question.lower().split()))
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class AnswerCache:
+    def __init__(self, embeddings=None, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        # embeddings: optional object with embed_query(); None disables near-duplicate matching
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+
+    def _key(self, question: str, context_docs: str, playbook_version: str) -> str:
+        return _hash(f"{normalize_question(question)}\0{_hash(context_docs)}\0{playbook_version}")
+
+    def _embed(self, question: str) -> list[float] | None:
+        if self.embeddings is None:
+            return None
+        try:
+            return self.embeddings.embed_query(normalize_question(question))
+        except Exception:
+            logger.warning("Query embedding failed — answer cache limited to exact matches", exc_info=True)
+            return None
+
+    def get(self, question: str, context_docs: str, playbook_version: str) -> str | None:
+        """Return a cached answer for this question, or None on a miss."""
+        conn = get_db()
+        key = self._key(question, context_docs, playbook_version)
+        row = conn.execute("SELECT answer FROM answer_cache WHERE cache_key = ?", (key,)).fetchone()
+        if row is None:
+            key, answer = self._nearest(question, playbook_version)
+            if answer is None:
+                return None
+        else:
+            answer = row[0]
+        conn.execute("UPDATE answer_cache SET hits = hits + 1 WHERE cache_key = ?", (key,))
+        conn.commit()
+        return answer
+
+    def _nearest(self, question: str, playbook_version: str) -> tuple[str | None, str | None]:
+        query_vec = self._embed(question)
+        if query_vec is None:
+            return None, None
+        rows = get_db().execute(
+            "SELECT cache_key, answer, query_vector FROM answer_cache "
+            "WHERE playbook_version = ? AND query_vector IS NOT NULL",
+            (playbook_version,),
+        ).fetchall()
+        best_key, best_answer, best_sim = None, None, self.similarity_threshold
+        for key, answer, blob in rows:
+            vec = array("f")
+            vec.frombytes(blob)
+            sim = _cosine(query_vec, vec.tolist())
+            if sim >= best_sim:
+                best_key, best_answer, best_sim = key, answer, sim
+        return best_key, best_answer
+
+    def put(self, question: str, context_docs: str, playbook_version: str, answer: str) -> None:
+        vec = self._embed(question)
+        conn = get_db()
+        conn.execute(
+            "INSERT OR REPLACE INTO answer_cache "
+            "(cache_key, question, context_hash, playbook_version, answer, query_vector, hits, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+            (
+                self._key(question, context_docs, playbook_version),
+                normalize_question(question),
+                _hash(context_docs),
+                playbook_version,
+                answer,
+                array("f", vec).tobytes() if vec else None,
+                datetime.now().strftime("%Y-%m-%d %H:%M"),
+            ),
+        )
+        conn.commit()
+
+    def invalidate(self, keep_version: str | None = None) -> int:
+        """Drop answers from other Playbook versions (all answers if keep_version is None)."""
+        conn = get_db()
+        if keep_version is None:
+            cur = conn.execute("DELETE FROM answer_cache")
+        else:
+            cur = conn.execute("DELETE FROM answer_cache WHERE playbook_version != ?", (keep_version,))
+        conn.commit()
+        return cur.rowcount
@@ -89,6 +89,8 @@ def _emb_cache_key():
     return (
         os.environ.get("EMBEDDING_API_KEY", ""),
         os.environ.get("EMBEDDING_API_BASE", ""),
+        os.environ.get("EMBEDDING_BACKEND", ""),
+        os.environ.get("LOCAL_EMBEDDING_MODEL", ""),
     )
 
 
@@ -98,12 +100,63 @@ def get_agent(_key=None):
     return RecruitmentAgent()
 
 
-@st.cache_resource
+# Keyed by Playbook version too, so a refresh by run_knowledge_refresh.py (another
+# process) is picked up from the persisted index without restarting the app
+@st.cache_resource(max_entries=2)
 def get_rag_system(_key=None):
     from document_parser import RAGSystem
     return RAGSystem()
 
 
+@st.cache_resource
+def get_job_worker():
+    """Start the background job worker threads once per server process.
+
+    Also registers the hook that queues a targeted sourcing run when an HC is approved.
+    """
+    from hc_manager import register_approval_hook
+    from job_queue import JobWorker, enqueue_targeted_sourcing
+    from recruitment_agent import RecruitmentAgent
+    register_approval_hook(enqueue_targeted_sourcing)
+    return JobWorker(agent_factory=RecruitmentAgent).start()
+
+
+# ---------------------------------------------------------------------------
+# Shared helper: background job progress
+# ---------------------------------------------------------------------------
+JOB_STATUS_LABELS = {
+    "queued": bi("⏳ Queued", "⏳ 排队中"),
+    "running": bi("⚙️ Running", "⚙️ 运行中"),
+    "completed": bi("✅ Completed", "✅ 已完成"),
+    "failed": bi("❌ Failed", "❌ 失败"),
+    "cancelled": bi("🚫 Cancelled", "🚫 已取消"),
+}
+
+
+@st.fragment(run_every=2)
+def job_progress_panel(job_id: str) -> None:
+    """Live progress + cancel button for an active job; reruns the page when it finishes."""
+    from job_queue import FINISHED_STATUSES, JobQueue
+
+    queue = JobQueue()
+    job = queue.get(job_id)
+    if job is None:
+        return
+    if job["status"] in FINISHED_STATUSES:
+        st.rerun()
+    st.progress(job["progress"] or 0.0,
+                text=f"{JOB_STATUS_LABELS.get(job['status'], job['status'])} · {job.get('message') or ''}")
+    if st.button(bi("Cancel", "取消"), key=f"cancel_{job_id}", disabled=bool(job["cancel_requested"])):
+        queue.cancel(job_id)
+
+
+def stream_failed(stream, result: str | None) -> bool:
+    """True if a streamed generation was refused or broke (``stream.failed``, set by
+    the agent's TextStream), or produced nothing. The generated text itself is never inspected.
+    """
+    return bool(getattr(stream, "failed", False)) or not result or not str(result).strip()
+
+
 # ---------------------------------------------------------------------------
 # Shared helper: load latest JD
 # ---------------------------------------------------------------------------
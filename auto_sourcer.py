@@ -2,17 +2,28 @@
 
 Scans the talent pool against all approved HCs, scores candidates using the M3
 evaluation rubric, and produces shortlists. Supports full and incremental runs.
+
+Incremental runs are driven by per-(HC, talent) watermarks: a pair is scored
+again only if it was never scored, or the resume text, the HC's JD, the
+RUBRIC_VERSION or the scoring model changed since its last evaluation.
 """
 
+import hashlib
+import heapq
+import itertools
 import logging
 import re
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import date, datetime, timedelta
 
 from db import get_db
 from hc_manager import HCManager
+from job_queue import JobCancelled
+from keyword_index import BM25Index, tokenize
+from sourcing_budget import RunBudget, estimate_request
 from talent_pool_manager import TalentPoolManager
 from candidate_manager import CandidateManager
 
@@ -24,6 +35,38 @@ FREEZE_DAYS = 180
 PASS_THRESHOLD = 60
 # Max parallel LLM evaluation workers
 MAX_WORKERS = 5
+# Resumes at or under this many characters are scored several per request
+BATCH_RESUME_MAX_CHARS = 6000
+# Resumes per batch-scoring request (1 disables batch scoring)
+BATCH_SCORING_SIZE = 5
+# Fast-model scores within this many points of PASS_THRESHOLD are re-scored by the strong model
+CASCADE_BAND = 10
+# Bump when RESUME_RUBRIC or score parsing changes, so incremental runs re-score every pair
+RUBRIC_VERSION = "2"
+# Targeted runs score at most this many of the best keyword-matching talents per HC
+TARGETED_MAX_TALENTS = 300
+# Evaluation priority = urgency rank (1-3) + age bonus + pre-score bonus; highest first
+URGENCY_RANKS = {"critical": 3, "urgent": 3, "high": 3, "normal": 2, "medium": 2, "low": 1}
+# An HC open this many days gets the full AGE_WEIGHT bonus
+AGE_HORIZON_DAYS = 60
+AGE_WEIGHT = 0.5
+# Weight of the keyword pre-score (0-1, relative to the HC's best match): a strong match
+# for a Normal HC outranks a non-match for a Critical one, but not across two urgency levels
+PRESCORE_WEIGHT = 1.5
+
+
+def resume_text(talent: dict) -> str:
+    """The text sent for scoring: the preprocessed resume, or the raw parse for old rows."""
+    return talent.get("compact_text") or talent.get("parsed_text") or ""
+
+
+def is_qualified(score: float, verdict: str) -> bool:
+    """Shortlist-worthy: at or above PASS_THRESHOLD and not disqualified (e.g. by a deal breaker)."""
+    return score >= PASS_THRESHOLD and verdict != "Disqualified"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
 
 
 class AutoSourcer:
@@ -41,12 +84,32 @@ class AutoSourcer:
     # Main entry point
     # ------------------------------------------------------------------
 
-    def run(self, force_full: bool = False) -> str:
-        """Execute an auto-sourcing run. Returns the run_id."""
+    def run(self, force_full: bool = False,
+            progress: Callable[[float, str], None] | None = None,
+            hc_ids: list[str] | None = None,
+            max_duration: float | None = None, max_calls: int | None = None,
+            max_tokens: int | None = None, max_cost: float | None = None) -> str:
+        """Execute an auto-sourcing run. Returns the run_id.
+
+        Evaluations are dispatched from one priority queue across all HCs:
+        urgent and long-open HCs and the candidates with the best keyword
+        pre-score go first. ``max_duration`` (seconds), ``max_calls`` (scoring
+        requests), ``max_tokens`` and ``max_cost`` (USD, see sourcing_budget)
+        bound the run; when a limit stops it with work left, the run ends with
+        status 'partial' and keeps what was scored. Spend is recorded on the
+        sourcing_runs row. If ``progress`` raises JobCancelled, requests in
+        flight still land, the run ends 'cancelled' with its shortlist kept,
+        and the cancellation is re-raised.
+
+        ``progress(fraction, message)`` is called before each request is dispatched.
+        ``hc_ids`` makes a targeted run: the whole pool is scored against only
+        those approved HCs, prefiltered and ordered by keyword overlap.
+        Every run except a full one skips pairs whose watermark is current.
+        """
         conn = self._conn()
         run_id = f"run_{uuid.uuid4().hex[:12]}"
-        is_incremental = (not force_full) and self._has_previous_run()
-        run_type = "incremental" if is_incremental else "full"
+        is_incremental = not hc_ids and (not force_full) and self._has_previous_run()
+        run_type = "targeted" if hc_ids else "incremental" if is_incremental else "full"
         start = time.time()
 
         conn.execute(
@@ -58,51 +121,59 @@ class AutoSourcer:
 
         try:
             approved_hcs = self.hm.get_approved_requests()
+            if hc_ids:
+                approved_hcs = [hc for hc in approved_hcs if hc["id"] in hc_ids]
             if not approved_hcs:
                 self._finish_run(run_id, 0, 0, 0, time.time() - start, "completed")
                 return run_id
 
-            talents = self._get_talent_pool(is_incremental)
+            self.tpm.backfill_compact_text()
+            talents = self.tpm.get_all_talents()
             if not talents:
                 self._finish_run(run_id, len(approved_hcs), 0, 0, time.time() - start, "completed")
                 return run_id
 
-            total_matches = 0
-            total_scanned = 0
-
-            for hc in approved_hcs:
-                jd_text = self._build_jd_from_hc(hc)
-                # Filter out frozen/already-decided talents for this HC
-                eligible = [t for t in talents if not self._should_skip(t["id"], hc["id"])]
-                total_scanned += len(eligible)
-
-                if not eligible:
-                    continue
-
-                # Parallel evaluation
-                results = {}
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = {
-                        executor.submit(self._evaluate_match, jd_text, t): t
-                        for t in eligible
-                    }
-                    for future in as_completed(futures):
-                        talent = futures[future]
-                        try:
-                            score, verdict, eval_md = future.result()
-                            results[talent["id"]] = (score, verdict, eval_md)
-                        except Exception as e:
-                            logger.error("Eval failed for talent %s: %s", talent["id"], e)
-
-                # Save all evaluated results (both qualified and disqualified)
-                for talent_id, (score, verdict, eval_md) in results.items():
-                    self._save_result(run_id, hc["id"], talent_id, score, verdict, eval_md)
-                    if score >= PASS_THRESHOLD:
-                        total_matches += 1
+            work, jds = self._plan_work(approved_hcs, talents, force_full, hc_ids)
+            budget = RunBudget(max_tokens=max_tokens, max_cost=max_cost, max_calls=max_calls,
+                               strong_model=self._cascade_model())
+            estimate = self._estimate_work(work, jds, budget)
+            logger.info("Run %s: %d request(s) for %d pair(s), estimated %d tokens / $%.2f before re-scores",
+                        run_id, estimate["requests"], estimate["pairs"],
+                        estimate["prompt_tokens"] + estimate["completion_tokens"], estimate["cost_usd"])
+            conn.execute("UPDATE sourcing_runs SET estimated_cost_usd = ? WHERE id = ?",
+                         (estimate["cost_usd"], run_id))
+            conn.commit()
+            if ((max_calls is not None and estimate["requests"] > max_calls)
+                    or not budget.allows((estimate["prompt_tokens"], estimate["completion_tokens"]))):
+                logger.warning("Run %s: estimate exceeds the budget, lowest-priority work will be left "
+                               "for a later run", run_id)
+
+            deadline = start + max_duration if max_duration else None
+            listener = getattr(self.agent, "usage_listener", None)
+            hedge_guard = getattr(self.agent, "hedge_guard", None)
+            self.agent.usage_listener = budget.record_usage
+            self.agent.hedge_guard = budget.admit_hedge
+            try:
+                total_scanned, final_scores, status = self._dispatch(
+                    run_id, work, jds, {t["id"]: _text_hash(resume_text(t)) for t in talents},
+                    progress, deadline, budget,
+                )
+            finally:
+                self.agent.usage_listener = listener
+                self.agent.hedge_guard = hedge_guard
+                self._record_spend(run_id, budget.spend())
+            total_matches = sum(1 for score, verdict in final_scores.values() if is_qualified(score, verdict))
 
             duration = time.time() - start
-            self._finish_run(run_id, len(approved_hcs), total_scanned, total_matches, duration, "completed")
-
+            self._finish_run(run_id, len(approved_hcs), total_scanned, total_matches, duration, status)
+            hedger = getattr(self.agent, "hedger", None)
+            if hedger is not None:
+                logger.info("LLM hedging for run %s: %s", run_id, hedger.stats())
+            if status == "cancelled":
+                raise JobCancelled(run_id)
+
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error("Auto sourcing run failed: %s", e, exc_info=True)
             self._finish_run(run_id, 0, 0, 0, time.time() - start, "failed")
@@ -115,28 +186,44 @@ class AutoSourcer:
     # ------------------------------------------------------------------
 
     def _has_previous_run(self) -> bool:
+        """Targeted runs only cover some HCs, so they never count as a previous run."""
         conn = self._conn()
         row = conn.execute(
-            "SELECT COUNT(*) FROM sourcing_runs WHERE status = 'completed'"
+            "SELECT COUNT(*) FROM sourcing_runs WHERE status = 'completed' AND run_type != 'targeted'"
         ).fetchone()
         return row[0] > 0
 
-    def _get_last_run_date(self) -> str | None:
+    def _stale_pairs(self, hc_id: str, jd_text: str, talents: list[dict]) -> list[dict]:
+        """Talents whose evaluation against this HC is missing or out of date."""
+        rows = self._conn().execute(
+            "SELECT talent_id, resume_hash, hc_hash, rubric_version, model FROM evaluation_watermarks WHERE hc_id = ?",
+            (hc_id,),
+        ).fetchall()
+        current = {r[0]: tuple(r[1:]) for r in rows}
+        jd_hash, model = _text_hash(jd_text), self._scoring_model()
+        return [t for t in talents
+                if current.get(t["id"]) != (_text_hash(resume_text(t)), jd_hash, RUBRIC_VERSION, model)]
+
+    def _record_watermark(self, hc_id: str, talent_id: str, resume_hash: str, jd_hash: str) -> None:
         conn = self._conn()
-        row = conn.execute(
-            "SELECT run_date FROM sourcing_runs WHERE status = 'completed' ORDER BY run_date DESC LIMIT 1"
-        ).fetchone()
-        if row:
-            # run_date is "YYYY-MM-DD HH:MM", extract date part
-            return row[0][:10]
-        return None
-
-    def _get_talent_pool(self, is_incremental: bool) -> list[dict]:
-        if is_incremental:
-            since = self._get_last_run_date()
-            if since:
-                return self.tpm.get_all_talents(since_date=since)
-        return self.tpm.get_all_talents()
+        conn.execute(
+            """INSERT INTO evaluation_watermarks
+                   (hc_id, talent_id, resume_hash, hc_hash, rubric_version, model, evaluated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(hc_id, talent_id) DO UPDATE SET
+                   resume_hash = excluded.resume_hash,
+                   hc_hash = excluded.hc_hash,
+                   rubric_version = excluded.rubric_version,
+                   model = excluded.model,
+                   evaluated_at = excluded.evaluated_at""",
+            (hc_id, talent_id, resume_hash, jd_hash, RUBRIC_VERSION, self._scoring_model(),
+             datetime.now().strftime("%Y-%m-%d %H:%M")),
+        )
+        conn.commit()
+
+    def _scoring_model(self) -> str:
+        """The fast scoring model; part of every watermark."""
+        return getattr(self.agent, "model", None) or ""
 
     def _should_skip(self, talent_id: str, hc_id: str) -> bool:
         """Skip if already decided (Interested/frozen Not Interested) for this HC."""
@@ -162,9 +249,21 @@ class AutoSourcer:
                 except ValueError:
                     pass
             return False  # Freeze expired, re-evaluate
-        # disposition == "Pending" — re-evaluate with new run
+        # disposition == "Pending" — re-evaluate when its watermark is stale
         return False
 
+    def _prioritize_for_hc(self, hc: dict, talents: list[dict]) -> list[dict]:
+        """Best keyword matches for the HC first (see _prescores).
+
+        Talents sharing no term with the HC are dropped and at most
+        TARGETED_MAX_TALENTS are kept. An HC with no usable terms keeps everyone.
+        """
+        prescores = self._prescores(hc, talents)
+        if not any(prescores.values()):
+            return talents
+        ranked = sorted((t for t in talents if prescores[t["id"]] > 0), key=lambda t: -prescores[t["id"]])
+        return ranked[:TARGETED_MAX_TALENTS]
+
     def _build_jd_from_hc(self, hc: dict) -> str:
         """Build a structured JD text from HC fields for M3 scoring."""
         return f"""## Job Description — {hc.get('role_title', 'N/A')}
@@ -185,14 +284,253 @@ class AutoSourcer:
 {hc.get('selling_point', 'N/A')}
 """
 
-    def _evaluate_match(self, jd_text: str, talent: dict) -> tuple[float, str, str]:
-        """Evaluate a talent against a JD. Returns (score, verdict, evaluation_markdown)."""
-        eval_md = self.agent.evaluate_resume(jd_text, talent["parsed_text"])
+    def _plan_work(self, approved_hcs: list[dict], talents: list[dict], force_full: bool,
+                   hc_ids: list[str] | None) -> tuple[list[tuple], dict[str, tuple[str, str, str]]]:
+        """Build the priority heap of scoring requests.
+
+        Returns (heap of (-priority, seq, kind, hc_id, payload), {hc_id: (jd_text, jd_hash, title)});
+        kind is "fast" with a talent group as payload, or "strong" with one talent.
+        """
+        work: list[tuple] = []
+        jds: dict[str, tuple[str, str, str]] = {}
+        now = datetime.now()
+        for hc in approved_hcs:
+            jd_text = self._build_jd_from_hc(hc)
+            jds[hc["id"]] = (jd_text, _text_hash(jd_text), hc.get("role_title") or hc["id"])
+            # Filter out frozen/already-decided talents for this HC
+            eligible = [t for t in talents if not self._should_skip(t["id"], hc["id"])]
+            if not force_full:
+                eligible = self._stale_pairs(hc["id"], jd_text, eligible)
+            if hc_ids:
+                eligible = self._prioritize_for_hc(hc, eligible)
+            if not eligible:
+                continue
+            prescores = self._prescores(hc, eligible)
+            eligible.sort(key=lambda t: -prescores[t["id"]])
+            hc_priority = self._hc_priority(hc, now)
+            for group in self._plan_batches(eligible):
+                priority = hc_priority + PRESCORE_WEIGHT * max(prescores[t["id"]] for t in group)
+                heapq.heappush(work, (-priority, len(work), "fast", hc["id"], group))
+        return work, jds
+
+    def _request_estimate(self, item: tuple,
+                          jds: dict[str, tuple[str, str, str]]) -> tuple[tuple[int, int], str | None]:
+        """(token estimate, model) for a work item; "strong" items are priced at the strong model's rate."""
+        _neg_priority, _seq, kind, hc_id, payload = item
+        talents = payload if kind == "fast" else [payload]
+        model = self._cascade_model() if kind == "strong" else None
+        return estimate_request(jds[hc_id][0], [resume_text(t) for t in talents]), model
+
+    def _estimate_work(self, work: list[tuple], jds: dict, budget: RunBudget) -> dict:
+        prompt = completion = 0
+        cost = 0.0
+        for item in work:
+            (p, c), model = self._request_estimate(item, jds)
+            prompt, completion = prompt + p, completion + c
+            cost += budget.cost(p, c, model)
+        return {"requests": len(work), "pairs": sum(len(item[4]) for item in work),
+                "prompt_tokens": prompt, "completion_tokens": completion,
+                "cost_usd": round(cost, 4)}
+
+    def estimate(self, force_full: bool = False, hc_ids: list[str] | None = None) -> dict:
+        """Pre-run estimate of the fast-tier scoring work, from resume and JD lengths.
+
+        Returns requests, pairs, prompt_tokens, completion_tokens and cost_usd;
+        borderline strong-model re-scores come on top.
+        """
+        approved_hcs = self.hm.get_approved_requests()
+        if hc_ids:
+            approved_hcs = [hc for hc in approved_hcs if hc["id"] in hc_ids]
+        talents = self.tpm.get_all_talents() if approved_hcs else []
+        work, jds = self._plan_work(approved_hcs, talents, force_full, hc_ids)
+        return self._estimate_work(work, jds, RunBudget())
+
+    def _hc_priority(self, hc: dict, now: datetime) -> float:
+        """Urgency rank (1-3, from the HC form's 🔥 count or keywords) plus an age bonus."""
+        urgency = hc.get("urgency") or ""
+        rank = min(urgency.count("🔥"), 3) or next(
+            (r for word, r in URGENCY_RANKS.items() if word in urgency.lower()), 2)
+        try:
+            age_days = (now - datetime.strptime(hc.get("date") or "", "%Y-%m-%d")).days
+        except ValueError:
+            age_days = 0
+        return rank + AGE_WEIGHT * min(max(age_days, 0) / AGE_HORIZON_DAYS, 1.0)
+
+    def _prescores(self, hc: dict, talents: list[dict]) -> dict[str, float]:
+        """Cheap keyword pre-score per talent: BM25 against the HC, scaled so the best match is 1."""
+        query = " ".join(hc.get(field) or "" for field in ("role_title", "tech_stack", "mission"))
+        scores = dict.fromkeys((t["id"] for t in talents), 0.0)
+        if not talents or not tokenize(query):
+            return scores
+        hits = BM25Index.build([resume_text(t) for t in talents]).search(query, k=len(talents))
+        best = hits[0][1] if hits else 0.0
+        for doc_id, score in hits:
+            scores[talents[doc_id]["id"]] = score / best if best > 0 else 0.0
+        return scores
+
+    def _dispatch(self, run_id: str, work: list[tuple], jds: dict[str, tuple[str, str, str]],
+                  resume_hashes: dict[str, str], progress: Callable[[float, str], None] | None,
+                  deadline: float | None, budget: RunBudget) -> tuple[int, dict, str]:
+        """Run the queued evaluations highest priority first, saving each result as it lands.
+
+        Borderline fast scores are queued again for the strong model at the same
+        priority. Dispatching stops at the deadline, when the next request no
+        longer fits the budget, or when ``progress`` raises JobCancelled;
+        requests already in flight are still saved. Returns (pairs dispatched,
+        {(hc_id, talent_id): (final score, verdict)}, run status: 'completed',
+        'partial' when stopped by a limit, or 'cancelled').
+        """
+        strong_model = self._cascade_model()
+        total_pairs = sum(len(item[4]) for item in work) or 1
+        seq = itertools.count(len(work))
+        dispatched = 0
+        final: dict[tuple[str, str], tuple[float, str]] = {}
+        fast_scores: dict[tuple[str, str], float] = {}
+        cancelled = False
+        # Set when a batch fallback left talents unscored for lack of budget
+        left_unscored = False
+
+        def _before_deadline() -> bool:
+            return deadline is None or time.time() < deadline
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            pending = {}
+            while (work and not cancelled) or pending:
+                while work and not cancelled and len(pending) < MAX_WORKERS and _before_deadline():
+                    item = work[0]
+                    neg_priority, _seq, kind, hc_id, payload = item
+                    jd_text, _jd_hash, title = jds[hc_id]
+                    if kind == "fast" and progress:
+                        try:
+                            progress(dispatched / total_pairs, title)
+                        except JobCancelled:
+                            logger.info("Run %s cancelled, finishing %d request(s) in flight", run_id, len(pending))
+                            cancelled = True
+                            break
+                    estimate, model = self._request_estimate(item, jds)
+                    # Fallback requests on worker threads draw on the same budget, so check and start atomically
+                    if not budget.try_start(estimate, model):
+                        break
+                    heapq.heappop(work)
+                    if kind == "fast":
+                        future = executor.submit(self._evaluate_group, jd_text, payload, budget)
+                        dispatched += len(payload)
+                    else:
+                        future = executor.submit(self._evaluate_match, jd_text, payload, strong_model)
+                    pending[future] = (neg_priority, kind, hc_id, payload, estimate, model)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    neg_priority, kind, hc_id, payload, estimate, model = pending.pop(future)
+                    budget.finish(estimate, model)
+                    jd_hash = jds[hc_id][1]
+                    if kind == "fast":
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            logger.error("Eval failed for talent(s) %s: %s", [t["id"] for t in payload], e)
+                            continue
+                        by_id = {t["id"]: t for t in payload}
+                        left_unscored = left_unscored or len(results) < len(payload)
+                        for talent_id, (score, verdict, eval_md) in results.items():
+                            self._save_result(run_id, hc_id, talent_id, score, verdict, eval_md)
+                            self._record_watermark(hc_id, talent_id, resume_hashes[talent_id], jd_hash)
+                            fast_scores[(hc_id, talent_id)] = score
+                            final[(hc_id, talent_id)] = (score, verdict)
+                            if strong_model and abs(score - PASS_THRESHOLD) <= CASCADE_BAND:
+                                heapq.heappush(work, (neg_priority, next(seq), "strong", hc_id, by_id[talent_id]))
+                    else:
+                        talent_id = payload["id"]
+                        try:
+                            score, verdict, eval_md = future.result()
+                        except Exception as e:
+                            # Keep the fast-tier result rather than dropping the talent
+                            logger.warning("Strong re-score failed for talent %s: %s", talent_id, e)
+                            continue
+                        self._save_result(run_id, hc_id, talent_id, score, verdict, eval_md,
+                                          fast_score=fast_scores[(hc_id, talent_id)], strong_score=score)
+                        final[(hc_id, talent_id)] = (score, verdict)
+
+        if cancelled:
+            return dispatched, final, "cancelled"
+        if work or left_unscored:
+            logger.info("Run %s stopped by its limits with %d request(s) left (%d calls made)",
+                        run_id, len(work), budget.calls)
+            return dispatched, final, "partial"
+        return dispatched, final, "completed"
+
+    def _cascade_model(self) -> str | None:
+        """The strong model for borderline re-scoring, or None if the cascade cannot apply."""
+        strong = getattr(self.agent, "strong_model", None)
+        if CASCADE_BAND < 0 or not strong or strong == getattr(self.agent, "model", None):
+            return None
+        if not hasattr(self.agent, "evaluate_resume_structured"):
+            return None
+        return strong
+
+    def _evaluate_match(self, jd_text: str, talent: dict, model: str | None = None) -> tuple[float, str, str]:
+        """Evaluate a talent against a JD. Returns (score, verdict, evaluation_markdown).
+
+        Uses structured JSON scoring when the agent supports it; a response that
+        fails validation raises instead of being recorded as a silent 0.
+        ``model`` overrides the agent's fast model (structured scoring only).
+        """
+        if hasattr(self.agent, "evaluate_resume_structured"):
+            if model:
+                result = self.agent.evaluate_resume_structured(jd_text, resume_text(talent), model=model)
+            else:
+                result = self.agent.evaluate_resume_structured(jd_text, resume_text(talent))
+            return float(result.total), result.verdict, result.render_markdown()
+        # Legacy agents that only produce the Markdown report
+        eval_md = self.agent.evaluate_resume(jd_text, resume_text(talent))
         score, verdict = self._parse_score(eval_md)
         return score, verdict, eval_md
 
+    def _plan_batches(self, talents: list[dict]) -> list[list[dict]]:
+        """Group small resumes for batch scoring; every other talent becomes a group of one."""
+        if BATCH_SCORING_SIZE <= 1 or not hasattr(self.agent, "evaluate_resumes_batch"):
+            return [[t] for t in talents]
+        small = [t for t in talents if len(resume_text(t)) <= BATCH_RESUME_MAX_CHARS]
+        large = [t for t in talents if len(resume_text(t)) > BATCH_RESUME_MAX_CHARS]
+        return [small[i:i + BATCH_SCORING_SIZE] for i in range(0, len(small), BATCH_SCORING_SIZE)] + [[t] for t in large]
+
+    def _evaluate_group(self, jd_text: str, talents: list[dict],
+                        budget: RunBudget | None = None) -> dict[str, tuple[float, str, str]]:
+        """Score a group in one batch request; any candidate missing from a valid response,
+        or all of them if the response fails validation, falls back to single evaluation.
+
+        The group's own request is charged by the dispatcher; each fallback request is
+        charged to ``budget`` here, and talents it no longer fits are left unscored.
+        """
+        if len(talents) == 1:
+            return {talents[0]["id"]: self._evaluate_match(jd_text, talents[0])}
+        try:
+            scores = self.agent.evaluate_resumes_batch(
+                jd_text, {t["id"]: resume_text(t) for t in talents}
+            )
+        except Exception as e:
+            logger.warning("Batch scoring failed for %d talents, falling back to single: %s", len(talents), e)
+            scores = {}
+        results = {}
+        for t in talents:
+            s = scores.get(t["id"])
+            if s is not None:
+                results[t["id"]] = (float(s.total), s.verdict, s.render_markdown())
+                continue
+            estimate = estimate_request(jd_text, [resume_text(t)])
+            if budget is not None and not budget.try_start(estimate):
+                logger.info("Budget exhausted, leaving talent %s for a later run", t["id"])
+                continue
+            try:
+                results[t["id"]] = self._evaluate_match(jd_text, t)
+            finally:
+                if budget is not None:
+                    budget.finish(estimate)
+        return results
+
     def _parse_score(self, evaluation_md: str) -> tuple[float, str]:
-        """Extract numeric score and verdict from M3 evaluation markdown."""
+        """Extract numeric score and verdict from M3 evaluation markdown (legacy agents only)."""
         score = 0.0
         verdict = "Disqualified"
 
@@ -201,9 +539,12 @@ class AutoSourcer:
         if score_match:
             score = float(score_match.group(1))
 
-        # Match verdict
+        # A violated deal breaker disqualifies regardless of the total or stated verdict
+        deal_breaker_match = re.search(r"Deal Breaker Avoidance[*]*:\s*(\d+)\s*/\s*20", evaluation_md)
         verdict_match = re.search(r"Verdict[*]*:\s*(Strong Match|Borderline Pass|Disqualified)", evaluation_md)
-        if verdict_match:
+        if deal_breaker_match and int(deal_breaker_match.group(1)) == 0:
+            verdict = "Disqualified"
+        elif verdict_match:
             verdict = verdict_match.group(1)
         elif score >= 80:
             verdict = "Strong Match"
@@ -213,23 +554,45 @@ class AutoSourcer:
         return score, verdict
 
     def _save_result(self, run_id: str, hc_id: str, talent_id: str,
-                     score: float, verdict: str, eval_md: str) -> None:
-        """UPSERT shortlist entry — update score if HC+talent combo exists."""
+                     score: float, verdict: str, eval_md: str,
+                     fast_score: float | None = None, strong_score: float | None = None) -> None:
+        """UPSERT shortlist entry — update score if HC+talent combo exists.
+
+        ``score`` is the final score; fast_score / strong_score record the cascade tiers.
+        """
         conn = self._conn()
         sl_id = f"sl_{uuid.uuid4().hex[:12]}"
+        if fast_score is None:
+            fast_score = score
         conn.execute(
-            """INSERT INTO shortlist (id, run_id, hc_id, talent_id, score, verdict, evaluation_md, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """INSERT INTO shortlist (id, run_id, hc_id, talent_id, score, verdict, evaluation_md, created_at,
+                                      fast_score, strong_score)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                ON CONFLICT(hc_id, talent_id) DO UPDATE SET
                    run_id = excluded.run_id,
                    score = excluded.score,
                    verdict = excluded.verdict,
                    evaluation_md = excluded.evaluation_md,
-                   created_at = excluded.created_at
+                   created_at = excluded.created_at,
+                   fast_score = excluded.fast_score,
+                   strong_score = excluded.strong_score
                    WHERE shortlist.disposition = 'Pending'""",
-            (sl_id, run_id, hc_id, talent_id, score, verdict, eval_md, datetime.now().strftime("%Y-%m-%d %H:%M")),
+            (sl_id, run_id, hc_id, talent_id, score, verdict, eval_md, datetime.now().strftime("%Y-%m-%d %H:%M"),
+             fast_score, strong_score),
+        )
+        conn.commit()
+
+    def _record_spend(self, run_id: str, spend: dict) -> None:
+        """Store a run's LLM calls, tokens and cost (reported usage, else estimates)."""
+        conn = self._conn()
+        conn.execute(
+            "UPDATE sourcing_runs SET llm_calls=?, prompt_tokens=?, completion_tokens=?, cost_usd=? WHERE id=?",
+            (spend["llm_calls"], spend["prompt_tokens"], spend["completion_tokens"], spend["cost_usd"], run_id),
         )
         conn.commit()
+        logger.info("Run %s spend: %d calls, %d+%d tokens, $%.4f%s", run_id, spend["llm_calls"],
+                    spend["prompt_tokens"], spend["completion_tokens"], spend["cost_usd"],
+                    " (estimated)" if spend["spend_estimated"] else "")
 
     def _finish_run(self, run_id: str, hc_count: int, scanned: int,
                     matches: int, duration: float, status: str) -> None:
@@ -256,7 +619,8 @@ class AutoSourcer:
                       disposition: str | None = None, qualified: str | None = None) -> list[dict]:
         """Query shortlist with optional filters. Joins talent_pool for candidate info.
 
-        qualified: "qualified" (score >= PASS_THRESHOLD), "disqualified" (< PASS_THRESHOLD), or None (all).
+        qualified: "qualified" (score >= PASS_THRESHOLD and verdict not "Disqualified"),
+        "disqualified" (the rest), or None (all).
         """
         conn = self._conn()
         sql = """
@@ -279,10 +643,10 @@ class AutoSourcer:
             sql += " AND s.disposition = ?"
             params.append(disposition)
         if qualified == "qualified":
-            sql += " AND s.score >= ?"
+            sql += " AND s.score >= ? AND s.verdict != 'Disqualified'"
             params.append(PASS_THRESHOLD)
         elif qualified == "disqualified":
-            sql += " AND s.score < ?"
+            sql += " AND (s.score < ? OR s.verdict = 'Disqualified')"
             params.append(PASS_THRESHOLD)
         sql += " ORDER BY s.score DESC"
         rows = conn.execute(sql, params).fetchall()
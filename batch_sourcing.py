@@ -0,0 +1,247 @@
+"""Offline batch-API mode for large auto-sourcing runs.
+
+Every pending (HC, talent) structured-scoring request is written to a JSONL
+file in the OpenAI batch input format, submitted to a batch endpoint, polled
+until it finishes, and the results are ingested into ``shortlist`` exactly as
+a synchronous run would store them. Latency goes up (the provider has up to
+24h), cost goes down and no interactive rate limit is consumed.
+
+Backends:
+- ``OpenAIBatchBackend``: the OpenAI-compatible ``/v1/files`` + ``/v1/batches`` API.
+- ``LocalBatchBackend``: file-based stand-in that answers each line with a
+  callable and writes an output JSONL — used by tests, and by gateways that
+  have no batch endpoint.
+"""
+
+import heapq
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+
+from auto_sourcer import AutoSourcer, _text_hash, is_qualified, resume_text
+from recruitment_agent import parse_resume_score
+
+logger = logging.getLogger(__name__)
+
+BATCH_DIR = "data/batches"
+# Seconds between batch status polls
+BATCH_POLL_INTERVAL = 60
+BATCH_COMPLETION_WINDOW = "24h"
+# Terminal batch states in the OpenAI batch API
+_FAILED_STATES = ("failed", "expired", "cancelled")
+
+
+class OpenAIBatchBackend:
+    """Submit and collect batches through an OpenAI-compatible client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> list[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return []
+        content = self.client.files.content(batch.output_file_id).text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+class LocalBatchBackend:
+    """File-based stand-in for a batch endpoint.
+
+    ``complete`` receives one request body (model/messages/temperature) and
+    returns a chat-completion response body as a dict. Submitting processes
+    the whole input file synchronously and writes ``<batch_id>_output.jsonl``.
+    """
+
+    def __init__(self, complete: Callable[[dict], dict], workdir: str = BATCH_DIR):
+        self.complete = complete
+        self.workdir = workdir
+
+    def _output_path(self, batch_id: str) -> str:
+        return os.path.join(self.workdir, f"{batch_id}_output.jsonl")
+
+    def submit(self, input_path: str) -> str:
+        batch_id = f"localbatch_{uuid.uuid4().hex[:12]}"
+        os.makedirs(self.workdir, exist_ok=True)
+        with open(input_path, "r", encoding="utf-8") as src, \
+                open(self._output_path(batch_id), "w", encoding="utf-8") as out:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                try:
+                    record = {"custom_id": request["custom_id"], "error": None,
+                              "response": {"status_code": 200, "body": self.complete(request["body"])}}
+                except Exception as e:
+                    record = {"custom_id": request["custom_id"], "response": None,
+                              "error": {"message": str(e)}}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if os.path.exists(self._output_path(batch_id)) else "failed"
+
+    def results(self, batch_id: str) -> list[dict]:
+        with open(self._output_path(batch_id), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class BatchSourcer:
+    """Runs an auto-sourcing pass through a batch backend instead of live chat completions."""
+
+    def __init__(self, sourcer: AutoSourcer, backend, workdir: str = BATCH_DIR):
+        self.sourcer = sourcer
+        self.agent = sourcer.agent
+        self.backend = backend
+        self.workdir = workdir
+
+    def run(self, force_full: bool = False, poll_interval: float = BATCH_POLL_INTERVAL) -> str:
+        """Build, submit, wait for and ingest a batch. Returns the run_id.
+
+        The run is 'running' while the input is prepared and becomes
+        'submitted', together with its batch_id, only once the backend accepted
+        the batch; a batch left in 'submitted' state by an interrupted process
+        is resumed instead of submitting a new one.
+        """
+        pending = self.get_pending_run()
+        if pending:
+            logger.info("Resuming batch %s for run %s", pending["batch_id"], pending["id"])
+            run_id, batch_id, start = pending["id"], pending["batch_id"], time.time()
+        else:
+            run_id, input_path, count = self.prepare(force_full)
+            start = time.time()
+            if count == 0:
+                self.sourcer._finish_run(run_id, 0, 0, 0, 0.0, "completed")
+                return run_id
+            try:
+                batch_id = self.backend.submit(input_path)
+            except Exception:
+                self.sourcer._finish_run(run_id, 0, 0, 0, time.time() - start, "failed")
+                raise
+            self._mark_submitted(run_id, batch_id)
+            logger.info("Submitted batch %s with %d requests (run %s)", batch_id, count, run_id)
+
+        status = self.wait(batch_id, poll_interval)
+        if status != "completed":
+            logger.error("Batch %s ended with status %s", batch_id, status)
+            self.sourcer._finish_run(run_id, 0, 0, 0, time.time() - start, "failed")
+            return run_id
+        self.ingest(run_id, batch_id, duration=time.time() - start)
+        return run_id
+
+    def prepare(self, force_full: bool = False) -> tuple[str, str, int]:
+        """Create the sourcing_runs row ('running') and write the batch input JSONL.
+
+        Pairs are selected by ``AutoSourcer._plan_work``, exactly as for a
+        synchronous run, one request per pair in priority order. Returns
+        (run_id, input_path, request_count); on error the run is marked 'failed'.
+        """
+        sourcer = self.sourcer
+        conn = sourcer._conn()
+        run_id = f"run_{uuid.uuid4().hex[:12]}"
+        is_incremental = (not force_full) and sourcer._has_previous_run()
+        conn.execute(
+            """INSERT INTO sourcing_runs (id, run_date, run_type, hc_count, talent_scanned, matches_found, status)
+               VALUES (?, ?, ?, 0, 0, 0, 'running')""",
+            (run_id, datetime.now().strftime("%Y-%m-%d %H:%M"),
+             "incremental" if is_incremental else "full"),
+        )
+        conn.commit()
+
+        start = time.time()
+        try:
+            os.makedirs(self.workdir, exist_ok=True)
+            input_path = os.path.join(self.workdir, f"{run_id}_input.jsonl")
+            approved_hcs = sourcer.hm.get_approved_requests()
+            sourcer.tpm.backfill_compact_text()
+            talents = sourcer.tpm.get_all_talents() if approved_hcs else []
+            work, jds = sourcer._plan_work(approved_hcs, talents, force_full, None)
+            count = 0
+            with open(input_path, "w", encoding="utf-8") as f:
+                while work:
+                    _neg_priority, _seq, _kind, hc_id, group = heapq.heappop(work)
+                    jd_text, jd_hash, _title = jds[hc_id]
+                    for t in group:
+                        # The content hashes travel with the request so ingest records the right watermark
+                        line = {
+                            "custom_id": f"{hc_id}|{t['id']}|{_text_hash(resume_text(t))}|{jd_hash}",
+                            "method": "POST",
+                            "url": "/v1/chat/completions",
+                            "body": self.agent.resume_score_request(jd_text, resume_text(t)),
+                        }
+                        f.write(json.dumps(line, ensure_ascii=False) + "\n")
+                        count += 1
+        except Exception:
+            sourcer._finish_run(run_id, 0, 0, 0, time.time() - start, "failed")
+            raise
+        return run_id, input_path, count
+
+    def wait(self, batch_id: str, poll_interval: float = BATCH_POLL_INTERVAL) -> str:
+        """Poll until the batch reaches a terminal state; returns that state."""
+        while True:
+            status = self.backend.status(batch_id)
+            if status == "completed" or status in _FAILED_STATES:
+                return status
+            logger.info("Batch %s status: %s", batch_id, status)
+            time.sleep(poll_interval)
+
+    def ingest(self, run_id: str, batch_id: str, duration: float = 0.0) -> int:
+        """Store batch results in shortlist and finish the run. Returns the match count."""
+        sourcer = self.sourcer
+        hc_ids, scanned, matches, failed = set(), 0, 0, 0
+        for record in self.backend.results(batch_id):
+            # custom_id is "hc|talent|resume_hash|jd_hash" (older batches: "hc|talent")
+            hc_id, talent_id, resume_hash, jd_hash = (record.get("custom_id", "").split("|") + ["", "", ""])[:4]
+            hc_ids.add(hc_id)
+            scanned += 1
+            try:
+                if record.get("error"):
+                    raise RuntimeError(record["error"].get("message", "batch request failed"))
+                body = record["response"]["body"]
+                result = parse_resume_score(body["choices"][0]["message"]["content"])
+            except Exception as e:
+                # Unscored pairs have no shortlist row, so the next run picks them up again
+                failed += 1
+                logger.warning("Batch result for %s unusable: %s", record.get("custom_id"), e)
+                continue
+            score = float(result.total)
+            sourcer._save_result(run_id, hc_id, talent_id, score, result.verdict, result.render_markdown())
+            if resume_hash and jd_hash:
+                sourcer._record_watermark(hc_id, talent_id, resume_hash, jd_hash)
+            if is_qualified(score, result.verdict):
+                matches += 1
+        if failed:
+            logger.warning("Batch %s: %d of %d results failed", batch_id, failed, scanned)
+        sourcer._finish_run(run_id, len(hc_ids), scanned, matches, duration, "completed")
+        return matches
+
+    def get_pending_run(self) -> dict | None:
+        row = self.sourcer._conn().execute(
+            """SELECT * FROM sourcing_runs WHERE status = 'submitted' AND batch_id IS NOT NULL
+               ORDER BY run_date DESC LIMIT 1"""
+        ).fetchone()
+        return dict(row) if row else None
+
+    def _mark_submitted(self, run_id: str, batch_id: str) -> None:
+        """Record a created batch: status and batch_id are written together, so a
+        'submitted' run always has a batch to resume."""
+        conn = self.sourcer._conn()
+        conn.execute("UPDATE sourcing_runs SET status = 'submitted', batch_id = ? WHERE id = ?", (batch_id, run_id))
+        conn.commit()
@@ -69,7 +69,8 @@ CREATE TABLE IF NOT EXISTS talent_pool (
     linkedin_url TEXT,
     tags TEXT,
     uploaded_at TEXT,
-    is_active INTEGER DEFAULT 1
+    is_active INTEGER DEFAULT 1,
+    compact_text TEXT
 );
 
 CREATE TABLE IF NOT EXISTS sourcing_runs (
@@ -80,7 +81,13 @@ CREATE TABLE IF NOT EXISTS sourcing_runs (
     talent_scanned INTEGER,
     matches_found INTEGER,
     duration_seconds REAL,
-    status TEXT DEFAULT 'running'
+    status TEXT DEFAULT 'running',
+    batch_id TEXT,
+    llm_calls INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cost_usd REAL,
+    estimated_cost_usd REAL
 );
 
 CREATE TABLE IF NOT EXISTS shortlist (
@@ -96,8 +103,80 @@ CREATE TABLE IF NOT EXISTS shortlist (
     disposition_date TEXT,
     candidate_id TEXT,
     created_at TEXT,
+    fast_score REAL,
+    strong_score REAL,
     UNIQUE(hc_id, talent_id)
 );
+
+CREATE TABLE IF NOT EXISTS evaluation_watermarks (
+    hc_id TEXT,
+    talent_id TEXT,
+    resume_hash TEXT,
+    hc_hash TEXT,
+    rubric_version TEXT,
+    model TEXT,
+    evaluated_at TEXT,
+    PRIMARY KEY (hc_id, talent_id)
+);
+
+CREATE TABLE IF NOT EXISTS answer_cache (
+    cache_key TEXT PRIMARY KEY,
+    question TEXT,
+    context_hash TEXT,
+    playbook_version TEXT,
+    answer TEXT,
+    query_vector BLOB,
+    hits INTEGER DEFAULT 0,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    cache_key TEXT PRIMARY KEY,
+    model TEXT,
+    dim INTEGER,
+    vector BLOB,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS knowledge_refresh_runs (
+    id TEXT PRIMARY KEY,
+    run_date TEXT,
+    sources_checked INTEGER,
+    refreshed INTEGER,
+    unchanged INTEGER,
+    failed INTEGER,
+    fragments_retired INTEGER,
+    chunks_added INTEGER,
+    chunks_removed INTEGER,
+    duration_seconds REAL,
+    status TEXT DEFAULT 'running'
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT,
+    params TEXT,
+    status TEXT DEFAULT 'queued',
+    progress REAL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER DEFAULT 0,
+    worker TEXT,
+    created_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    heartbeat_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS crawl_cache (
+    source_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    fetched_at TEXT,
+    checked_at TEXT
+);
 """
 
 
@@ -116,9 +195,29 @@ def get_db(db_path: str | None = None) -> sqlite3.Connection:
         return _connection
 
 
+# Columns added after a table's first release: (table, column, type).
+# CREATE TABLE IF NOT EXISTS leaves existing tables alone, so init_db adds these.
+_COLUMN_MIGRATIONS = [
+    ("shortlist", "fast_score", "REAL"),
+    ("shortlist", "strong_score", "REAL"),
+    ("sourcing_runs", "batch_id", "TEXT"),
+    ("talent_pool", "compact_text", "TEXT"),
+    ("sourcing_runs", "llm_calls", "INTEGER"),
+    ("sourcing_runs", "prompt_tokens", "INTEGER"),
+    ("sourcing_runs", "completion_tokens", "INTEGER"),
+    ("sourcing_runs", "cost_usd", "REAL"),
+    ("sourcing_runs", "estimated_cost_usd", "REAL"),
+    ("jobs", "heartbeat_at", "TEXT"),
+]
+
+
 def init_db(conn: sqlite3.Connection) -> None:
-    """Create tables if they don't exist."""
+    """Create tables if they don't exist and add any columns missing from older databases."""
     conn.executescript(_SCHEMA)
+    for table, column, col_type in _COLUMN_MIGRATIONS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
     conn.commit()
 
 
@@ -1,10 +1,18 @@
+import hashlib
+import json
 import logging
 import os
 import ssl
-import shutil
+from array import array
+from datetime import datetime
 
-import httpx
-import streamlit as st
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from db import get_db
+from http_client import get_http_client, http_timeout
+from keyword_index import BM25Index, tokenize
+from local_embeddings import LOCAL_BACKENDS, SentenceTransformerEmbeddings, get_local_embeddings
 
 # 内网自签证书：跳过 SSL 验证
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -19,20 +27,56 @@ load_dotenv(override=True)
 logger = logging.getLogger(__name__)
 
 FAISS_INDEX_PATH = "data/faiss_index"
+BM25_INDEX_PATH = "data/bm25_index.json"
+CHUNK_STORE_PATH = "data/rag_chunks.jsonl"
+# {source file: [mtime_ns, size]} of the documents the persisted indexes were built from
+SOURCE_MANIFEST_PATH = "data/rag_sources.json"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Hybrid retrieval is precise enough that Q&A needs fewer context chunks
+DEFAULT_RETRIEVAL_K = 4
+# Standard RRF damping constant (Cormack et al.): dampens the weight of top ranks
+RRF_K = 60
+# Candidates pulled from each retriever before fusion, per requested result
+HYBRID_CANDIDATES_PER_K = 4
+# MMR trade-off between relevance (1.0) and novelty (0.0)
+MMR_LAMBDA = 0.7
+# Chunks at least this lexically similar to an already selected one are dropped
+DEDUP_SIMILARITY = 0.8
 
 class RAGSystem:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
 
         emb_api_key = os.environ.get("EMBEDDING_API_KEY", "")
+        backend = os.environ.get("EMBEDDING_BACKEND", "openai").strip().lower()
 
-        if emb_api_key and "your_" not in emb_api_key:
+        if backend in LOCAL_BACKENDS:
+            # Air-gapped deployments: semantic retrieval with no network round trip
+            try:
+                local = get_local_embeddings(backend)
+                # Hashing vectors are cheaper to recompute than to look up
+                if isinstance(local, SentenceTransformerEmbeddings):
+                    local = CachedEmbeddings(local, model_name=f"st:{local.model_name}")
+                self.embeddings = local
+                self._embedding_mode = "vector"
+            except Exception:
+                logger.warning("Failed to initialize local embeddings (%s), falling back to keyword search",
+                               backend, exc_info=True)
+                self.embeddings = KeywordSearchEmbeddings()
+                self._embedding_mode = "keyword"
+        elif emb_api_key and "your_" not in emb_api_key:
             emb_api_base = os.environ.get("EMBEDDING_API_BASE", "https://api.openai.com/v1")
             try:
-                self.embeddings = OpenAIEmbeddings(
-                    model="text-embedding-3-small",
-                    openai_api_key=emb_api_key,
-                    openai_api_base=emb_api_base
+                self.embeddings = CachedEmbeddings(
+                    OpenAIEmbeddings(
+                        model=EMBEDDING_MODEL,
+                        openai_api_key=emb_api_key,
+                        openai_api_base=emb_api_base,
+                        http_client=get_http_client(verify=False),
+                        request_timeout=http_timeout(),
+                    ),
+                    model_name=EMBEDDING_MODEL,
                 )
                 self._embedding_mode = "vector"
             except Exception:
@@ -43,27 +87,132 @@ class RAGSystem:
             self.embeddings = KeywordSearchEmbeddings()
             self._embedding_mode = "keyword"
 
+        # "hybrid" fuses FAISS + BM25 results; "vector" uses FAISS only
+        self.retrieval_mode = os.environ.get("RAG_RETRIEVAL_MODE", "hybrid").strip().lower()
         self.vector_store = None
-        self.all_chunks = []
+        self.keyword_index = None
+        self._all_chunks = None
+        self._chunk_text_by_hash = None
+        # Source manifest the in-memory indexes reflect (None: not built from data_dir here)
+        self._indexed_sources = None
 
     @property
     def embedding_mode(self):
         """Returns 'vector' (real semantic search) or 'keyword' (degraded fallback)."""
         return self._embedding_mode
 
-    def load_and_index(self) -> bool:
+    @property
+    def all_chunks(self) -> list[Document]:
+        """Split chunks with source/page/hash metadata, loaded lazily from the chunk store."""
+        if self._all_chunks is None:
+            self._all_chunks = self._load_chunk_store()
+        return self._all_chunks
+
+    @all_chunks.setter
+    def all_chunks(self, chunks: list[Document]) -> None:
+        self._all_chunks = chunks
+        self._chunk_text_by_hash = None
+
+    def _chunk_text(self, chunk_hash: str) -> str:
+        if self._chunk_text_by_hash is None:
+            self._chunk_text_by_hash = {c.metadata["chunk_hash"]: c.page_content for c in self.all_chunks}
+        return self._chunk_text_by_hash.get(chunk_hash, "")
+
+    def _load_chunk_store(self) -> list[Document]:
+        if os.path.exists(CHUNK_STORE_PATH):
+            try:
+                return load_chunks(CHUNK_STORE_PATH)
+            except Exception:
+                logger.warning("Chunk store corrupt — recovering from FAISS docstore if available", exc_info=True)
+        # Older deployments have a FAISS index but no chunk store: the docstore holds every chunk
         if self.vector_store is not None:
-            return True
+            docs = getattr(self.vector_store.docstore, "_dict", {}).values()
+            chunks = _dedupe_chunks(list(docs))
+            self._save_chunk_store(chunks)
+            return chunks
+        return []
+
+    def _save_chunk_store(self, chunks: list[Document]) -> None:
+        try:
+            save_chunks(chunks, CHUNK_STORE_PATH)
+        except OSError:
+            logger.warning("Failed to persist chunk store to %s", CHUNK_STORE_PATH, exc_info=True)
+
+    def _source_manifest(self) -> dict[str, list[int]]:
+        """{file name: [mtime_ns, size]} of the PDF / Markdown sources in data_dir."""
+        if not os.path.isdir(self.data_dir):
+            return {}
+        manifest = {}
+        for filename in sorted(os.listdir(self.data_dir)):
+            if filename.endswith((".pdf", ".md")):
+                stat = os.stat(os.path.join(self.data_dir, filename))
+                manifest[filename] = [stat.st_mtime_ns, stat.st_size]
+        return manifest
+
+    def _save_source_manifest(self, manifest: dict[str, list[int]]) -> None:
+        self._indexed_sources = manifest
+        try:
+            with open(SOURCE_MANIFEST_PATH, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+        except OSError:
+            logger.warning("Failed to persist RAG source manifest to %s", SOURCE_MANIFEST_PATH, exc_info=True)
+
+    def _persisted_sources_current(self, manifest: dict[str, list[int]], refreshing: str | None) -> bool:
+        """Whether the persisted indexes were built from these sources (no manifest: unknown, rebuild).
+
+        ``refreshing`` names a source whose entry may differ because refresh_source is about to update it.
+        """
+        try:
+            with open(SOURCE_MANIFEST_PATH, encoding="utf-8") as f:
+                persisted = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return ({k: v for k, v in persisted.items() if k != refreshing}
+                == {k: v for k, v in manifest.items() if k != refreshing})
+
+    def load_and_index(self, refreshing: str | None = None) -> bool:
+        """Load the persisted indexes, or (re)build them when the sources in data_dir changed.
+
+        Added, removed or modified PDF / Markdown files are detected against the
+        source manifest saved with the indexes, on every call.
+        """
+        if self.vector_store is not None or self.keyword_index is not None:
+            if self._indexed_sources is None or self._source_manifest() == self._indexed_sources:
+                return True
+            logger.info("RAG sources in %s changed — rebuilding the index", self.data_dir)
+            self.vector_store = self.keyword_index = None
+            self.all_chunks = None
+
+        manifest = self._source_manifest()
+        current = self._persisted_sources_current(manifest, refreshing)
+        if not current:
+            logger.info("Persisted RAG index missing or out of date with %s — rebuilding", self.data_dir)
+
+        # --- Keyword mode: reuse the persisted BM25 index (chunks load lazily on first query) ---
+        if (current and self._embedding_mode == "keyword" and os.path.exists(BM25_INDEX_PATH)
+                and os.path.exists(CHUNK_STORE_PATH)):
+            try:
+                self.keyword_index = BM25Index.load(BM25_INDEX_PATH)
+                self._indexed_sources = manifest
+                return True
+            except Exception:
+                logger.warning("BM25 index corrupt or incompatible — rebuilding", exc_info=True)
 
         # --- Try loading persisted FAISS index first (skip rebuild if up-to-date) ---
-        if self._embedding_mode == "vector" and os.path.exists(FAISS_INDEX_PATH):
+        if current and self._embedding_mode == "vector" and os.path.exists(FAISS_INDEX_PATH):
             try:
-                self.vector_store = FAISS.load_local(
+                store = FAISS.load_local(
                     FAISS_INDEX_PATH,
                     self.embeddings,
                     allow_dangerous_deserialization=True
                 )
-                return True
+                # An index built by another embedding backend has a different dimension
+                if store.index.d == len(self.embeddings.embed_query("dimension probe")):
+                    self.vector_store = store
+                    self._load_keyword_index_for_vector_store()
+                    self._indexed_sources = manifest
+                    return True
+                logger.warning("FAISS index dimension does not match embedding backend — rebuilding")
             except Exception:
                 logger.warning("FAISS index corrupt or incompatible — rebuilding", exc_info=True)
 
@@ -90,14 +239,15 @@ class RAGSystem:
         if not docs:
             return False
 
-        # Larger chunks preserve complete regulatory clauses (policy text is dense)
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=150,
-            length_function=len
-        )
-        splits = text_splitter.split_documents(docs)
+        splits = _dedupe_chunks(_split_documents(docs))
         self.all_chunks = splits
+        self._save_chunk_store(splits)
+
+        # Keyword mode needs no vector store — an inverted index is all retrieval uses
+        if self._embedding_mode == "keyword":
+            self._build_keyword_index()
+            self._save_source_manifest(manifest)
+            return True
 
         if not self.embeddings:
             return False
@@ -107,50 +257,316 @@ class RAGSystem:
             # Persist to disk so subsequent loads skip the rebuild
             if self._embedding_mode == "vector":
                 self.vector_store.save_local(FAISS_INDEX_PATH)
-            return True
         except Exception:
             logger.error("Failed to build FAISS vector store", exc_info=True)
             return False
+        if self.retrieval_mode == "hybrid":
+            self._build_keyword_index()
+        self._save_source_manifest(manifest)
+        return True
+
+    def refresh_source(self, file_path: str) -> dict:
+        """Re-split one Markdown source and swap only its changed chunks into the indexes.
+
+        Chunks whose text is unchanged keep their vectors; only new chunk texts
+        are embedded. With no persisted index yet this is a full build.
+        Returns {"added": n, "removed": m, "rebuilt": bool}.
+        """
+        if self.vector_store is None and self.keyword_index is None:
+            persisted = os.path.exists(CHUNK_STORE_PATH)
+            if not self.load_and_index(refreshing=os.path.basename(file_path)):
+                return {"added": 0, "removed": 0, "rebuilt": False}
+            if not persisted:
+                return {"added": len(self.all_chunks), "removed": 0, "rebuilt": True}
+
+        source = os.path.normpath(file_path)
+        old = {c.metadata["chunk_hash"] for c in self.all_chunks
+               if os.path.normpath(c.metadata.get("source", "")) == source}
+        others = {c.metadata["chunk_hash"] for c in self.all_chunks} - old
+        fresh = []
+        if os.path.exists(file_path):
+            fresh = _dedupe_chunks(_split_documents(TextLoader(file_path, encoding="utf-8").load()))
+        fresh_hashes = {c.metadata["chunk_hash"] for c in fresh}
+        removed = old - fresh_hashes
+        added = [c for c in fresh if c.metadata["chunk_hash"] not in old | others]
+        if not removed and not added:
+            self._record_source(file_path)
+            return {"added": 0, "removed": 0, "rebuilt": False}
+
+        if self.vector_store is not None:
+            if removed:
+                ids = [doc_id for doc_id, doc in self.vector_store.docstore._dict.items()
+                       if doc.metadata.get("chunk_hash") in removed]
+                if ids:
+                    self.vector_store.delete(ids)
+            if added:
+                self.vector_store.add_documents(added)
+            self.vector_store.save_local(FAISS_INDEX_PATH)
+        self.all_chunks = [c for c in self.all_chunks if c.metadata["chunk_hash"] not in removed] + added
+        self._save_chunk_store(self.all_chunks)
+        if self.keyword_index is not None:
+            self._build_keyword_index()
+        self._record_source(file_path)
+        logger.info("RAG refresh of %s: %d chunk(s) added, %d removed", file_path, len(added), len(removed))
+        return {"added": len(added), "removed": len(removed), "rebuilt": False}
+
+    def _record_source(self, file_path: str) -> None:
+        """Update one refreshed source's manifest entry, leaving other (possibly stale) entries alone."""
+        if os.path.dirname(os.path.abspath(file_path)) != os.path.abspath(self.data_dir):
+            return
+        manifest = dict(self._indexed_sources or {})
+        current = self._source_manifest()
+        name = os.path.basename(file_path)
+        if name in current:
+            manifest[name] = current[name]
+        else:
+            manifest.pop(name, None)
+        self._save_source_manifest(manifest)
+
+    def _build_keyword_index(self) -> None:
+        """Build the BM25 index over all_chunks (keyed by chunk hash) and persist it."""
+        chunks = self.all_chunks
+        self.keyword_index = BM25Index.build(
+            [c.page_content for c in chunks],
+            keys=[c.metadata["chunk_hash"] for c in chunks],
+        )
+        try:
+            self.keyword_index.save(BM25_INDEX_PATH)
+        except OSError:
+            logger.warning("Failed to persist BM25 index to %s", BM25_INDEX_PATH, exc_info=True)
+
+    def _load_keyword_index_for_vector_store(self) -> None:
+        """Pair a loaded FAISS store with its lexical index for hybrid retrieval.
+
+        Falls back to rebuilding BM25 from the chunk store (itself recoverable
+        from the FAISS docstore), so no PDF has to be re-parsed.
+        """
+        if self.retrieval_mode != "hybrid":
+            return
+        if os.path.exists(BM25_INDEX_PATH) and os.path.exists(CHUNK_STORE_PATH):
+            try:
+                self.keyword_index = BM25Index.load(BM25_INDEX_PATH)
+                return
+            except Exception:
+                logger.warning("BM25 index corrupt or incompatible — rebuilding from chunk store", exc_info=True)
+        self._build_keyword_index()
+
+    def retrieve(self, query: str, k: int = DEFAULT_RETRIEVAL_K) -> str:
+        # Keyword fallback: BM25-ranked lookup in the inverted index
+        if self._embedding_mode == "keyword":
+            if self.keyword_index is None:
+                return ""
+            hits = self.keyword_index.search(query, k=k)
+            return "\n\n".join(self._chunk_text(self.keyword_index.keys[doc_id]) for doc_id, _ in hits)
 
-    def retrieve(self, query: str, k: int = 5) -> str:
         if not self.vector_store:
             return ""
 
-        # Keyword fallback: intercept before FAISS (pseudo-vectors are useless for similarity)
-        if isinstance(self.embeddings, KeywordSearchEmbeddings):
-            matched_docs = []
-            keywords = [
-                word for word in query.replace("?", "").replace("?", "").split()
-                if len(word) > 1
-            ]
-            for doc in self.all_chunks:
-                text = doc.page_content.lower()
-                if any(kw.lower() in text for kw in keywords):
-                    matched_docs.append(doc.page_content)
-            if matched_docs:
-                return "\n\n".join(list(dict.fromkeys(matched_docs))[:k])
-            return ""
+        if self.retrieval_mode == "hybrid" and self.keyword_index is not None:
+            return "\n\n".join(self._hybrid_retrieve(query, k))
 
         # Real vector similarity search
         results = self.vector_store.similarity_search(query, k=k)
         return "\n\n".join([doc.page_content for doc in results])
 
+    def _hybrid_retrieve(self, query: str, k: int) -> list[str]:
+        """Run FAISS and BM25, fuse with RRF, then de-duplicate with MMR.
+
+        Both searches run inline on the caller's thread: the RAGSystem is shared by
+        every Streamlit session, and BM25 is cheap next to the vector search.
+        """
+        n_candidates = k * HYBRID_CANDIDATES_PER_K
+        lexical = [
+            self._chunk_text(self.keyword_index.keys[doc_id])
+            for doc_id, _ in self.keyword_index.search(query, k=n_candidates)
+        ]
+        try:
+            semantic = [doc.page_content for doc in self.vector_store.similarity_search(query, n_candidates)]
+        except Exception:
+            logger.warning("Vector search failed — using lexical results only", exc_info=True)
+            semantic = []
+        fused = reciprocal_rank_fusion([semantic, lexical])
+        return mmr_select(fused, k)
+
+
+def _split_documents(docs: list[Document]) -> list[Document]:
+    # Larger chunks preserve complete regulatory clauses (policy text is dense)
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=150,
+        length_function=len
+    )
+    return text_splitter.split_documents(docs)
+
+
+def _chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _dedupe_chunks(chunks: list[Document]) -> list[Document]:
+    """Drop chunks with identical text and stamp each survivor with its content hash."""
+    unique = {}
+    for chunk in chunks:
+        key = _chunk_hash(chunk.page_content)
+        if key not in unique:
+            chunk.metadata["chunk_hash"] = key
+            unique[key] = chunk
+    return list(unique.values())
+
+
+def save_chunks(chunks: list[Document], path: str) -> None:
+    """Write chunks as JSON lines: hash, source, page and text."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            record = {
+                "hash": chunk.metadata.get("chunk_hash") or _chunk_hash(chunk.page_content),
+                "source": chunk.metadata.get("source", ""),
+                "page": chunk.metadata.get("page"),
+                "text": chunk.page_content,
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_chunks(path: str) -> list[Document]:
+    chunks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            metadata = {"source": record.get("source", ""), "chunk_hash": record["hash"]}
+            if record.get("page") is not None:
+                metadata["page"] = record["page"]
+            chunks.append(Document(page_content=record["text"], metadata=metadata))
+    return chunks
 
-def invalidate_rag_index():
+
+def reciprocal_rank_fusion(rankings: list[list[str]], rrf_k: int = RRF_K) -> list[tuple[str, float]]:
+    """Fuse several ranked lists of texts into one, scoring each by sum(1 / (rrf_k + rank))."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, text in enumerate(dict.fromkeys(ranking), start=1):
+            scores[text] = scores.get(text, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def mmr_select(candidates: list[tuple[str, float]], k: int, lambda_: float = MMR_LAMBDA,
+               dedup_threshold: float = DEDUP_SIMILARITY) -> list[str]:
+    """Maximal Marginal Relevance over (text, relevance) pairs using token-set similarity.
+
+    Overlapping splitter windows and the same clause appearing in several
+    documents are penalised, and near-duplicates are dropped outright, so the
+    k chunks sent to the LLM carry as little repeated text as possible.
     """
-    Call this after updating the knowledge base (Module 6 compile).
-    Deletes the persisted FAISS index so Module 5 rebuilds with fresh content,
-    and clears Streamlit's resource cache so the RAGSystem object is re-created.
+    if not candidates:
+        return []
+    top = candidates[0][1] or 1.0
+    pool = [(text, score / top, set(tokenize(text))) for text, score in candidates]
+    selected: list[tuple[str, set[str]]] = []
+    while pool and len(selected) < k:
+        best_idx, best_value = None, float("-inf")
+        for idx, (_text, rel, toks) in enumerate(pool):
+            redundancy = max((_jaccard(toks, s_toks) for _, s_toks in selected), default=0.0)
+            if redundancy >= dedup_threshold:
+                continue
+            value = lambda_ * rel - (1 - lambda_) * redundancy
+            if value > best_value:
+                best_idx, best_value = idx, value
+        if best_idx is None:
+            break
+        text, _rel, toks = pool.pop(best_idx)
+        selected.append((text, toks))
+    return [text for text, _ in selected]
+
+
+class CachedEmbeddings(Embeddings):
+    """Persistent embedding store wrapped around a real embeddings backend.
+
+    Vectors are kept in the ``embedding_cache`` table as float32 blobs keyed by
+    SHA-256 of (model name, text), so rebuilding the FAISS index only sends new
+    chunks to the API and repeated Q&A questions reuse their query embedding.
     """
-    if os.path.exists(FAISS_INDEX_PATH):
-        shutil.rmtree(FAISS_INDEX_PATH)
-    st.cache_resource.clear()
+
+    # SQLite caps bound parameters per statement; stay well below the limit
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, underlying, model_name: str):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        conn = get_db()
+        found = {}
+        for i in range(0, len(keys), self._LOOKUP_BATCH):
+            batch = keys[i:i + self._LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT cache_key, vector FROM embedding_cache WHERE cache_key IN ({placeholders})",
+                batch,
+            ).fetchall()
+            for key, blob in rows:
+                vec = array("f")
+                vec.frombytes(blob)
+                found[key] = vec.tolist()
+        return found
+
+    def _store(self, items: list[tuple[str, list[float]]]) -> None:
+        conn = get_db()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        conn.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (cache_key, model, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(key, self.model_name, len(vec), array("f", vec).tobytes(), now) for key, vec in items],
+        )
+        conn.commit()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(t) for t in texts]
+        cached = self._lookup(list(dict.fromkeys(keys)))
+
+        # Embed each distinct uncached text once, preserving input order
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            fresh = list(zip(missing.keys(), vectors))
+            self._store(fresh)
+            cached.update(fresh)
+            logger.info("Embedding cache: %d hit(s), %d new text(s) embedded", len(texts) - len(missing), len(missing))
+        return [cached[k] for k in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = self._lookup([key])
+        if key in cached:
+            self.hits += 1
+            return cached[key]
+        self.misses += 1
+        vec = self.underlying.embed_query(text)
+        self._store([(key, vec)])
+        return vec
 
 
 class KeywordSearchEmbeddings:
-    """Placeholder that lets FAISS initialise without an embedding API.
-    Actual retrieval is intercepted in RAGSystem.retrieve() and handled
-    via keyword matching instead."""
+    """Placeholder embeddings object for keyword mode (no embedding API).
+    Retrieval in that mode goes through the BM25 index instead; no FAISS
+    store is built from these zero vectors."""
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         return [[0.0] * 10 for _ in texts]
 
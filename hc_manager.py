@@ -1,10 +1,14 @@
 import json
+import logging
 import os
 import uuid
+from collections.abc import Callable
 from datetime import datetime
 
 from db import get_db
 
+logger = logging.getLogger(__name__)
+
 HC_VALID_STATUSES = {"Pending", "Approved", "Rejected"}
 
 HC_TRANSITIONS = {
@@ -13,6 +17,16 @@ HC_TRANSITIONS = {
     "Rejected": set(),   # terminal
 }
 
+# Called with the HC id after an HC moves to Approved (see register_approval_hook)
+APPROVAL_HOOKS: list[Callable[[str], None]] = []
+
+
+def register_approval_hook(fn: Callable[[str], None]) -> Callable[[str], None]:
+    """Run fn(hc_id) whenever an HC is approved. Registering the same fn twice is a no-op."""
+    if fn not in APPROVAL_HOOKS:
+        APPROVAL_HOOKS.append(fn)
+    return fn
+
 
 class HCManager:
     """
@@ -81,6 +95,13 @@ class HCManager:
             )
         conn.execute("UPDATE hc_requests SET status = ? WHERE id = ?", (new_status, req_id))
         conn.commit()
+        if new_status == "Approved":
+            for hook in APPROVAL_HOOKS:
+                try:
+                    hook(req_id)
+                except Exception:
+                    # The approval itself is already committed; a failing hook must not undo it
+                    logger.exception("HC approval hook %r failed for %s", hook, req_id)
         return True
 
     def get_all_requests(self) -> list[dict]:
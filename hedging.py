@@ -0,0 +1,157 @@
+"""Hedged requests to cut tail latency on LLM calls.
+
+If a call is still running after the recent p-th percentile latency of calls
+to the same model for the same kind of request (fast-model scoring and
+strong-model JD generation have very different latencies), a duplicate is
+fired and whichever finishes first wins. Hedges are capped at a
+fraction of all calls so the extra spend stays bounded, and the loser is not
+cancelled (a blocking HTTP call cannot be) — its result goes to ``on_discard``
+so callers can still account for the tokens it consumed. An optional
+``may_hedge`` guard (e.g. a run's spend budget) can veto each duplicate.
+
+Enabled with ``LLM_HEDGING=on``; tuned by ``HEDGE_PERCENTILE``,
+``HEDGE_MAX_RATIO`` and ``HEDGE_MIN_DELAY``.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILE = 95.0
+# At most this fraction of calls may be duplicated
+DEFAULT_MAX_RATIO = 0.05
+# Never hedge before this many seconds, however fast recent calls were
+DEFAULT_MIN_DELAY = 2.0
+# Latency samples needed before a window's percentile is trusted
+MIN_SAMPLES = 20
+# Samples kept per (model, kind) window
+LATENCY_WINDOW = 200
+DEFAULT_KIND = "default"
+
+
+class Hedger:
+    """Runs calls with an optional hedge once they exceed the latency threshold."""
+
+    def __init__(self, percentile: float = DEFAULT_PERCENTILE, max_ratio: float = DEFAULT_MAX_RATIO,
+                 min_delay: float = DEFAULT_MIN_DELAY, min_samples: int = MIN_SAMPLES,
+                 max_workers: int = 16):
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies: dict[tuple[str, str], deque[float]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "Hedger | None":
+        """Build a Hedger from HEDGE_* settings, or None unless LLM_HEDGING is on."""
+        if os.environ.get("LLM_HEDGING", "off").strip().lower() not in ("1", "on", "true"):
+            return None
+
+        def _float(name: str, default: float) -> float:
+            try:
+                return float(os.environ.get(name, default))
+            except ValueError:
+                return default
+
+        return cls(
+            percentile=_float("HEDGE_PERCENTILE", DEFAULT_PERCENTILE),
+            max_ratio=_float("HEDGE_MAX_RATIO", DEFAULT_MAX_RATIO),
+            min_delay=_float("HEDGE_MIN_DELAY", DEFAULT_MIN_DELAY),
+        )
+
+    def threshold(self, model: str = "", kind: str = DEFAULT_KIND) -> float | None:
+        """Seconds after which a (model, kind) call gets hedged, or None while its window warms up."""
+        with self._lock:
+            window = self._latencies.get((model, kind))
+            if window is None or len(window) < self.min_samples:
+                return None
+            ordered = sorted(window)
+        idx = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[idx])
+
+    def _observe(self, seconds: float, model: str = "", kind: str = DEFAULT_KIND) -> None:
+        with self._lock:
+            self._latencies.setdefault((model, kind), deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def _reserve_hedge(self, may_hedge: Callable[[], bool] | None = None) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_ratio * self.calls:
+                return False
+        if may_hedge is not None and not may_hedge():
+            return False
+        with self._lock:
+            self.hedged += 1
+        return True
+
+    def call(self, fn: Callable[[], object], on_discard: Callable[[object], None] | None = None,
+             may_hedge: Callable[[], bool] | None = None, model: str = "", kind: str = DEFAULT_KIND):
+        """Run fn, hedging it if it is slow for its (model, kind). Raises only if every attempt failed.
+
+        ``may_hedge`` is consulted right before a duplicate would be fired; False skips it.
+        """
+        with self._lock:
+            self.calls += 1
+        threshold = self.threshold(model, kind)
+        start = time.monotonic()
+        if threshold is None:
+            result = fn()
+            self._observe(time.monotonic() - start, model, kind)
+            return result
+
+        primary = self._executor.submit(fn)
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self._reserve_hedge(may_hedge):
+            result = primary.result()
+            self._observe(time.monotonic() - start, model, kind)
+            return result
+
+        logger.info("Hedging %s/%s LLM call after %.1fs (threshold p%.0f)", model, kind, threshold, self.percentile)
+        hedge = self._executor.submit(fn)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                self._observe(time.monotonic() - start, model, kind)
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                for loser in pending:
+                    loser.add_done_callback(lambda f: self._discard(f, on_discard))
+                return future.result()
+        raise error
+
+    @staticmethod
+    def _discard(future, on_discard) -> None:
+        if on_discard is None or future.exception() is not None:
+            return
+        try:
+            on_discard(future.result())
+        except Exception:
+            logger.debug("on_discard callback failed", exc_info=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls, hedged, wins = self.calls, self.hedged, self.hedge_wins
+            windows = list(self._latencies)
+        return {
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "hedge_rate": round(hedged / calls, 4) if calls else 0.0,
+            "threshold_s": {f"{model}/{kind}": self.threshold(model, kind) for model, kind in windows},
+        }
@@ -0,0 +1,162 @@
+"""Main-content extraction for harvested web pages.
+
+Policy and law-firm pages wrap a few dense sections in navigation, cookie
+banners, sidebars and "related articles". ``extract_sections`` parses with
+lxml (C parser, far faster than html.parser on large pages), drops that
+boilerplate, picks the main content container and returns (heading, text)
+sections in document order. ``select_context`` then splits sections into
+heading-prefixed chunks and keeps the ones most relevant to the chosen
+region/category (BM25) within a character budget, so long pages lose their
+noise rather than their second half.
+"""
+
+import re
+
+import lxml.html
+from lxml import etree
+
+from keyword_index import BM25Index
+
+# Characters of page text sent to the LLM per extraction
+CONTEXT_CHAR_BUDGET = 8000
+# Target chunk size; long sections are split at block boundaries
+CHUNK_CHARS = 1200
+
+_DROP_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "form",
+              "button", "select", "nav", "footer", "header", "aside")
+_HEADING_TAGS = frozenset(("h1", "h2", "h3", "h4", "h5", "h6"))
+_BLOCK_TAGS = frozenset(("p", "li", "td", "th", "dd", "dt", "pre", "blockquote", "figcaption"))
+# class/id fragments that mark page chrome rather than content
+_BOILERPLATE_RE = re.compile(
+    r"cookie|consent|banner|breadcrumb|menu|navbar|sidebar|share|social|related|"
+    r"newsletter|subscribe|comment|advert|promo|popup|modal|footer|header",
+    re.IGNORECASE,
+)
+_MAIN_XPATH = "//main | //article | //*[@role='main'] | //*[@id='content' or @id='main-content']"
+_SPACE_RE = re.compile(r"\s+")
+
+# Extra query terms per M6 category (keyed by the category's first word)
+CATEGORY_TERMS = {
+    "Official": "law act regulation amendment employment employer employee termination notice leave overtime 法规 条例",
+    "Market": "salary compensation pay benefits bonus market range allowance 薪酬 福利",
+    "Visa": "visa pass permit work eligibility salary criteria application quota 签证 工作许可",
+}
+
+
+def _clean(text: str) -> str:
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _parse(html_text: str):
+    try:
+        try:
+            return lxml.html.document_fromstring(html_text)
+        except ValueError:
+            # str input carrying an XML encoding declaration must be passed as bytes
+            return lxml.html.document_fromstring(html_text.encode("utf-8"))
+    except etree.ParserError:
+        return None
+
+
+def _strip_boilerplate(root) -> None:
+    for el in root.xpath("|".join(f"//{tag}" for tag in _DROP_TAGS)):
+        el.drop_tree()
+    page_len = len(root.text_content())
+    for el in root.xpath("//*[@class or @id]"):
+        if el.getparent() is None or el.tag in ("html", "body", "main", "article"):
+            continue
+        marker = f"{el.get('class', '')} {el.get('id', '')}"
+        # A wrapper named e.g. "has-sidebar" that holds most of the page is content, not chrome
+        if _BOILERPLATE_RE.search(marker) and len(el.text_content()) < page_len / 2:
+            el.drop_tree()
+
+
+def _main_container(root):
+    candidates = root.xpath(_MAIN_XPATH)
+    if candidates:
+        return max(candidates, key=lambda el: len(el.text_content()))
+    body = root.find("body")
+    return body if body is not None else root
+
+
+def extract_sections(html_text: str) -> list[tuple[str, str]]:
+    """Return the page's main content as (heading, text) sections in document order.
+
+    Text before the first heading gets heading "". Returns [] for empty or
+    unparseable documents.
+    """
+    root = _parse(html_text)
+    if root is None:
+        return []
+    _strip_boilerplate(root)
+    container = _main_container(root)
+
+    sections: list[tuple[str, list[str]]] = [("", [])]
+    inside_block: set = set()
+    for el in container.iter():
+        if not isinstance(el.tag, str) or el in inside_block:
+            continue
+        if el.tag in _HEADING_TAGS:
+            sections.append((_clean(el.text_content()), []))
+            inside_block.update(el.iterdescendants())
+        elif el.tag in _BLOCK_TAGS:
+            text = _clean(el.text_content())
+            if text:
+                sections[-1][1].append(text)
+            inside_block.update(el.iterdescendants())
+    result = [(heading, "\n".join(blocks)) for heading, blocks in sections if blocks]
+    if not result:
+        # Div-soup pages with no block markup: keep the container's flat text
+        text = _clean(container.text_content())
+        return [("", text)] if text else []
+    return result
+
+
+def sections_to_text(sections: list[tuple[str, str]]) -> str:
+    return "\n\n".join(f"{heading}\n{body}" if heading else body for heading, body in sections)
+
+
+def chunk_sections(sections: list[tuple[str, str]], max_chars: int = CHUNK_CHARS) -> list[str]:
+    """Split sections into chunks of at most ~max_chars, each prefixed with its heading."""
+    chunks = []
+    for heading, body in sections:
+        prefix = f"{heading}\n" if heading else ""
+        width = max(200, max_chars - len(prefix))
+        # Oversized blocks (flat-text pages, giant <pre>) are cut into width-sized pieces
+        blocks = [line[i:i + width] for line in body.split("\n") for i in range(0, len(line), width)]
+        current = ""
+        for block in blocks:
+            if current and len(prefix) + len(current) + len(block) + 1 > max_chars:
+                chunks.append(prefix + current)
+                current = ""
+            current = f"{current}\n{block}" if current else block
+        if current:
+            chunks.append(prefix + current)
+    return chunks
+
+
+def relevance_query(region: str, category: str) -> str:
+    return f"{region} {category} {CATEGORY_TERMS.get(category.split(' ')[0], '')}"
+
+
+def select_context(sections: list[tuple[str, str]], query: str,
+                   budget: int = CONTEXT_CHAR_BUDGET) -> str:
+    """Pick the chunks most relevant to query that fit the budget, in page order."""
+    chunks = chunk_sections(sections)
+    if sum(len(c) for c in chunks) + 2 * len(chunks) <= budget:
+        return "\n\n".join(chunks)
+
+    ranked = [doc_id for doc_id, _score in BM25Index.build(chunks).search(query, k=len(chunks))]
+    matched = set(ranked)
+    # Matching chunks first (best first), then the rest in page order
+    order = ranked + [i for i in range(len(chunks)) if i not in matched]
+    picked, used = [], 0
+    for i in order:
+        size = len(chunks[i]) + 2
+        if used + size > budget:
+            continue
+        picked.append(i)
+        used += size
+    if not picked:
+        return chunks[order[0]][:budget]
+    return "\n\n".join(chunks[i] for i in sorted(picked))
@@ -0,0 +1,96 @@
+"""Shared, tuned httpx clients for LLM, embedding and harvester traffic.
+
+One pooled client per TLS mode is created lazily and reused by every thread:
+- ``verify=False`` for the (often self-signed, intranet) LLM / embedding gateway
+- ``verify=True`` for public web pages fetched by the knowledge harvester
+
+Pool size, keep-alive and timeouts are configurable through the environment:
+``HTTP_MAX_CONNECTIONS``, ``HTTP_MAX_KEEPALIVE``, ``HTTP_KEEPALIVE_EXPIRY``,
+``HTTP_CONNECT_TIMEOUT``, ``HTTP_READ_TIMEOUT`` and ``HTTP2=1`` (needs ``h2``).
+"""
+
+import logging
+import os
+import threading
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Covers AutoSourcer (5 workers, up to 2 requests each when hedging) plus
+# interactive M3 bulk scoring (5 workers) running at the same time
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# Per-read timeout; long streamed generations still send a chunk well within this
+DEFAULT_READ_TIMEOUT = 120.0
+
+_clients: dict[bool, httpx.Client] = {}
+_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(_env_float("HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(_env_float("HTTP_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE)),
+        keepalive_expiry=_env_float("HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY),
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    read = _env_float("HTTP_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)
+    return httpx.Timeout(
+        connect=_env_float("HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+        read=read,
+        write=read,
+        # Waiting for a free pooled connection counts against connect time
+        pool=_env_float("HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+    )
+
+
+def _http2_enabled() -> bool:
+    if os.environ.get("HTTP2", "").strip().lower() not in ("1", "true", "on"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2=1 but the 'h2' package is not installed (pip install 'httpx[http2]'); using HTTP/1.1")
+        return False
+    return True
+
+
+def build_http_client(verify: bool = False) -> httpx.Client:
+    """Create a new pooled client from the current environment settings."""
+    return httpx.Client(
+        verify=verify,
+        limits=http_limits(),
+        timeout=http_timeout(),
+        http2=_http2_enabled(),
+        follow_redirects=True,
+    )
+
+
+def get_http_client(verify: bool = False) -> httpx.Client:
+    """Return the process-wide client for this TLS mode, creating it on first use."""
+    with _lock:
+        client = _clients.get(verify)
+        if client is None or client.is_closed:
+            client = build_http_client(verify)
+            _clients[verify] = client
+        return client
+
+
+def close_http_clients() -> None:
+    """Close and forget all shared clients (tests, or after changing HTTP_* settings)."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,416 @@
+"""Persistent background job queue for long operations.
+
+Talent import, auto-sourcing runs, bulk resume evaluation and knowledge
+compilation can take minutes; run inside the Streamlit script thread they
+block the session and die on the next rerun. Pages instead ``submit`` a job
+and poll its status; a ``JobWorker`` (daemon threads started once per server
+process) claims queued jobs from the ``jobs`` table and runs the handler
+registered for the job's kind.
+
+Handlers receive a ``JobContext`` and the job's JSON params and return a
+JSON-serialisable result. ``ctx.progress(fraction, message)`` records
+progress and raises ``JobCancelled`` once cancellation was requested, so
+long loops stop at their next progress report.
+
+Each running job carries its worker's id (host, PID and a boot id generated
+per process) and a heartbeat. A job is recovered as failed when its worker
+is an earlier process with the same host and PID (a restarted container
+reuses both), a dead process on this host, or has been silent for
+JOB_STALE_SECONDS.
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Worker threads per process; each runs one job at a time
+JOB_WORKERS = 2
+# Seconds an idle worker waits before checking the queue again
+JOB_POLL_INTERVAL = 1.0
+# Seconds between heartbeats of a running job
+JOB_HEARTBEAT_INTERVAL = 15.0
+# A running job without a heartbeat for this long is treated as orphaned
+JOB_STALE_SECONDS = 120
+# Uploaded files are staged here until their import / evaluation job has read them
+UPLOAD_DIR = "data/uploads"
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+JOB_HANDLERS: dict[str, Callable[["JobContext", dict], dict]] = {}
+_claim_lock = threading.Lock()
+# Distinguishes this process from an earlier one that had the same host and PID
+_BOOT_ID = uuid.uuid4().hex[:12]
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+def register_job(kind: str):
+    """Decorator registering a handler ``fn(ctx, params) -> dict`` for a job kind."""
+    def decorator(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{_BOOT_ID}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def stage_uploads(files, numbered: bool = False) -> str:
+    """Write uploaded file objects (.name / .read()) to a fresh directory; returns its path.
+
+    ``numbered`` prefixes each file with its position, keeping upload order and
+    same-named files apart.
+    """
+    path = os.path.join(UPLOAD_DIR, uuid.uuid4().hex[:12])
+    os.makedirs(path, exist_ok=True)
+    for i, f in enumerate(files):
+        name = os.path.basename(f.name)
+        with open(os.path.join(path, f"{i:04d}_{name}" if numbered else name), "wb") as out:
+            out.write(f.read())
+    return path
+
+
+class JobQueue:
+    """The ``jobs`` table: submit, inspect, cancel and (for workers) claim jobs."""
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path
+
+    def _conn(self):
+        return get_db(self.db_path)
+
+    def submit(self, kind: str, params: dict | None = None) -> str:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO jobs (id, kind, params, status, progress, created_at) VALUES (?, ?, ?, 'queued', 0, ?)",
+            (job_id, kind, json.dumps(params or {}, ensure_ascii=False), _now()),
+        )
+        conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def list_jobs(self, limit: int = 20, kind: str | None = None) -> list[dict]:
+        sql, params = "SELECT * FROM jobs", []
+        if kind:
+            sql += " WHERE kind = ?"
+            params.append(kind)
+        sql += " ORDER BY created_at DESC, rowid DESC LIMIT ?"
+        rows = self._conn().execute(sql, params + [limit]).fetchall()
+        return [self._decode(r) for r in rows]
+
+    def active_job(self, kind: str) -> dict | None:
+        """The oldest queued or running job of a kind, if any."""
+        row = self._conn().execute(
+            "SELECT * FROM jobs WHERE kind = ? AND status IN ('queued', 'running') ORDER BY created_at LIMIT 1",
+            (kind,),
+        ).fetchone()
+        return self._decode(row) if row else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job now, or ask a running one to stop at its next progress report."""
+        conn = self._conn()
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+            (_now(), job_id),
+        )
+        if cur.rowcount == 0:
+            cur = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,),
+            )
+        conn.commit()
+        return cur.rowcount > 0
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        row = self._conn().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def claim_next(self) -> dict | None:
+        """Atomically move the oldest queued job to 'running' and return it."""
+        with _claim_lock:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at, rowid LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            # The status guard keeps a worker in another process from claiming it twice
+            cur = conn.execute(
+                """UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?, worker = ?
+                   WHERE id = ? AND status = 'queued'""",
+                (_now(), _now(), _worker_id(), row[0]),
+            )
+            conn.commit()
+            return self.get(row[0]) if cur.rowcount else None
+
+    def set_progress(self, job_id: str, fraction: float, message: str = "") -> None:
+        conn = self._conn()
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = ?, heartbeat_at = ? WHERE id = ?",
+            (max(0.0, min(1.0, fraction)), message, _now(), job_id),
+        )
+        conn.commit()
+
+    def heartbeat(self, job_id: str) -> None:
+        conn = self._conn()
+        conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'", (_now(), job_id))
+        conn.commit()
+
+    def finish(self, job_id: str, status: str, result: dict | None = None, error: str = "") -> None:
+        conn = self._conn()
+        conn.execute(
+            """UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,
+                   progress = CASE WHEN ? = 'completed' THEN 1.0 ELSE progress END
+               WHERE id = ?""",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+             error, _now(), status, job_id),
+        )
+        conn.commit()
+
+    def recover_interrupted(self) -> int:
+        """Fail 'running' jobs whose worker is gone (see the module docstring)."""
+        host, pid, current = socket.gethostname(), str(os.getpid()), _worker_id()
+        stale_before = (datetime.now() - timedelta(seconds=JOB_STALE_SECONDS)).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._conn()
+        recovered = 0
+        rows = conn.execute(
+            "SELECT id, worker, started_at, heartbeat_at FROM jobs WHERE status = 'running'"
+        ).fetchall()
+        for row in rows:
+            if row["worker"] == current:
+                continue
+            # Workers before boot ids were "host:pid"
+            worker_host, worker_pid = ((row["worker"] or "").split(":") + ["", ""])[:2]
+            last_seen = row["heartbeat_at"] or row["started_at"] or ""
+            if worker_host == host and (worker_pid == pid
+                                        or (worker_pid.isdigit() and not _pid_alive(int(worker_pid)))):
+                error = "Interrupted: worker process exited"
+            elif last_seen < stale_before:
+                error = f"Interrupted: no worker heartbeat for {JOB_STALE_SECONDS}s"
+            else:
+                continue
+            self.finish(row["id"], "failed", error=error)
+            recovered += 1
+        return recovered
+
+    @staticmethod
+    def _decode(row) -> dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"] or "{}")
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+
+class JobContext:
+    """Handed to a handler: the agent, plus progress reporting and cancellation."""
+
+    def __init__(self, queue: JobQueue, job_id: str, agent):
+        self.queue = queue
+        self.job_id = job_id
+        self.agent = agent
+
+    def progress(self, fraction: float, message: str = "") -> None:
+        self.queue.set_progress(self.job_id, fraction, message)
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        if self.queue.is_cancel_requested(self.job_id):
+            raise JobCancelled(self.job_id)
+
+
+class JobWorker:
+    """Runs queued jobs on background threads (``start``) or synchronously (``run_pending``)."""
+
+    def __init__(self, queue: JobQueue | None = None, agent_factory: Callable[[], object] | None = None,
+                 concurrency: int = JOB_WORKERS, poll_interval: float = JOB_POLL_INTERVAL):
+        self.queue = queue or JobQueue()
+        self.agent_factory = agent_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> "JobWorker":
+        recovered = self.queue.recover_interrupted()
+        if recovered:
+            logger.warning("Marked %d interrupted job(s) as failed", recovered)
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def _loop(self) -> None:
+        next_recovery = time.monotonic() + JOB_STALE_SECONDS
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim_next()
+                if job is None and time.monotonic() >= next_recovery:
+                    # Jobs orphaned by workers in other processes since this one started
+                    next_recovery = time.monotonic() + JOB_STALE_SECONDS
+                    self.queue.recover_interrupted()
+            except Exception:
+                logger.exception("Failed to claim a job")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.execute(job)
+
+    def run_pending(self) -> int:
+        """Run queued jobs in the calling thread until the queue is empty. Returns jobs run."""
+        count = 0
+        while (job := self.queue.claim_next()) is not None:
+            self.execute(job)
+            count += 1
+        return count
+
+    def execute(self, job: dict) -> None:
+        handler = JOB_HANDLERS.get(job["kind"])
+        if handler is None:
+            self.queue.finish(job["id"], "failed", error=f"No handler for job kind {job['kind']}")
+            return
+        logger.info("Job %s (%s) started", job["id"], job["kind"])
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job["id"], done),
+                                name=f"job-heartbeat-{job['id']}", daemon=True)
+        beat.start()
+        try:
+            # A fresh agent per job picks up credentials changed since the worker started
+            agent = self.agent_factory() if self.agent_factory else None
+            result = handler(JobContext(self.queue, job["id"], agent), job["params"])
+        except JobCancelled:
+            logger.info("Job %s cancelled", job["id"])
+            self.queue.finish(job["id"], "cancelled")
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job["id"], job["kind"])
+            self.queue.finish(job["id"], "failed", error=str(e))
+        else:
+            logger.info("Job %s (%s) completed", job["id"], job["kind"])
+            self.queue.finish(job["id"], "completed", result=result)
+        finally:
+            done.set()
+
+    def _heartbeat(self, job_id: str, done: threading.Event) -> None:
+        """Keep a job's heartbeat fresh while its handler runs, even between progress reports."""
+        while not done.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                self.queue.heartbeat(job_id)
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", job_id)
+
+
+# ----------------------------------------------------------------------
+# Built-in job handlers (heavy modules are imported lazily)
+# ----------------------------------------------------------------------
+
+@register_job("talent_import")
+def _talent_import(ctx: JobContext, params: dict) -> dict:
+    from talent_pool_manager import TalentPoolManager
+
+    try:
+        return TalentPoolManager().import_from_directory(params["directory"], ctx.agent, progress=ctx.progress)
+    finally:
+        if params.get("cleanup"):
+            shutil.rmtree(params["directory"], ignore_errors=True)
+
+
+@register_job("auto_sourcing")
+def _auto_sourcing(ctx: JobContext, params: dict) -> dict:
+    """Web-app and HC-approval runs; bounded by the same SOURCING_MAX_* limits as the CLI."""
+    from auto_sourcer import AutoSourcer
+    from sourcing_budget import run_limits_from_env
+
+    return {"run_id": AutoSourcer(ctx.agent).run(force_full=params.get("force_full", False),
+                                                 progress=ctx.progress, hc_ids=params.get("hc_ids"),
+                                                 **run_limits_from_env())}
+
+
+def enqueue_targeted_sourcing(hc_id: str) -> str:
+    """HC approval hook: queue a run scoring the whole talent pool against just that HC."""
+    return JobQueue().submit("auto_sourcing", {"hc_ids": [hc_id]})
+
+
+@register_job("resume_evaluation")
+def _resume_evaluation(ctx: JobContext, params: dict) -> dict:
+    """Score staged resume files against a JD (M3 bulk evaluation)."""
+    from resume_preprocessor import compact_resume
+
+    directory = params["directory"]
+    names = sorted(os.listdir(directory))
+    results = [{"file_name": name.split("_", 1)[-1], "evaluation": "", "error": ""} for name in names]
+
+    def _evaluate(idx: int) -> None:
+        with open(os.path.join(directory, names[idx]), "rb") as f:
+            text = ctx.agent.extract_text_from_file(results[idx]["file_name"], f.read())
+        if text.startswith(("File parsing failed", "Unsupported file format")):
+            results[idx]["error"] = text
+            return
+        results[idx]["evaluation"] = ctx.agent.evaluate_resume(params["jd"], compact_resume(text))
+
+    executor = ThreadPoolExecutor(max_workers=5)
+    try:
+        futures = {executor.submit(_evaluate, i): i for i in range(len(names))}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                future.result()
+            except Exception as e:
+                results[futures[future]]["error"] = f"❌ Evaluation failed: {e}"
+            ctx.progress(done / len(names), results[futures[future]]["file_name"])
+    finally:
+        # On cancellation, resumes not yet started are dropped
+        executor.shutdown(cancel_futures=True)
+        shutil.rmtree(directory, ignore_errors=True)
+    return {"results": results}
+
+
+@register_job("knowledge_compile")
+def _knowledge_compile(ctx: JobContext, params: dict) -> dict:
+    from knowledge_manager import DYNAMIC_PLAYBOOK_PATH, KnowledgeManager
+
+    ctx.progress(0.1, "Compiling Playbook")
+    if not KnowledgeManager().compile_to_markdown():
+        return {"compiled": False}
+    from document_parser import RAGSystem
+
+    ctx.progress(0.5, "Updating RAG index")
+    return {"compiled": True, **RAGSystem().refresh_source(DYNAMIC_PLAYBOOK_PATH)}
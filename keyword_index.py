@@ -0,0 +1,110 @@
+"""BM25 inverted index for the keyword retrieval mode.
+
+The Playbook is bilingual, so tokenisation splits Latin text into lowercase
+words and CJK runs into overlapping character bigrams (the usual approach for
+Chinese full-text search without a dictionary segmenter).
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*|[\u3400-\u4dbf\u4e00-\u9fff]+")
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+
+# High-frequency English function words that only add noise to postings
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it its of on or "
+    "our should that the their there this to was what when where which who why "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into index terms: lowercase words plus CJK character bigrams."""
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        tok = match.group()
+        if _CJK_RE.match(tok):
+            if len(tok) == 1:
+                tokens.append(tok)
+            else:
+                tokens.extend(tok[i:i + 2] for i in range(len(tok) - 1))
+        elif tok not in _STOPWORDS:
+            tokens.append(tok)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, built once and persisted as JSON.
+
+    Only postings and per-document keys (e.g. chunk hashes) are stored; the
+    caller owns the document texts and resolves search hits through ``keys``.
+    """
+
+    def __init__(self, keys: list[str], postings: dict[str, list[list[int]]],
+                 doc_len: list[int], k1: float = 1.5, b: float = 0.75):
+        self.keys = keys
+        self.postings = postings
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        n = len(doc_len)
+        self.avgdl = (sum(doc_len) / n) if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+
+    @classmethod
+    def build(cls, texts: list[str], keys: list[str] | None = None, **kwargs) -> "BM25Index":
+        """Index texts; keys default to the positional doc ids as strings."""
+        postings: dict[str, list[list[int]]] = {}
+        doc_len = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append([doc_id, tf])
+        if keys is None:
+            keys = [str(i) for i in range(len(texts))]
+        return cls(keys, postings, doc_len, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def search(self, query: str, k: int = 5) -> list[tuple[int, float]]:
+        """Return up to k (doc_id, score) pairs, best first. Non-matching docs are omitted."""
+        scores: dict[int, float] = {}
+        k1, b, avgdl = self.k1, self.b, self.avgdl or 1.0
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in plist:
+                norm = k1 * (1 - b + b * self.doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "keys": self.keys,
+            "postings": self.postings,
+            "doc_len": self.doc_len,
+            "k1": self.k1,
+            "b": self.b,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["keys"], payload["postings"], payload["doc_len"],
+                   k1=payload.get("k1", 1.5), b=payload.get("b", 0.75))
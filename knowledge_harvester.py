@@ -0,0 +1,291 @@
+"""Concurrent multi-URL harvesting for the Knowledge Harvester (M6).
+
+Pages are fetched in a thread pool through the shared ``verify=True`` httpx
+client, with per-host politeness: at most ``HOST_CONCURRENCY`` requests in
+flight per host and request starts to one host spaced ``HOST_MIN_INTERVAL``
+seconds apart. Each fetched page goes straight to a smaller, bounded LLM pool
+for ``extract_web_knowledge``, reduced by ``html_extractor`` to the main-content
+chunks relevant to the source's region and category. Fragments are written by
+the calling thread only, so SQLite never sees concurrent writers.
+
+Re-crawls are cheap: ``CrawlCache`` keeps the ETag, Last-Modified and a hash
+of the cleaned text per URL. Requests are sent conditionally, and a 304 — or
+a 200 whose cleaned text hashes the same — is reported as 'unchanged' without
+calling the LLM.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from db import get_db
+from html_extractor import extract_sections, relevance_query, sections_to_text, select_context
+from http_client import get_http_client
+from knowledge_manager import KnowledgeManager
+
+logger = logging.getLogger(__name__)
+
+# Pages fetched in parallel across all hosts
+HARVEST_FETCH_WORKERS = 8
+# LLM extractions in parallel; kept below the shared HTTP pool size
+HARVEST_LLM_WORKERS = 4
+# Politeness: concurrent requests per host, and min seconds between request starts
+HOST_CONCURRENCY = 2
+HOST_MIN_INTERVAL = 1.0
+FETCH_TIMEOUT = 15.0
+# Pages with less cleaned text than this are treated as blocked / empty
+MIN_PAGE_CHARS = 50
+
+FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+# Curated authoritative sources offered as presets in M6 and harvested in bulk
+OFFICIAL_SOURCES = [
+    {"label": "🇸🇬 新加坡 EP 签证 COMPASS 计分制 (解析版)",
+     "url": "https://sg.acclime.com/guides/singapore-employment-pass/",
+     "region": "Singapore", "category": "Visa & Work Permit / 签证与工作许可"},
+    {"label": "🇸🇬 新加坡 CPF (公积金) 费率政策 (普华永道解析)",
+     "url": "https://taxsummaries.pwc.com/singapore/individual/other-taxes",
+     "region": "Singapore", "category": "Official Law / 官方政策法规"},
+    {"label": "🇲🇾 马来西亚最新劳工法修正案 (法律解析)",
+     "url": "https://www.taypartners.com.my/employment-act-1955-key-amendments-2023/",
+     "region": "Malaysia", "category": "Official Law / 官方政策法规"},
+    {"label": "🇲🇾 马来西亚外籍专才 EP 签证申请指南",
+     "url": "https://www.paulhypepage.my/guide/malaysia-employment-pass/",
+     "region": "Malaysia", "category": "Visa & Work Permit / 签证与工作许可"},
+    {"label": "🇭🇰 香港'高才通'与专才签证对比 (毕马威指南)",
+     "url": "https://www.pwccn.com/zh/services/tax/publications/tax-news-mar2024-1.html",
+     "region": "Hong Kong", "category": "Visa & Work Permit / 签证与工作许可"},
+    {"label": "🇭🇰 香港雇佣条例与解雇规定 (Deacons)",
+     "url": "https://www.deacons.com/zh-hant/news-and-insights/publications/employment-law-in-hong-kong-frequently-asked-questions/",
+     "region": "Hong Kong", "category": "Official Law / 官方政策法规"},
+    {"label": "🇿🇦 南非外籍关键技能签证 (Critical Skills) 解析",
+     "url": "https://www.xpatweb.com/south-africa-critical-skills-visa/",
+     "region": "South Africa", "category": "Visa & Work Permit / 签证与工作许可"},
+    {"label": "🇿🇦 南非解雇与劳动法实务 (Bowmans)",
+     "url": "https://www.bowmanslaw.com/insights/employment/south-africa-terminating-employment/",
+     "region": "South Africa", "category": "Official Law / 官方政策法规"},
+]
+
+
+def fragment_tags(region: str, category: str) -> str:
+    return f"{region}, Auto-Harvested, {category.split(' ')[0]}"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class CrawlCache:
+    """Per-URL validators (ETag / Last-Modified) and cleaned-text hash of the last crawl."""
+
+    def get_many(self, urls: list[str]) -> dict[str, dict]:
+        if not urls:
+            return {}
+        placeholders = ",".join("?" * len(urls))
+        rows = get_db().execute(
+            f"SELECT * FROM crawl_cache WHERE source_url IN ({placeholders})", list(urls)
+        ).fetchall()
+        return {row["source_url"]: dict(row) for row in rows}
+
+    def record(self, url: str, etag: str | None, last_modified: str | None, content_hash: str) -> None:
+        """Remember a fully processed crawl of url."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        conn = get_db()
+        conn.execute(
+            """INSERT INTO crawl_cache (source_url, etag, last_modified, content_hash, fetched_at, checked_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(source_url) DO UPDATE SET
+                   etag = excluded.etag, last_modified = excluded.last_modified,
+                   content_hash = excluded.content_hash,
+                   fetched_at = excluded.fetched_at, checked_at = excluded.checked_at""",
+            (url, etag, last_modified, content_hash, now, now),
+        )
+        conn.commit()
+
+    def touch(self, url: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Mark url as re-checked and unchanged, refreshing validators the server sent."""
+        conn = get_db()
+        conn.execute(
+            """UPDATE crawl_cache SET checked_at = ?,
+                   etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+               WHERE source_url = ?""",
+            (datetime.now().strftime("%Y-%m-%d %H:%M"), etag, last_modified, url),
+        )
+        conn.commit()
+
+    def clear(self, url: str | None = None) -> None:
+        conn = get_db()
+        if url is None:
+            conn.execute("DELETE FROM crawl_cache")
+        else:
+            conn.execute("DELETE FROM crawl_cache WHERE source_url = ?", (url,))
+        conn.commit()
+
+
+class _HostThrottle:
+    """Per-host concurrency cap plus a minimum spacing between request starts."""
+
+    def __init__(self, concurrency: int, min_interval: float):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            sem = self._slots.setdefault(host, threading.BoundedSemaphore(self.concurrency))
+        with sem:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class KnowledgeHarvester:
+    """Fetches many policy pages concurrently and stores extracted fragments.
+
+    Every source is a dict with ``url``, ``region`` and ``category`` (``label``
+    optional). Each result is a dict with ``url``, ``status`` — one of 'added',
+    'duplicate', 'unchanged', 'no_knowledge', 'too_short' or 'error' — plus
+    ``chars``, ``content`` and ``error``.
+    """
+
+    def __init__(self, agent, km: KnowledgeManager | None = None, client=None,
+                 fetch_workers: int = HARVEST_FETCH_WORKERS, llm_workers: int = HARVEST_LLM_WORKERS,
+                 host_concurrency: int = HOST_CONCURRENCY, host_min_interval: float = HOST_MIN_INTERVAL):
+        self.agent = agent
+        self.km = km or KnowledgeManager()
+        self.client = client or get_http_client(verify=True)
+        self.cache = CrawlCache()
+        self.fetch_workers = fetch_workers
+        self.llm_workers = llm_workers
+        self._throttle = _HostThrottle(host_concurrency, host_min_interval)
+
+    def fetch_page(self, url: str, cached: dict | None = None) -> dict:
+        """Download a page (politely, conditionally if cached) and clean it.
+
+        Returns a dict with ``unchanged``, ``sections`` (main-content (heading,
+        text) pairs), ``text``, ``etag``, ``last_modified`` and ``content_hash``.
+        Touches no database, so it is safe in worker threads.
+        """
+        headers = dict(FETCH_HEADERS)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        with self._throttle.slot(urlsplit(url).netloc.lower()):
+            response = self.client.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        page = {"etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")}
+        if cached and response.status_code == 304:
+            return {**page, "unchanged": True, "sections": [], "text": "",
+                    "content_hash": cached.get("content_hash")}
+        response.raise_for_status()
+        sections = extract_sections(response.text)
+        text = sections_to_text(sections)
+        digest = text_hash(text)
+        unchanged = bool(cached) and cached.get("content_hash") == digest
+        return {**page, "unchanged": unchanged, "sections": sections, "text": text, "content_hash": digest}
+
+    def harvest_one(self, source: dict, force: bool = False) -> dict:
+        """Fetch, extract and store a single source synchronously."""
+        return self.harvest([source], force=force)[0]
+
+    def harvest(self, sources: list[dict], force: bool = False,
+                on_result: Callable[[dict], None] | None = None) -> list[dict]:
+        """Harvest all sources concurrently. Results come back in input order.
+
+        Unless ``force`` is set, pages unchanged since their last crawl skip
+        LLM extraction. ``on_result`` is called from the calling thread as each
+        source finishes, e.g. to drive a progress bar.
+        """
+        results: list[dict | None] = [None] * len(sources)
+        start = time.time()
+        cached = {} if force else self.cache.get_many([source["url"] for source in sources])
+        pages: dict[int, dict] = {}
+
+        def _finish(idx: int, status: str, **fields) -> None:
+            result = {"url": sources[idx]["url"], "label": sources[idx].get("label", ""), "status": status,
+                      "chars": 0, "content": "", "error": "", **fields}
+            results[idx] = result
+            if on_result:
+                on_result(result)
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="harvest-fetch") as fetch_pool, \
+                ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix="harvest-llm") as llm_pool:
+            pending = {
+                fetch_pool.submit(self.fetch_page, source["url"], cached.get(source["url"])): ("fetch", idx, 0)
+                for idx, source in enumerate(sources)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, idx, chars = pending.pop(future)
+                    source = sources[idx]
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        logger.warning("Harvest %s failed for %s: %s", stage, source["url"], e)
+                        _finish(idx, "error", chars=chars, error=str(e))
+                        continue
+                    if stage == "fetch":
+                        text = value["text"]
+                        if value["unchanged"]:
+                            self.cache.touch(source["url"], value["etag"], value["last_modified"])
+                            _finish(idx, "unchanged", chars=len(text))
+                            continue
+                        if len(text) < MIN_PAGE_CHARS:
+                            _finish(idx, "too_short", chars=len(text))
+                            continue
+                        pages[idx] = value
+                        # Only the sections relevant to this region/category reach the prompt
+                        context = select_context(value["sections"],
+                                                 relevance_query(source["region"], source["category"]))
+                        extraction = llm_pool.submit(self.agent.extract_web_knowledge, source["url"],
+                                                     source["region"], source["category"], context)
+                        pending[extraction] = ("extract", idx, len(text))
+                    else:
+                        status, error = self._store(source, value)
+                        if status != "error":
+                            # Only a fully processed page may short-circuit the next crawl
+                            page = pages[idx]
+                            self.cache.record(source["url"], page["etag"], page["last_modified"],
+                                              page["content_hash"])
+                        _finish(idx, status, chars=chars, error=error,
+                                content=value if status in ("added", "duplicate") else "")
+
+        counts: dict[str, int] = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        logger.info("Harvested %d sources in %.1fs: %s", len(sources), time.time() - start, counts)
+        return results
+
+    def _store(self, source: dict, extracted: str | None) -> tuple[str, str]:
+        """Save an extraction as a fragment; returns (status, error)."""
+        if not extracted:
+            return "error", "LLM client not configured"
+        if extracted.startswith("❌"):
+            return "error", extracted
+        if "EXTRACTION_FAILED" in extracted:
+            return "no_knowledge", ""
+        ok, _reason = self.km.add_fragment(
+            source["region"], source["category"], extracted,
+            fragment_tags(source["region"], source["category"]), source_url=source["url"],
+        )
+        return ("added" if ok else "duplicate"), ""
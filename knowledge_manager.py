@@ -4,8 +4,27 @@ import os
 import uuid
 from datetime import datetime, timedelta
 
+from answer_cache import AnswerCache
 from db import get_db
 
+DYNAMIC_PLAYBOOK_PATH = "data/Alauda_Dynamic_Playbook.md"
+_TIMESTAMP_PREFIX = "*上次更新时间"
+
+
+def playbook_version(path: str = DYNAMIC_PLAYBOOK_PATH) -> str:
+    """Content hash of the compiled Playbook, ignoring its compile timestamp line.
+
+    Recompiling unchanged fragments therefore keeps the same version.
+    """
+    if not os.path.exists(path):
+        return "none"
+    digest = hashlib.sha256()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.startswith(_TIMESTAMP_PREFIX):
+                digest.update(line.encode("utf-8"))
+    return digest.hexdigest()[:12]
+
 
 class KnowledgeManager:
     """
@@ -78,6 +97,38 @@ class KnowledgeManager:
         except ValueError:
             return "ok"
 
+    def get_refresh_candidates(self, within_days: int = 14) -> list[dict]:
+        """Harvested fragments (with a source_url) expired or expiring within N days."""
+        cutoff = (datetime.now() + timedelta(days=within_days)).strftime("%Y-%m-%d")
+        rows = get_db().execute(
+            "SELECT * FROM playbook_fragments WHERE source_url != '' AND expires_at IS NOT NULL "
+            "AND expires_at <= ? ORDER BY expires_at",
+            (cutoff,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def renew_source(self, source_url: str, region: str, category: str, ttl_days: int = 90) -> int:
+        """Push expires_at out for every fragment a source yielded for this region/category,
+        re-verified as current."""
+        expires_at = (datetime.now() + timedelta(days=ttl_days)).strftime("%Y-%m-%d")
+        conn = get_db()
+        cur = conn.execute(
+            "UPDATE playbook_fragments SET expires_at = ? WHERE source_url = ? AND region = ? AND category = ?",
+            (expires_at, source_url, region, category),
+        )
+        conn.commit()
+        return cur.rowcount
+
+    def retire_fragments(self, fragment_ids: list[str]) -> int:
+        """Delete fragments superseded by a fresh harvest."""
+        if not fragment_ids:
+            return 0
+        conn = get_db()
+        placeholders = ",".join("?" * len(fragment_ids))
+        cur = conn.execute(f"DELETE FROM playbook_fragments WHERE id IN ({placeholders})", list(fragment_ids))
+        conn.commit()
+        return cur.rowcount
+
     def get_all_fragments(self) -> list[dict]:
         conn = get_db()
         rows = conn.execute("SELECT * FROM playbook_fragments ORDER BY date DESC").fetchall()
@@ -88,7 +139,7 @@ class KnowledgeManager:
             result.append(d)
         return result
 
-    def compile_to_markdown(self, output_file: str = "data/Alauda_Dynamic_Playbook.md") -> bool:
+    def compile_to_markdown(self, output_file: str = DYNAMIC_PLAYBOOK_PATH) -> bool:
         """将所有碎片编译合成一个完整的 Markdown 知识库文件，供 RAG 使用"""
         fragments = self.get_all_fragments()
         if not fragments:
@@ -122,4 +173,6 @@ class KnowledgeManager:
 
         with open(output_file, "w", encoding="utf-8") as f:
             f.write(md_content)
+        # Cached Q&A answers from an older Playbook version are stale now
+        AnswerCache().invalidate(keep_version=playbook_version(output_file))
         return True
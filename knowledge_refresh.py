@@ -0,0 +1,109 @@
+"""Expiry-driven re-harvest of the knowledge base (run by run_knowledge_refresh.py).
+
+Harvested fragments that are expired or about to expire are grouped by
+(``source_url``, region, category) — one page may feed several regions or
+categories — and re-harvested concurrently through ``KnowledgeHarvester``
+(conditional requests make unchanged pages nearly free). Per source:
+
+- new knowledge extracted → the old fragments of that source are retired
+- page or extraction unchanged → the existing fragments' TTL is renewed
+- fetch / extraction failure → fragments are left as they are, still flagged
+
+If anything changed the Playbook is recompiled and only the changed chunks
+are swapped into the RAG index. Every run is logged in ``knowledge_refresh_runs``.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime
+
+from db import get_db
+from knowledge_harvester import KnowledgeHarvester
+from knowledge_manager import DYNAMIC_PLAYBOOK_PATH, KnowledgeManager
+
+logger = logging.getLogger(__name__)
+
+# Fragments expiring within this many days are refreshed ahead of time
+REFRESH_WINDOW_DAYS = 14
+
+
+class KnowledgeRefresher:
+    """Re-harvests expiring fragments' sources and keeps Playbook + RAG index in sync."""
+
+    def __init__(self, harvester: KnowledgeHarvester, km: KnowledgeManager | None = None,
+                 rag=None, playbook_path: str = DYNAMIC_PLAYBOOK_PATH):
+        self.harvester = harvester
+        self.km = km or harvester.km
+        self._rag = rag
+        self.playbook_path = playbook_path
+
+    @property
+    def rag(self):
+        if self._rag is None:
+            from document_parser import RAGSystem
+            self._rag = RAGSystem()
+        return self._rag
+
+    def run(self, within_days: int = REFRESH_WINDOW_DAYS, force: bool = False) -> str:
+        """Refresh every source with fragments expiring within N days. Returns the run_id."""
+        conn = get_db()
+        run_id = f"krun_{uuid.uuid4().hex[:12]}"
+        conn.execute(
+            "INSERT INTO knowledge_refresh_runs (id, run_date, status) VALUES (?, ?, 'running')",
+            (run_id, datetime.now().strftime("%Y-%m-%d %H:%M")),
+        )
+        conn.commit()
+        start = time.time()
+        stats = {"sources_checked": 0, "refreshed": 0, "unchanged": 0, "failed": 0,
+                 "fragments_retired": 0, "chunks_added": 0, "chunks_removed": 0}
+        try:
+            groups: dict[tuple[str, str, str], list[dict]] = {}
+            for frag in self.km.get_refresh_candidates(within_days):
+                groups.setdefault((frag["source_url"], frag["region"], frag["category"]), []).append(frag)
+            sources = [{"url": url, "region": region, "category": category, "label": url}
+                       for url, region, category in groups]
+            stats["sources_checked"] = len(sources)
+            logger.info("Refreshing %d source(s) with fragments expiring within %d days",
+                        len(sources), within_days)
+
+            # Results come back in input order, so they pair with their group
+            results = self.harvester.harvest(sources, force=force) if sources else []
+            for key, result in zip(groups, results):
+                url, status = result["url"], result["status"]
+                if status == "added":
+                    stats["refreshed"] += 1
+                    stats["fragments_retired"] += self.km.retire_fragments([f["id"] for f in groups[key]])
+                elif status in ("unchanged", "duplicate"):
+                    stats["unchanged"] += 1
+                    self.km.renew_source(*key)
+                else:
+                    stats["failed"] += 1
+                    logger.warning("Refresh of %s failed (%s): %s", url, status, result["error"])
+
+            if (stats["refreshed"] or stats["unchanged"]) and self.km.compile_to_markdown(self.playbook_path):
+                rag_stats = self.rag.refresh_source(self.playbook_path)
+                stats["chunks_added"], stats["chunks_removed"] = rag_stats["added"], rag_stats["removed"]
+        except Exception:
+            self._finish_run(run_id, stats, time.time() - start, "failed")
+            raise
+        self._finish_run(run_id, stats, time.time() - start, "completed")
+        return run_id
+
+    def _finish_run(self, run_id: str, stats: dict, duration: float, status: str) -> None:
+        conn = get_db()
+        conn.execute(
+            """UPDATE knowledge_refresh_runs SET sources_checked = ?, refreshed = ?, unchanged = ?, failed = ?,
+                   fragments_retired = ?, chunks_added = ?, chunks_removed = ?, duration_seconds = ?, status = ?
+               WHERE id = ?""",
+            (stats["sources_checked"], stats["refreshed"], stats["unchanged"], stats["failed"],
+             stats["fragments_retired"], stats["chunks_added"], stats["chunks_removed"],
+             round(duration, 1), status, run_id),
+        )
+        conn.commit()
+
+    def get_run_history(self, limit: int = 20) -> list[dict]:
+        rows = get_db().execute(
+            "SELECT * FROM knowledge_refresh_runs ORDER BY run_date DESC, rowid DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(r) for r in rows]
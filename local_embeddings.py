@@ -0,0 +1,145 @@
+"""Offline embedding backends for air-gapped deployments.
+
+Selected with ``EMBEDDING_BACKEND``:
+- ``hashing``: feature-hashed word / CJK-bigram / character-trigram vectors.
+  Pure Python, no model download, deterministic across restarts.
+- ``sentence-transformers``: a small CPU sentence-transformer model
+  (``LOCAL_EMBEDDING_MODEL``). Requires ``pip install sentence-transformers``
+  and a locally cached model.
+
+Both batch their input (``EMBEDDING_BATCH_SIZE``) and spread batches over a
+worker pool (``EMBEDDING_WORKERS``, ``EMBEDDING_POOL=thread|process``).
+"""
+
+import logging
+import math
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+from keyword_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+LOCAL_BACKENDS = ("hashing", "sentence-transformers")
+DEFAULT_HASHING_DIM = 512
+# Multilingual so Chinese and English Playbook text share one vector space
+DEFAULT_LOCAL_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def _hash_features(text: str) -> list[str]:
+    """Index terms plus character trigrams of Latin words (robust to inflection and typos)."""
+    features = []
+    for tok in tokenize(text):
+        features.append(tok)
+        if tok.isascii() and len(tok) > 3:
+            padded = f"<{tok}>"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def _hash_vector(text: str, dim: int) -> list[float]:
+    vec = [0.0] * dim
+    for feature in _hash_features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        # Signed hashing keeps collisions from systematically inflating similarity
+        vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm:
+        vec = [v / norm for v in vec]
+    return vec
+
+
+def _hash_batch(texts: list[str], dim: int) -> list[list[float]]:
+    return [_hash_vector(t, dim) for t in texts]
+
+
+class HashingEmbeddings(Embeddings):
+    """L2-normalised feature-hashing embeddings — lexical-semantic, zero network."""
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM, batch_size: int = 64,
+                 max_workers: int = 4, pool: str = "thread"):
+        self.dim = dim
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.pool = pool
+
+    @property
+    def model_name(self) -> str:
+        return f"hashing-{self.dim}"
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1 or self.max_workers <= 1:
+            return [vec for batch in batches for vec in _hash_batch(batch, self.dim)]
+        executor_cls = ProcessPoolExecutor if self.pool == "process" else ThreadPoolExecutor
+        with executor_cls(max_workers=self.max_workers) as executor:
+            results = executor.map(_hash_batch, batches, [self.dim] * len(batches))
+            return [vec for batch in results for vec in batch]
+
+    def embed_query(self, text: str) -> list[float]:
+        return _hash_vector(text, self.dim)
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Local sentence-transformer model on CPU; the model is loaded on first use."""
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL, batch_size: int = 64, max_workers: int = 4):
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=sentence-transformers requires `pip install sentence-transformers`"
+            ) from e
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._model = None
+
+    def _get_model(self):
+        if self._model is None:
+            import torch
+            from sentence_transformers import SentenceTransformer
+            torch.set_num_threads(self.max_workers)
+            self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        vectors = self._get_model().encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True, show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def get_local_embeddings(backend: str) -> Embeddings:
+    """Build the local backend named by EMBEDDING_BACKEND. Raises ValueError/ImportError if unusable."""
+    batch_size = _env_int("EMBEDDING_BATCH_SIZE", 64)
+    max_workers = _env_int("EMBEDDING_WORKERS", 4)
+    if backend == "hashing":
+        return HashingEmbeddings(
+            dim=_env_int("HASHING_EMBEDDING_DIM", DEFAULT_HASHING_DIM),
+            batch_size=batch_size,
+            max_workers=max_workers,
+            pool=os.environ.get("EMBEDDING_POOL", "thread").strip().lower(),
+        )
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbeddings(
+            model_name=os.environ.get("LOCAL_EMBEDDING_MODEL", DEFAULT_LOCAL_MODEL),
+            batch_size=batch_size,
+            max_workers=max_workers,
+        )
+    raise ValueError(f"Unknown local embedding backend '{backend}'. Must be one of: {LOCAL_BACKENDS}")
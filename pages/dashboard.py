@@ -7,7 +7,7 @@ import streamlit as st
 from candidate_manager import CandidateManager
 from hc_manager import HCManager
 from recruitment_agent import get_llm_usage_log
-from app_shared import bi
+from app_shared import bi, get_agent, _llm_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -153,10 +153,17 @@ st.markdown("#### 🤖 Recent LLM Usage / 近期 LLM 调用记录")
 _usage_log = get_llm_usage_log()
 if _usage_log:
     _usage_df = pd.DataFrame(_usage_log)
-    _usage_df = _usage_df[["timestamp", "model", "prompt_tokens", "completion_tokens", "total_tokens"]]
-    _usage_df.columns = ["Time / 时间", "Model / 模型", "Prompt Tokens", "Completion Tokens", "Total Tokens / 总 Tokens"]
+    _usage_df = _usage_df[["timestamp", "model", "prompt_tokens", "cached_tokens", "completion_tokens", "total_tokens"]]
+    _usage_df.columns = ["Time / 时间", "Model / 模型", "Prompt Tokens", "Cached / 缓存命中", "Completion Tokens", "Total Tokens / 总 Tokens"]
     st.dataframe(_usage_df.iloc[::-1], use_container_width=True, hide_index=True)
     _total = sum(r["total_tokens"] for r in _usage_log)
     st.caption(bi(f"Session total: {_total:,} tokens ({len(_usage_log)} calls)", f"本次会话累计消耗 {_total:,} tokens（最近 {len(_usage_log)} 次调用）"))
+    _hedger = get_agent(_key=_llm_cache_key()).hedger
+    if _hedger is not None:
+        _hs = _hedger.stats()
+        st.caption(bi(
+            f"Request hedging: {_hs['hedged']}/{_hs['calls']} calls hedged ({_hs['hedge_rate']:.1%}), hedge won {_hs['hedge_wins']}",
+            f"请求对冲：{_hs['calls']} 次调用中对冲 {_hs['hedged']} 次（{_hs['hedge_rate']:.1%}），对冲请求胜出 {_hs['hedge_wins']} 次",
+        ))
 else:
     st.info(bi("No LLM calls this session. Token usage appears after using other modules.", "本次会话尚未发起 LLM 调用。使用其他模块后，此处将显示 Token 消耗记录。"))
@@ -1,4 +1,3 @@
-import html
 import json
 import os
 import re
@@ -7,7 +6,7 @@ from datetime import datetime
 
 import streamlit as st
 
-from app_shared import bi, get_agent, _llm_cache_key
+from app_shared import bi, get_agent, stream_failed, _llm_cache_key
 from hc_manager import HCManager
 
 st.markdown('<div class="main-title">🎯 JD Reverse Engineering & Auto-Sourcing / JD 逆向工程与自动化寻源</div>', unsafe_allow_html=True)
@@ -69,11 +68,18 @@ if submitted:
     if not os.getenv("OPENAI_API_KEY"):
         st.error(bi("LLM API Key not configured. Please set it in the .env file.", "您尚未配置大模型 API Key。请前往 .env 文件进行配置。"))
     else:
-        with st.spinner(bi("🤖 The Sourcing Engine is running, ~10-15s please wait...", "🤖 正在运转，预计需要 10-15 秒，请稍候...")):
-            result = agent.generate_jd_and_xray(
+        st.markdown("### 📄 Final Deliverables / 最终交付物")
+        with st.container(border=True):
+            stream = agent.stream_jd_and_xray(
                 role_title, location, mission, tech_stack, deal_breakers, selling_point
             )
+            result = st.write_stream(stream)
 
+        if stream_failed(stream, result):
+            # Never save a refused or broken generation as the JD other modules load
+            st.error(bi("JD generation did not complete — nothing was saved. See the message above.",
+                        "JD 生成未完成，未保存任何内容。请查看上方提示。"))
+        else:
             st.session_state["generated_jd"] = result
 
             # persist to disk so the JD survives page refreshes
@@ -89,29 +95,25 @@ if submitted:
 
             st.success(bi("✅ Generation complete! Auto-saved — available across all modules.", "✅ 生成完成！已自动保存，各模块可直接使用。"))
 
-            st.markdown("### 📄 Final Deliverables / 最终交付物")
-            st.markdown(f'<div style="background-color: #FFFFFF; padding: 30px; border-radius: 8px; border: 1px solid #E5E7EB;">{html.escape(result)}</div>', unsafe_allow_html=True)
-
-            if result:
-                st.download_button(
-                    label=bi("📥 Download Markdown", "📥 下载 Markdown 源文件"),
-                    data=result,
-                    file_name=f"Alauda_GROS_{role_title.replace(' ', '_')}.md",
-                    mime="text/markdown",
-                    use_container_width=False
-                )
-
-                # extract Boolean strings from code blocks → one-click search links
-                code_blocks = re.findall(r'```[^\n]*\n(.*?)```', result, re.DOTALL)
-                search_strings = [b.strip() for b in code_blocks if len(b.strip()) > 30]
-                if search_strings:
-                    st.markdown("---")
-                    st.markdown("### 🔍 One-Click Sourcing Search / 一键执行寻源搜索")
-                    st.caption(bi("Click links below to execute X-Ray searches directly in your browser.", "点击下方链接直接在浏览器中执行 X-Ray 搜索，无需手动复制粘贴。"))
-                    for i, s in enumerate(search_strings, 1):
-                        url = f"https://www.google.com/search?q={urllib.parse.quote(s)}"
-                        cols = st.columns([3, 1])
-                        with cols[0]:
-                            st.code(s, language="")
-                        with cols[1]:
-                            st.markdown(f"[🔗 Search / 搜索]({url})", unsafe_allow_html=False)
+            st.download_button(
+                label=bi("📥 Download Markdown", "📥 下载 Markdown 源文件"),
+                data=result,
+                file_name=f"Alauda_GROS_{role_title.replace(' ', '_')}.md",
+                mime="text/markdown",
+                use_container_width=False
+            )
+
+            # extract Boolean strings from code blocks → one-click search links
+            code_blocks = re.findall(r'```[^\n]*\n(.*?)```', result, re.DOTALL)
+            search_strings = [b.strip() for b in code_blocks if len(b.strip()) > 30]
+            if search_strings:
+                st.markdown("---")
+                st.markdown("### 🔍 One-Click Sourcing Search / 一键执行寻源搜索")
+                st.caption(bi("Click links below to execute X-Ray searches directly in your browser.", "点击下方链接直接在浏览器中执行 X-Ray 搜索，无需手动复制粘贴。"))
+                for i, s in enumerate(search_strings, 1):
+                    url = f"https://www.google.com/search?q={urllib.parse.quote(s)}"
+                    cols = st.columns([3, 1])
+                    with cols[0]:
+                        st.code(s, language="")
+                    with cols[1]:
+                        st.markdown(f"[🔗 Search / 搜索]({url})", unsafe_allow_html=False)
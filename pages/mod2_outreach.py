@@ -1,9 +1,8 @@
-import html
 import os
 
 import streamlit as st
 
-from app_shared import bi, get_agent, load_latest_jd, _llm_cache_key
+from app_shared import bi, get_agent, load_latest_jd, stream_failed, _llm_cache_key
 
 st.markdown('<div class="main-title">✉️ High-Conversion Cold Outreach / 高转化率自动化触达</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-title">Ditch generic HR pitches. Generate laser-targeted, highly personalized headhunter-grade Email &amp; LinkedIn InMail.\n抛弃"我们在招人，你有兴趣吗"的废话，一键生成直击痛点、高度个性化的猎头级触达邮件与 LinkedIn InMail。</div>', unsafe_allow_html=True)
@@ -36,9 +35,13 @@ if submitted:
     if not os.getenv("OPENAI_API_KEY"):
         st.error(bi("LLM API Key not configured.", "您尚未配置大模型 API Key。"))
     else:
-        with st.spinner(bi("🤖 Applying Hormozi's Acquisition framework to craft copy...", "🤖 正在运用 Hormozi Acquisition 营销框架构思文案...")):
-            candidate_info = f"姓名: {candidate_name}\n背景亮点: {candidate_bg}"
-            outreach_result = agent.generate_outreach_message(jd_input, candidate_info)
-
+        st.caption(bi("🤖 Applying Hormozi's Acquisition framework to craft copy...", "🤖 正在运用 Hormozi Acquisition 营销框架构思文案..."))
+        candidate_info = f"姓名: {candidate_name}\n背景亮点: {candidate_bg}"
+        with st.container(border=True):
+            stream = agent.stream_outreach_message(jd_input, candidate_info)
+            outreach_result = st.write_stream(stream)
+
+        if stream_failed(stream, outreach_result):
+            st.error(bi("Outreach generation did not complete — see the message above.", "触达文案生成未完成，请查看上方提示。"))
+        else:
             st.success(bi("✅ Outreach copy generated! Ready to copy & send.", "✅ 触达文案生成完毕！可直接复制发送。"))
-            st.markdown(f'<div style="background-color: #FFFFFF; padding: 30px; border-radius: 8px; border: 1px solid #E5E7EB;">{html.escape(outreach_result)}</div>', unsafe_allow_html=True)
@@ -1,15 +1,16 @@
 import html
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import streamlit as st
 
-from app_shared import bi, get_agent, load_latest_jd, _llm_cache_key
+from app_shared import bi, get_agent, job_progress_panel, load_latest_jd, _llm_cache_key
+from job_queue import JobQueue, stage_uploads
 
 st.markdown('<div class="main-title">📄 Resume Intelligence Radar / 猎头简历智能雷达</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-title">Solve the problem of HR not understanding overseas tech resumes. AI applies a strict quantitative scoring rubric to prevent drift.\n解决 HR 看不懂海外技术简历、容易被候选人过度包装忽悠的问题。AI 基于严苛的【算分卡法则】进行防漂移量化打分。</div>', unsafe_allow_html=True)
 
 agent = get_agent(_key=_llm_cache_key())
+job_queue = JobQueue()
 
 # 左右两栏布局：左边 JD，右边简历上传
 col_jd, col_resume = st.columns([1, 1])
@@ -43,57 +44,28 @@ if st.button(bi("🚀 Run Evaluation (AI Scorecard)", "🚀 启动硬核评估 (
     elif not os.getenv("OPENAI_API_KEY"):
         st.error(bi("LLM API Key not configured.", "您尚未配置大模型 API Key。"))
     else:
-        st.markdown("---")
-        st.markdown("### 📊 Evaluation Results / 评估结果")
-
-        # Phase 1 (serial): parse all uploaded files
-        parsed = []
-        for resume_file in uploaded_resumes:
-            file_bytes = resume_file.read()
-            file_name = resume_file.name
-            resume_text = agent.extract_text_from_file(file_name, file_bytes)
-            parsed.append((file_name, resume_text))
-
-        # Phase 2 (parallel): evaluate resumes concurrently
-        progress_bar = st.progress(0, text=bi("🤖 Evaluating resumes in parallel...", "🤖 正在并行评估简历..."))
-        results = {}  # idx -> result string
-        error_indices = set()
-
-        def _evaluate(idx, name, text):
-            return idx, agent.evaluate_resume(jd_for_match, text)
-
-        completed_count = 0
-        total = len(parsed)
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {}
-            for idx, (file_name, resume_text) in enumerate(parsed):
-                if resume_text.startswith("File parsing failed") or resume_text.startswith("Unsupported file format"):
-                    error_indices.add(idx)
-                    results[idx] = resume_text
-                    completed_count += 1
-                    continue
-                fut = executor.submit(_evaluate, idx, file_name, resume_text)
-                futures[fut] = idx
-
-            for fut in as_completed(futures):
-                try:
-                    idx, result = fut.result()
-                    results[idx] = result
-                except Exception as e:
-                    idx = futures[fut]
-                    results[idx] = f"❌ Evaluation failed: {str(e)}"
-                    error_indices.add(idx)
-                completed_count += 1
-                progress_bar.progress(completed_count / total, text=bi(f"🤖 Completed {completed_count}/{total} resumes", f"🤖 已完成 {completed_count}/{total} 份简历评估"))
-
-        progress_bar.empty()
-
-        # Phase 3 (serial): display results in original upload order
-        for idx, (file_name, _) in enumerate(parsed):
-            if idx in error_indices:
-                st.error(f"❌ {file_name}: {results[idx]}")
+        # Parsing + scoring run as a background job; a rerun or page switch no longer loses them
+        st.session_state["m3_eval_job"] = job_queue.submit(
+            "resume_evaluation", {"jd": jd_for_match, "directory": stage_uploads(uploaded_resumes, numbered=True)},
+        )
+
+_eval_job = job_queue.get(st.session_state["m3_eval_job"]) if st.session_state.get("m3_eval_job") else None
+if _eval_job:
+    st.markdown("---")
+    st.markdown("### 📊 Evaluation Results / 评估结果")
+    if _eval_job["status"] in ("queued", "running"):
+        job_progress_panel(_eval_job["id"])
+    elif _eval_job["status"] == "completed":
+        _results = _eval_job["result"]["results"]
+        # Results are kept in original upload order
+        for _r in _results:
+            if _r["error"]:
+                st.error(f"❌ {_r['file_name']}: {_r['error']}")
                 continue
-            with st.expander(f"📄 {file_name}", expanded=True):
-                st.markdown(f'<div style="background-color: #FFFFFF; padding: 20px; border-radius: 8px; border: 1px solid #E5E7EB;">{html.escape(results[idx])}</div>', unsafe_allow_html=True)
-
-        st.success(bi(f"✅ All {len(uploaded_resumes)} resume(s) evaluated!", f"✅ 全部 {len(uploaded_resumes)} 份简历评估完毕！"))
+            with st.expander(f"📄 {_r['file_name']}", expanded=True):
+                st.markdown(f'<div style="background-color: #FFFFFF; padding: 20px; border-radius: 8px; border: 1px solid #E5E7EB;">{html.escape(_r["evaluation"])}</div>', unsafe_allow_html=True)
+        st.success(bi(f"✅ All {len(_results)} resume(s) evaluated!", f"✅ 全部 {len(_results)} 份简历评估完毕！"))
+    elif _eval_job["status"] == "failed":
+        st.error(bi(f"❌ Evaluation failed: {_eval_job['error']}", f"❌ 评估失败: {_eval_job['error']}"))
+    else:
+        st.info(bi("Evaluation cancelled.", "评估已取消。"))
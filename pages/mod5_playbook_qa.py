@@ -1,12 +1,14 @@
 import streamlit as st
 
-from app_shared import bi, get_agent, get_rag_system, _llm_cache_key, _emb_cache_key
+from answer_cache import AnswerCache
+from app_shared import bi, get_agent, get_rag_system, stream_failed, _llm_cache_key, _emb_cache_key
+from knowledge_manager import playbook_version
 
 st.markdown('<div class="main-title">📚 Alauda Global Knowledge AI Assistant / 灵雀云出海智库 AI 助手</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-title">RAG-powered. Ask anytime about localization compliance, global strategy playbook, employer branding scripts, and more.\n基于 RAG 检索增强技术。您可以随时询问关于本地化合规、出海战略指导手册、雇主品牌沟通话术等内容。</div>', unsafe_allow_html=True)
 
 agent = get_agent(_key=_llm_cache_key())
-rag = get_rag_system(_key=_emb_cache_key())
+rag = get_rag_system(_key=(_emb_cache_key(), playbook_version()))
 
 with st.spinner(bi("⏳ Mounting local knowledge base (PDF & dynamic repo)...", "⏳ 正在挂载本地知识库 (PDF & 动态沉淀库)...")):
     is_loaded = rag.load_and_index()
@@ -28,6 +30,9 @@ else:
             "EMBEDDING_API_BASE=https://api.openai.com/v1\n```"
         )
 
+# Near-duplicate question matching needs real query embeddings (vector mode only)
+answer_cache = AnswerCache(embeddings=rag.embeddings if rag.embedding_mode == "vector" else None)
+
 chat_container = st.container()
 
 if "messages" not in st.session_state:
@@ -53,10 +58,17 @@ if prompt := st.chat_input("Ask the knowledge base, e.g.: 'What are the KPIs for
                     if not context_docs:
                         st.warning(bi("⚠️ No strongly relevant segments found. AI answer may lack definitive evidence.", "⚠️ 在当前知识库中没有检索到强相关的原始段落，AI 的回答可能缺乏确切依据。"))
 
-                with st.spinner(bi("🤖 Composing professional answer from internal docs...", "🤖 正在基于内部文件构思专业回答...")):
-                    response = agent.answer_playbook_question(prompt, context_docs)
-
-                st.markdown(response)
+                _version = playbook_version()
+                response = answer_cache.get(prompt, context_docs, _version)
+                if response is not None:
+                    st.caption(bi("⚡ Answered from cache (same Playbook version)", "⚡ 命中问答缓存（相同 Playbook 版本）"))
+                    st.markdown(response)
+                else:
+                    stream = agent.stream_playbook_answer(prompt, context_docs)
+                    response = st.write_stream(stream)
+                    # A refused or broken stream is never cached
+                    if not stream_failed(stream, response):
+                        answer_cache.put(prompt, context_docs, _version, response)
 
                 if context_docs:
                     with st.expander(bi("📝 Source: Retrieved document segments", "📝 溯源：查看检索到的原始文件段落")):
@@ -1,11 +1,11 @@
 import html
 import os
 
-import requests
 import streamlit as st
-from bs4 import BeautifulSoup
 
-from app_shared import bi, get_agent, _llm_cache_key
+from app_shared import bi, get_agent, job_progress_panel, _llm_cache_key
+from job_queue import JobQueue
+from knowledge_harvester import OFFICIAL_SOURCES, KnowledgeHarvester
 from knowledge_manager import KnowledgeManager
 
 st.markdown('<div class="main-title">🏗️ Knowledge Auto-Harvester / 知识库全自动收割机</div>', unsafe_allow_html=True)
@@ -13,6 +13,8 @@ st.markdown('<div class="sub-title">No more manual entry! Input authoritative po
 
 agent = get_agent(_key=_llm_cache_key())
 km = KnowledgeManager()
+harvester = KnowledgeHarvester(agent, km=km)
+job_queue = JobQueue()
 
 col1, col2 = st.columns([1, 1])
 
@@ -20,17 +22,8 @@ with col1:
     st.markdown("### 🕸️ Method 1: AI Web Auto-Crawl / AI 网页情报自动抓取")
     with st.form("auto_harvester_form", clear_on_submit=True):
         # 提供权威信息源快捷下拉填充
-        official_urls = {
-            "Custom input / 自定义输入 (paste URL below)": "",
-            "🇸🇬 新加坡 EP 签证 COMPASS 计分制 (解析版)": "https://sg.acclime.com/guides/singapore-employment-pass/",
-            "🇸🇬 新加坡 CPF (公积金) 费率政策 (普华永道解析)": "https://taxsummaries.pwc.com/singapore/individual/other-taxes",
-            "🇲🇾 马来西亚最新劳工法修正案 (法律解析)": "https://www.taypartners.com.my/employment-act-1955-key-amendments-2023/",
-            "🇲🇾 马来西亚外籍专才 EP 签证申请指南": "https://www.paulhypepage.my/guide/malaysia-employment-pass/",
-            "🇭🇰 香港'高才通'与专才签证对比 (毕马威指南)": "https://www.pwccn.com/zh/services/tax/publications/tax-news-mar2024-1.html",
-            "🇭🇰 香港雇佣条例与解雇规定 (Deacons)": "https://www.deacons.com/zh-hant/news-and-insights/publications/employment-law-in-hong-kong-frequently-asked-questions/",
-            "🇿🇦 南非外籍关键技能签证 (Critical Skills) 解析": "https://www.xpatweb.com/south-africa-critical-skills-visa/",
-            "🇿🇦 南非解雇与劳动法实务 (Bowmans)": "https://www.bowmanslaw.com/insights/employment/south-africa-terminating-employment/"
-        }
+        official_urls = {"Custom input / 自定义输入 (paste URL below)": ""}
+        official_urls.update({src["label"]: src["url"] for src in OFFICIAL_SOURCES})
 
         selected_preset = st.selectbox(bi("💡 Quick-select official source (auto-fill URL)", "💡 快速选择官方信息源 (自动填充链接)"), list(official_urls.keys()))
         default_url = official_urls[selected_preset]
@@ -39,6 +32,8 @@ with col1:
         region = st.selectbox(bi("Region", "归属区域"), ["Singapore", "Malaysia", "South Africa", "Middle East", "Global/General"])
         category = st.selectbox(bi("Category", "情报分类"), ["Official Law / 官方政策法规", "Market Intel / 薪酬与竞品情报", "Visa & Work Permit / 签证与工作许可", "Other / 其他避雷指南"])
 
+        force_recrawl = st.checkbox(bi("Re-extract even if the page is unchanged since the last crawl", "即使网页自上次抓取后未变化也重新萃取"), value=False)
+
         submitted_url = st.form_submit_button(bi("🤖 Crawl & Extract Knowledge", "🤖 启动爬虫并提取知识"), type="primary")
 
         if submitted_url:
@@ -48,38 +43,43 @@ with col1:
                 if not os.getenv("OPENAI_API_KEY"):
                     st.error(bi("LLM API Key missing, cannot clean content.", "缺失大模型 API Key，无法进行内容清洗。"))
                 else:
-                    with st.spinner(bi(f"Crawling {target_url}...", f"正在爬取 {target_url} 的内容...")):
-                        try:
-                            headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36', 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8', 'Accept-Language': 'en-US,en;q=0.5'}
-                            response = requests.get(target_url, headers=headers, timeout=10, verify=True)
-                            response.raise_for_status()
-
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            for script in soup(["script", "style", "nav", "footer"]):
-                                script.decompose()
-
-                            raw_text = soup.get_text(separator=' ', strip=True)
-
-                            if len(raw_text) < 50:
-                                st.error(bi("Page appears to block crawlers or has too little content.", "该网页似乎限制了爬虫或内容过少，未能抓取到有效文本。"))
-                            else:
-                                st.success(bi(f"✅ Crawl successful ({len(raw_text)} chars). Passing to AI for extraction...", f"✅ 网页爬取成功（共 {len(raw_text)} 字符），正在交由 AI 进行知识萃取..."))
-
-                                with st.spinner(bi("🤖 AI extracting core policy intelligence...", "🤖 AI 正在萃取核心政策情报...")):
-                                    ai_result = agent.extract_web_knowledge(target_url, region, category, raw_text)
-
-                                    if "EXTRACTION_FAILED" in ai_result:
-                                        st.warning(bi("AI found no actionable intelligence on this page.", "AI 未能在该网页中找到有价值的情报。"))
-                                    else:
-                                        tags = f"{region}, Auto-Harvested, {category.split(' ')[0]}"
-                                        _ok, _reason = km.add_fragment(region, category, ai_result, tags, source_url=target_url)
-                                        if _ok:
-                                            st.success(bi("🎉 Knowledge extracted & saved to database!", "🎉 知识萃取成功！已自动存入底层数据库。"))
-                                            st.info(bi("Extracted key content below:\n", "提取到的精华内容如下：\n") + ai_result)
-                                        else:
-                                            st.warning(bi("⚠️ Duplicate content detected — skipped (dedup protection).", "⚠️ 该内容与已有条目重复，已跳过（去重保护）。"))
-                        except Exception as e:
-                            st.error(bi(f"Crawl error: {str(e)}", f"抓取网页时发生错误: {str(e)}"))
+                    with st.spinner(bi(f"Crawling {target_url} and extracting knowledge...", f"正在爬取 {target_url} 并萃取知识...")):
+                        result = harvester.harvest_one({"url": target_url, "region": region, "category": category}, force=force_recrawl)
+                    if result["status"] == "error":
+                        st.error(bi(f"Crawl error: {result['error']}", f"抓取网页时发生错误: {result['error']}"))
+                    elif result["status"] == "unchanged":
+                        st.info(bi("♻️ Page unchanged since the last crawl — extraction skipped.", "♻️ 网页自上次抓取后未发生变化，已跳过重复萃取。"))
+                    elif result["status"] == "too_short":
+                        st.error(bi("Page appears to block crawlers or has too little content.", "该网页似乎限制了爬虫或内容过少，未能抓取到有效文本。"))
+                    elif result["status"] == "no_knowledge":
+                        st.warning(bi("AI found no actionable intelligence on this page.", "AI 未能在该网页中找到有价值的情报。"))
+                    elif result["status"] == "duplicate":
+                        st.warning(bi("⚠️ Duplicate content detected — skipped (dedup protection).", "⚠️ 该内容与已有条目重复，已跳过（去重保护）。"))
+                    else:
+                        st.success(bi(f"🎉 Knowledge extracted from {result['chars']} chars & saved to database!", f"🎉 知识萃取成功（网页共 {result['chars']} 字符）！已自动存入底层数据库。"))
+                        st.info(bi("Extracted key content below:\n", "提取到的精华内容如下：\n") + result["content"])
+
+    with st.expander(bi(f"⚡ Bulk-harvest all {len(OFFICIAL_SOURCES)} official sources", f"⚡ 一键并发收割全部 {len(OFFICIAL_SOURCES)} 个官方信息源")):
+        st.caption(bi("Pages are fetched concurrently (polite per-site limits) and extracted in parallel.", "并发抓取（按站点限速）并并行萃取，无需逐条点击。"))
+        if st.button(bi("🚀 Harvest all official sources", "🚀 收割全部官方信息源"), use_container_width=True):
+            if not os.getenv("OPENAI_API_KEY"):
+                st.error(bi("LLM API Key missing, cannot clean content.", "缺失大模型 API Key，无法进行内容清洗。"))
+            else:
+                _progress = st.progress(0.0)
+                _done = []
+
+                def _on_result(result):
+                    _done.append(result)
+                    _progress.progress(len(_done) / len(OFFICIAL_SOURCES), text=f"{len(_done)}/{len(OFFICIAL_SOURCES)} · {result['label']}")
+
+                results = harvester.harvest(OFFICIAL_SOURCES, on_result=_on_result)
+                _added = sum(1 for r in results if r["status"] == "added")
+                _unchanged = sum(1 for r in results if r["status"] == "unchanged")
+                st.success(bi(f"✅ {_added} new fragment(s) saved from {len(results)} sources ({_unchanged} unchanged, skipped).", f"✅ 共处理 {len(results)} 个信息源，新增 {_added} 条情报（{_unchanged} 个未变化已跳过）。"))
+                st.dataframe(
+                    [{"Source / 来源": r["label"], "Status / 状态": r["status"], "Chars / 字符": r["chars"], "Error / 错误": r["error"]} for r in results],
+                    use_container_width=True, hide_index=True,
+                )
 
     st.markdown("---")
     st.markdown("### 📝 Method 2: Manual Entry / 人工补充 (备用)")
@@ -100,16 +100,23 @@ with col2:
     st.markdown("### 🗂️ Knowledge Compilation Center / 知识库编译中心")
     st.info(bi("All harvested intelligence (AI or manual) must be compiled before the RAG engine can access it. Click below.", "无论是 AI 网页爬虫还是人工录入获取的情报，都需要点击下方按钮进行统一编译。编译后，RAG 大脑才能读取到这些最新知识。"))
 
-    if st.button(bi("🚀 Compile Playbook & Sync to RAG", "🚀 编译 Playbook 并同步至 RAG 引擎"), type="primary", use_container_width=True):
-        with st.spinner(bi("Compiling fragments into structured Markdown...", "正在将零散情报汇编为结构化 Markdown 库...")):
-            success = km.compile_to_markdown()
-            if success:
-                from document_parser import invalidate_rag_index
-                invalidate_rag_index()
-                st.success(bi("✅ Dynamic Playbook compiled! RAG engine refreshed — new knowledge active.", "✅ 动态 Playbook 编译完成！RAG 引擎已自动刷新，新知识立即生效。"))
-                st.info(bi("💡 You can now ask questions in Module 5 — no restart needed.", "💡 现在可直接前往【模块五】提问，无需重启系统。"))
-            else:
-                st.warning(bi("No intelligence in the database yet.", "目前数据库中没有任何情报。"))
+    _compile_job = job_queue.active_job("knowledge_compile")
+    if st.button(bi("🚀 Compile Playbook & Sync to RAG", "🚀 编译 Playbook 并同步至 RAG 引擎"), type="primary",
+                 use_container_width=True, disabled=_compile_job is not None):
+        st.session_state["m6_compile_job"] = job_queue.submit("knowledge_compile")
+        st.rerun()
+
+    _last_compile = job_queue.get(st.session_state["m6_compile_job"]) if st.session_state.get("m6_compile_job") else None
+    if _compile_job is not None:
+        job_progress_panel(_compile_job["id"])
+    elif _last_compile and _last_compile["status"] == "completed":
+        if _last_compile["result"]["compiled"]:
+            st.success(bi("✅ Dynamic Playbook compiled! RAG engine refreshed — new knowledge active.", "✅ 动态 Playbook 编译完成！RAG 引擎已自动刷新，新知识立即生效。"))
+            st.info(bi("💡 You can now ask questions in Module 5 — no restart needed.", "💡 现在可直接前往【模块五】提问，无需重启系统。"))
+        else:
+            st.warning(bi("No intelligence in the database yet.", "目前数据库中没有任何情报。"))
+    elif _last_compile and _last_compile["status"] == "failed":
+        st.error(bi(f"❌ Compilation failed: {_last_compile['error']}", f"❌ 编译失败: {_last_compile['error']}"))
 
     st.markdown("---")
     fragments = km.get_all_fragments()
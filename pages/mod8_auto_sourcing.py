@@ -5,9 +5,10 @@ from datetime import datetime, timedelta
 
 import streamlit as st
 
-from app_shared import bi, get_agent, _llm_cache_key
-from auto_sourcer import AutoSourcer, FREEZE_DAYS, PASS_THRESHOLD
+from app_shared import bi, get_agent, job_progress_panel, _llm_cache_key
+from auto_sourcer import AutoSourcer, FREEZE_DAYS, PASS_THRESHOLD, is_qualified
 from hc_manager import HCManager
+from job_queue import JobQueue, stage_uploads
 from talent_pool_manager import TalentPoolManager
 
 st.markdown(
@@ -26,6 +27,13 @@ agent = get_agent(_llm_cache_key())
 tpm = TalentPoolManager()
 sourcer = AutoSourcer(agent)
 hm = HCManager()
+job_queue = JobQueue()
+
+
+def _tracked_job(key: str) -> dict | None:
+    """The background job this session last submitted under key, if any."""
+    job_id = st.session_state.get(key)
+    return job_queue.get(job_id) if job_id else None
 
 # =====================================================================
 # Tabs
@@ -59,21 +67,13 @@ with tab_pool:
         accept_multiple_files=True,
         key="talent_pool_uploader",
     )
+    _import_job = _tracked_job("m8_import_job")
+    _importing = _import_job is not None and _import_job["status"] in ("queued", "running")
     if uploaded_files:
-        if st.button(bi("📥 Import to Talent Pool", "📥 导入简历库"), type="primary"):
-            with st.spinner(bi("Parsing and importing...", "正在解析和导入...")):
-                result = tpm.import_files(uploaded_files, agent)
-            st.success(
-                bi(
-                    f"Imported: {result['imported']}, Duplicates skipped: {result['skipped_dup']}, "
-                    f"Unsupported: {result['skipped_unsupported']}",
-                    f"已导入: {result['imported']}，重复跳过: {result['skipped_dup']}，"
-                    f"不支持格式: {result['skipped_unsupported']}",
-                )
+        if st.button(bi("📥 Import to Talent Pool", "📥 导入简历库"), type="primary", disabled=_importing):
+            st.session_state["m8_import_job"] = job_queue.submit(
+                "talent_import", {"directory": stage_uploads(uploaded_files), "cleanup": True},
             )
-            if result["errors"]:
-                for err in result["errors"]:
-                    st.error(err)
             st.rerun()
 
     # Directory scan
@@ -82,20 +82,28 @@ with tab_pool:
             bi("Directory path", "目录路径"),
             placeholder="/path/to/resumes/",
         )
-        if st.button(bi("Scan & Import", "扫描并导入")) and dir_path.strip():
-            with st.spinner(bi("Scanning directory...", "正在扫描目录...")):
-                result = tpm.import_from_directory(dir_path.strip(), agent)
-            st.success(
-                bi(
-                    f"Imported: {result['imported']}, Duplicates: {result['skipped_dup']}",
-                    f"已导入: {result['imported']}，重复: {result['skipped_dup']}",
-                )
-            )
-            if result["errors"]:
-                for err in result["errors"]:
-                    st.error(err)
+        if st.button(bi("Scan & Import", "扫描并导入"), disabled=_importing) and dir_path.strip():
+            st.session_state["m8_import_job"] = job_queue.submit("talent_import", {"directory": dir_path.strip()})
             st.rerun()
 
+    # Import runs in the background; navigating away does not stop it
+    if _importing:
+        job_progress_panel(_import_job["id"])
+    elif _import_job and _import_job["status"] == "completed":
+        result = _import_job["result"]
+        st.success(
+            bi(
+                f"Imported: {result['imported']}, Duplicates skipped: {result['skipped_dup']}, "
+                f"Unsupported: {result['skipped_unsupported']}",
+                f"已导入: {result['imported']}，重复跳过: {result['skipped_dup']}，"
+                f"不支持格式: {result['skipped_unsupported']}",
+            )
+        )
+        for err in result["errors"]:
+            st.error(err)
+    elif _import_job and _import_job["status"] == "failed":
+        st.error(bi(f"❌ Import failed: {_import_job['error']}", f"❌ 导入失败: {_import_job['error']}"))
+
     # Talent list with evaluation status
     st.markdown(f"### {bi('Resume Library', '简历库列表')}")
     all_talents = tpm.get_all_with_eval_status()
@@ -250,45 +258,48 @@ with tab_run:
         )
     )
 
+    # One sourcing run at a time across all users; it runs as a background job
+    _active_run = job_queue.active_job("auto_sourcing")
+    _run_blocked = not _approved_hcs or not _all_talents or _active_run is not None
     _rc1, _rc2 = st.columns(2)
     with _rc1:
         if st.button(
             bi("🚀 Run Incremental Scan", "🚀 运行增量扫描"),
             type="primary",
             use_container_width=True,
-            disabled=(not _approved_hcs or not _all_talents),
+            disabled=_run_blocked,
         ):
-            with st.spinner(bi("Running auto sourcing (incremental)...", "正在运行自动寻源（增量）...")):
-                run_id = sourcer.run(force_full=False)
-            _run = next((r for r in sourcer.get_run_history() if r["id"] == run_id), None)
-            if _run:
-                st.success(
-                    bi(
-                        f"Completed! Scanned {_run['talent_scanned']} resumes, found {_run['matches_found']} matches "
-                        f"(≥{PASS_THRESHOLD}pts) in {_run['duration_seconds']}s.",
-                        f"完成！扫描 {_run['talent_scanned']} 份简历，找到 {_run['matches_found']} 个匹配"
-                        f"（≥{PASS_THRESHOLD}分），耗时 {_run['duration_seconds']}秒。",
-                    )
-                )
+            st.session_state["m8_run_job"] = job_queue.submit("auto_sourcing", {"force_full": False})
             st.rerun()
     with _rc2:
         if st.button(
             bi("🔄 Run Full Scan", "🔄 运行全量扫描"),
             use_container_width=True,
-            disabled=(not _approved_hcs or not _all_talents),
+            disabled=_run_blocked,
         ):
-            with st.spinner(bi("Running auto sourcing (full)...", "正在运行自动寻源（全量）...")):
-                run_id = sourcer.run(force_full=True)
-            _run = next((r for r in sourcer.get_run_history() if r["id"] == run_id), None)
-            if _run:
-                st.success(
-                    bi(
-                        f"Completed! Scanned {_run['talent_scanned']} resumes, found {_run['matches_found']} matches.",
-                        f"完成！扫描 {_run['talent_scanned']} 份简历，找到 {_run['matches_found']} 个匹配。",
-                    )
-                )
+            st.session_state["m8_run_job"] = job_queue.submit("auto_sourcing", {"force_full": True})
             st.rerun()
 
+    _run_job = _tracked_job("m8_run_job")
+    if _active_run is not None:
+        job_progress_panel(_active_run["id"])
+    elif _run_job and _run_job["status"] == "completed":
+        _run = next((r for r in sourcer.get_run_history() if r["id"] == _run_job["result"]["run_id"]), None)
+        if _run:
+            st.success(
+                bi(
+                    f"Completed! Scanned {_run['talent_scanned']} resumes, found {_run['matches_found']} matches "
+                    f"(≥{PASS_THRESHOLD}pts) in {_run['duration_seconds']}s.",
+                    f"完成！扫描 {_run['talent_scanned']} 份简历，找到 {_run['matches_found']} 个匹配"
+                    f"（≥{PASS_THRESHOLD}分），耗时 {_run['duration_seconds']}秒。",
+                )
+            )
+    elif _run_job and _run_job["status"] == "failed":
+        st.error(bi(f"❌ Sourcing run failed: {_run_job['error']}", f"❌ 寻源运行失败: {_run_job['error']}"))
+    elif _run_job and _run_job["status"] == "cancelled":
+        st.info(bi("Sourcing run cancelled. Candidates scored before the cancel are kept in the shortlist.",
+                   "寻源运行已取消。取消前已评分的候选人保留在短名单中。"))
+
     # Run history
     st.markdown(f"### {bi('Run History', '运行历史')}")
     _runs = sourcer.get_run_history()
@@ -296,7 +307,7 @@ with tab_run:
         st.info(bi("No sourcing runs yet.", "暂无运行记录。"))
     else:
         for _r in _runs[:20]:
-            _status_color = {"completed": "#10B981", "running": "#F59E0B", "failed": "#DC2626"}.get(_r["status"], "#64748B")
+            _status_color = {"completed": "#10B981", "partial": "#8B5CF6", "running": "#F59E0B", "failed": "#DC2626"}.get(_r["status"], "#64748B")
             st.markdown(
                 f"<div style='background:#fff;border:1px solid #E2E8F0;border-left:4px solid {_status_color};"
                 f"border-radius:6px;padding:10px 14px;margin-bottom:4px;'>"
@@ -307,7 +318,9 @@ with tab_run:
                 f"padding:2px 8px;border-radius:10px;font-size:0.72rem;'>{_r['run_type']}</span></div>"
                 f"<div style='color:#64748B;font-size:0.82rem;margin-top:4px;'>"
                 f"HC: {_r['hc_count']} · Scanned: {_r['talent_scanned']} · "
-                f"Matches: {_r['matches_found']} · {_r['duration_seconds']}s</div></div>",
+                f"Matches: {_r['matches_found']} · {_r['duration_seconds']}s"
+                + (f" · {_r['llm_calls']} calls · ${_r['cost_usd'] or 0:.2f}" if _r.get("llm_calls") is not None else "")
+                + "</div></div>",
                 unsafe_allow_html=True,
             )
 
@@ -355,7 +368,7 @@ with tab_shortlist:
         ))
     else:
         # Summary counts
-        _qualified_count = sum(1 for s in shortlist if s.get("score", 0) >= PASS_THRESHOLD)
+        _qualified_count = sum(1 for s in shortlist if is_qualified(s.get("score", 0), s.get("verdict", "")))
         _disqualified_count = len(shortlist) - _qualified_count
         st.markdown(
             bi(
@@ -366,10 +379,14 @@ with tab_shortlist:
 
         for idx, sl in enumerate(shortlist):
             _score = sl.get("score", 0)
-            _is_qualified = _score >= PASS_THRESHOLD
+            _is_qualified = is_qualified(_score, sl.get("verdict", ""))
             _score_color = "#10B981" if _score >= 80 else "#F59E0B" if _score >= 60 else "#DC2626"
             _verdict = sl.get("verdict", "")
             _disp = sl.get("disposition", "Pending")
+            # Borderline candidates re-scored by the strong model show both tiers
+            _tiers = ""
+            if sl.get("strong_score") is not None and sl.get("fast_score") is not None:
+                _tiers = f" · Fast {sl['fast_score']:.0f} → Strong {sl['strong_score']:.0f}"
 
             # Build status badges
             _badges = ""
@@ -398,7 +415,7 @@ with tab_shortlist:
                 f"{' · ' + html.escape(sl.get('email', '')) if sl.get('email') else ''}"
                 f"{' · LinkedIn' if sl.get('talent_linkedin') else ''}"
                 f"</div>"
-                f"<div style='color:#94A3B8;font-size:0.78rem;margin-top:2px;'>Verdict: {html.escape(_verdict)}</div>"
+                f"<div style='color:#94A3B8;font-size:0.78rem;margin-top:2px;'>Verdict: {html.escape(_verdict)}{html.escape(_tiers)}</div>"
                 f"</div>",
                 unsafe_allow_html=True,
             )
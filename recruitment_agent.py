@@ -1,16 +1,21 @@
 import io
+import json
 import ssl
 import logging
-import httpx
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from typing import Literal
 from pypdf import PdfReader
 from openai import OpenAI, RateLimitError, APITimeoutError, APIConnectionError
 import os
+from hedging import Hedger
+from http_client import get_http_client, http_timeout
+from resume_preprocessor import PAGE_SEPARATOR
 
 # 内网自签证书：跳过 SSL 验证
-_insecure_client = httpx.Client(verify=False)
 ssl._create_default_https_context = ssl._create_unverified_context
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log, after_log
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,166 @@ def get_llm_usage_log() -> list[dict]:
     return _llm_usage_log[-50:]
 
 
+# Resume evaluation instructions + rubric. Kept byte-identical across calls so that,
+# together with the JD, it forms a cacheable prompt prefix (see _resume_eval_messages).
+RESUME_RUBRIC = """
+You are an exceptionally rigorous and objective technical interviewer at Alauda.
+Evaluate the candidate resume(s) (given last) against the JD using the hard quantitative scoring rubric below.
+No gut-feeling scores — strict mathematical addition only. Show your reasoning per dimension.
+
+[MANDATORY SCORING RUBRIC — 100 points total]:
+
+1. Mission Match (0–40 pts)
+   - 40 pts: End-to-end ownership of solving an identical business problem
+             (e.g., led OpenShift replacement, drove $1M+ enterprise migrations as DRI)
+   - 30 pts: Led similar projects with measurable outcomes, slightly narrower scope
+   - 20 pts: Participated in similar projects but was NOT the decision-maker or lead
+   - 10 pts: Tangentially related background; relevant industry but wrong role type
+   -  0 pts: No relevant B2B enterprise delivery experience whatsoever
+
+2. Tech Stack Depth (0–40 pts)
+   - 40 pts: Expert-level architecture depth in ALL required technologies
+             (designs systems, not just operates them; K8s internals, CNI, custom controllers)
+   - 30 pts: Strong hands-on across most required tech; architect-level in core areas
+   - 20 pts: Hands-on K8s/cloud but limited to application/ops layer — not architecture depth
+   - 10 pts: Basic exposure; familiar with the stack but lacks production-scale evidence
+   -  0 pts: Tech stack severely misaligned with JD requirements
+
+3. Deal Breaker Avoidance (0 or 20 pts — binary, NO partial credit)
+   - 20 pts: Triggers ZERO deal breakers (B2B confirmed, English fluency evident, travel acceptable)
+   -  0 pts: Violates ANY single deal breaker → automatic disqualification flag, stop here
+"""
+
+RESUME_MARKDOWN_FORMAT = """
+[OUTPUT FORMAT — strictly follow this structure]:
+
+### 📊 Quantified Assessment
+- **Total Score**: [sum of 3 dimensions] / 100
+- **Score Breakdown**:
+  - Mission Match: [X] / 40 — Reasoning: ...
+  - Tech Stack Depth: [X] / 40 — Reasoning: ...
+  - Deal Breaker Avoidance: [X] / 20 — Reasoning: ...
+- **Verdict**: Strong Match (≥80) | Borderline Pass (60–79) | Disqualified (<60, or any deal breaker violated)
+
+### ✨ Core Highlights
+- [1–2 genuine strengths directly aligned with the JD Mission and Tech Stack]
+- (Write "No standout highlights identified." if none exist)
+
+### 🚨 Red Flags & Deal Breaker Warnings
+- [Explicitly state whether any deal breaker is triggered — bold it if yes]
+- [Flag vague or likely-inflated language: e.g., wrote "managed" but never "architected"]
+
+### 🎯 Phone Screen Probing Questions
+- [2 sharp, targeted questions to verify suspicious claims or fill evidence gaps]
+
+[BILINGUAL FORMAT]:
+Output the full evaluation in English first using the format above. Then add a `---` divider, followed by a complete Chinese translation of the entire evaluation (scores, reasoning, highlights, red flags, and probing questions).
+"""
+
+RESUME_BATCH_FORMAT = """
+[OUTPUT FORMAT — JSON only]:
+Score every candidate independently; never compare candidates with each other.
+Output ONLY a valid JSON object — no explanation, no markdown fences:
+{"results": [{"candidate_id": "<id from the candidate tag>",
+              "mission_match": <0-40>, "tech_stack_depth": <0-40>, "deal_breaker_avoidance": <0 or 20>,
+              "total": <sum of the 3 dimensions>,
+              "verdict": "Strong Match" | "Borderline Pass" | "Disqualified",
+              "rationale": "<at most 3 sentences, English>"}]}
+"""
+
+RESUME_JSON_FORMAT = """
+[OUTPUT FORMAT — JSON only]:
+Output ONLY a valid JSON object — no explanation, no markdown fences:
+{"mission_match": <0-40>, "tech_stack_depth": <0-40>, "deal_breaker_avoidance": <0 or 20>,
+ "total": <sum of the 3 dimensions>,
+ "verdict": "Strong Match" | "Borderline Pass" | "Disqualified",
+ "rationale": "<at most 3 sentences, English: key evidence and any deal breaker triggered>"}
+"""
+
+# Verdict bands on the 100-point rubric
+STRONG_MATCH_SCORE = 80
+BORDERLINE_PASS_SCORE = 60
+
+
+def verdict_for(total: float, deal_breaker_violated: bool = False) -> str:
+    """Verdict band for a total score; any deal-breaker violation disqualifies outright."""
+    if deal_breaker_violated:
+        return "Disqualified"
+    if total >= STRONG_MATCH_SCORE:
+        return "Strong Match"
+    if total >= BORDERLINE_PASS_SCORE:
+        return "Borderline Pass"
+    return "Disqualified"
+
+
+def _strip_code_fences(content: str) -> str:
+    """Strip a markdown code fence if the model wrapped its JSON output in one."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content[content.find("\n") + 1:]
+        content = content[:content.rfind("```")].strip()
+    return content
+
+
+def _cached_tokens(usage) -> int:
+    """Prompt tokens served from the provider's prompt cache (0 when not reported).
+
+    OpenAI-compatible APIs report ``prompt_tokens_details.cached_tokens``;
+    Anthropic-style gateways report ``cache_read_input_tokens``.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    for value in (getattr(details, "cached_tokens", None), getattr(usage, "cache_read_input_tokens", None)):
+        if isinstance(value, int) and value > 0:
+            return value
+    return 0
+
+
+class ResumeScore(BaseModel):
+    """Structured result of the 100-point resume rubric.
+
+    ``total`` and ``verdict`` are recomputed from the dimension scores, so an
+    arithmetic slip by the model cannot produce an inconsistent record. A
+    ``deal_breaker_avoidance`` of 0 is a violated deal breaker and always
+    yields "Disqualified", whatever the total.
+    """
+    candidate_id: str = ""
+    mission_match: int = Field(ge=0, le=40)
+    tech_stack_depth: int = Field(ge=0, le=40)
+    deal_breaker_avoidance: Literal[0, 20]
+    total: int = 0
+    verdict: Literal["Strong Match", "Borderline Pass", "Disqualified"] = "Disqualified"
+    rationale: str = ""
+
+    @model_validator(mode="after")
+    def _recompute_total(self) -> "ResumeScore":
+        self.total = self.mission_match + self.tech_stack_depth + self.deal_breaker_avoidance
+        self.verdict = verdict_for(self.total, deal_breaker_violated=self.deal_breaker_avoidance == 0)
+        return self
+
+    def render_markdown(self) -> str:
+        """Render in the same layout as the free-form evaluation's assessment section."""
+        md = f"""### 📊 Quantified Assessment
+- **Total Score**: {self.total} / 100
+- **Score Breakdown**:
+  - Mission Match: {self.mission_match} / 40
+  - Tech Stack Depth: {self.tech_stack_depth} / 40
+  - Deal Breaker Avoidance: {self.deal_breaker_avoidance} / 20
+- **Verdict**: {self.verdict}
+"""
+        if self.rationale:
+            md += f"\n### 📝 Rationale\n{self.rationale}\n"
+        return md
+
+
+def parse_resume_score(content: str) -> ResumeScore:
+    """Validate a structured-scoring completion; raises pydantic.ValidationError on format drift."""
+    return ResumeScore.model_validate_json(_strip_code_fences(content))
+
+
+class BatchResumeScores(BaseModel):
+    results: list[ResumeScore]
+
+
 class TranslatedHCFields(BaseModel):
     role_title: str
     location: str
@@ -37,7 +202,28 @@ class TranslatedHCFields(BaseModel):
     deal_breakers: str
     selling_point: str
 
+class TextStream:
+    """Text deltas of one streamed generation, iterable once (e.g. by st.write_stream).
+
+    A refusal or error is still yielded as text for display, and ``failed`` is
+    set alongside it so callers never have to inspect the generated text.
+    """
+
+    def __init__(self, produce: Callable[["TextStream"], Iterator[str]]):
+        self.failed = False
+        self._deltas = produce(self)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._deltas
+
 class RecruitmentAgent:
+    # Optional tail-latency hedging for _call_llm (LLM_HEDGING=on)
+    hedger: Hedger | None = None
+    # Optional usage_listener(model, prompt_tokens, completion_tokens), e.g. a sourcing run budget
+    usage_listener: Callable[[str, int, int], None] | None = None
+    # Optional hedge_guard(model) -> bool vetoing hedged duplicates, e.g. a sourcing run budget
+    hedge_guard: Callable[[str], bool] | None = None
+
     def __init__(self):
         self.api_key = os.environ.get("OPENAI_API_KEY")
         self.base_url = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
@@ -46,7 +232,14 @@ class RecruitmentAgent:
         # Strong model: JD generation, interview scorecard, knowledge extraction
         # Falls back to self.model if STRONG_MODEL is not configured
         self.strong_model = os.environ.get("STRONG_MODEL", self.model)
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url, http_client=_insecure_client) if self.api_key else None
+        # Provider prompt-cache markers: "auto" (Claude models only), "on" or "off"
+        self.prompt_cache = os.environ.get("PROMPT_CACHE", "auto").strip().lower()
+        self.hedger = Hedger.from_env()
+        # Shared pooled client (self-signed intranet gateways: no TLS verification)
+        self.client = OpenAI(
+            api_key=self.api_key, base_url=self.base_url,
+            http_client=get_http_client(verify=False), timeout=http_timeout(),
+        ) if self.api_key else None
 
         self.system_prompt = """
 # Role: Global Elite Tech Recruiter & Recruitment Systems Architect
@@ -82,37 +275,131 @@ All outputs MUST be bilingual: English first (primary, authoritative), then a `-
         before_sleep=before_sleep_log(logger, logging.WARNING),
         after=after_log(logger, logging.DEBUG),
     )
-    def _call_llm(self, *, model: str, messages: list[dict], temperature: float):
-        """Call the LLM with automatic retry on transient errors."""
+    def _call_llm(self, *, model: str, messages: list[dict], temperature: float, kind: str = "default"):
+        """Call the LLM with automatic retry on transient errors.
+
+        ``kind`` names the request type; the hedger keeps one latency window per (model, kind).
+        """
         attempt = self._call_llm.retry.statistics.get("attempt_number", 1)
         if attempt > 1:
             logger.warning("LLM call attempt %d/3 (model=%s)", attempt, model)
-        resp = self.client.chat.completions.create(
+
+        def _create():
+            return self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+            )
+
+        if self.hedger is not None:
+            # The losing duplicate is still billed, so its usage goes to the ledger too
+            guard = self.hedge_guard
+            resp = self.hedger.call(
+                _create, on_discard=lambda r: self._record_usage(model, getattr(r, "usage", None)),
+                may_hedge=(lambda: guard(model)) if guard is not None else None, model=model, kind=kind,
+            )
+        else:
+            resp = _create()
+        self._record_usage(model, getattr(resp, "usage", None))
+        return resp
+
+    def _record_usage(self, model: str, usage) -> None:
+        """Log token usage and append it to the in-memory usage ledger."""
+        if not usage:
+            return
+        logger.info(
+            "LLM usage: model=%s prompt_tokens=%d completion_tokens=%d total=%d cached=%d",
+            model,
+            getattr(usage, "prompt_tokens", 0),
+            getattr(usage, "completion_tokens", 0),
+            getattr(usage, "total_tokens", 0),
+            _cached_tokens(usage),
+        )
+        _llm_usage_log.append({
+            "model": model,
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+            "completion_tokens": getattr(usage, "completion_tokens", 0),
+            "total_tokens": getattr(usage, "total_tokens", 0),
+            "cached_tokens": _cached_tokens(usage),
+            "timestamp": datetime.now().strftime("%H:%M:%S"),
+        })
+        if self.usage_listener is not None:
+            self.usage_listener(model, getattr(usage, "prompt_tokens", 0) or 0,
+                                getattr(usage, "completion_tokens", 0) or 0)
+
+    @retry(
+        retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        reraise=True,
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        after=after_log(logger, logging.DEBUG),
+    )
+    def _open_stream(self, *, model: str, messages: list[dict], temperature: float):
+        """Open a streaming completion. Retries cover connection setup only, not a broken stream."""
+        return self.client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
         )
-        usage = getattr(resp, "usage", None)
-        if usage:
-            logger.info(
-                "LLM usage: model=%s prompt_tokens=%d completion_tokens=%d total=%d",
-                model,
-                getattr(usage, "prompt_tokens", 0),
-                getattr(usage, "completion_tokens", 0),
-                getattr(usage, "total_tokens", 0),
-            )
-            _llm_usage_log.append({
-                "model": model,
-                "prompt_tokens": getattr(usage, "prompt_tokens", 0),
-                "completion_tokens": getattr(usage, "completion_tokens", 0),
-                "total_tokens": getattr(usage, "total_tokens", 0),
-                "timestamp": __import__("datetime").datetime.now().strftime("%H:%M:%S"),
-            })
-        return resp
+
+    def _stream_llm(self, *, model: str, messages: list[dict], temperature: float) -> Iterator[str]:
+        """Yield content deltas as they arrive; usage (sent in the final chunk) goes to the ledger."""
+        usage = None
+        for chunk in self._open_stream(model=model, messages=messages, temperature=temperature):
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        self._record_usage(model, usage)
+
+    def _stream_request(self, request: dict | str, error_prefix: str) -> TextStream:
+        """Stream a request built by one of the *_request helpers, yielding warnings/errors as text."""
+        def _deltas(stream: TextStream) -> Iterator[str]:
+            if isinstance(request, str):
+                stream.failed = True
+                yield request
+                return
+            emitted = False
+            try:
+                for delta in self._stream_llm(**request):
+                    emitted = True
+                    yield delta
+            except Exception as e:
+                # Keep whatever was already streamed; append the error after it
+                stream.failed = True
+                yield f"{chr(10) * 2 if emitted else ''}{error_prefix}: {str(e)}"
+
+        return TextStream(_deltas)
+
+    def _complete_request(self, request: dict | str, error_prefix: str, kind: str) -> str:
+        if isinstance(request, str):
+            return request
+        try:
+            response = self._call_llm(**request, kind=kind)
+            return response.choices[0].message.content
+        except Exception as e:
+            return f"{error_prefix}: {str(e)}"
 
     def generate_jd_and_xray(self, role_title: str, location: str, mission: str,
                              tech_stack: str, deal_breakers: str, selling_point: str) -> str:
         """Generate high-conversion JD + X-Ray Boolean search strings."""
+        request = self._jd_request(role_title, location, mission, tech_stack, deal_breakers, selling_point)
+        return self._complete_request(request, "❌ Generation failed / 生成失败", "jd")
+
+    def stream_jd_and_xray(self, role_title: str, location: str, mission: str,
+                           tech_stack: str, deal_breakers: str, selling_point: str) -> TextStream:
+        """Streaming variant of generate_jd_and_xray — a TextStream of text deltas."""
+        request = self._jd_request(role_title, location, mission, tech_stack, deal_breakers, selling_point)
+        return self._stream_request(request, "❌ Generation failed / 生成失败")
+
+    def _jd_request(self, role_title: str, location: str, mission: str,
+                    tech_stack: str, deal_breakers: str, selling_point: str) -> dict | str:
+        """Build the JD request kwargs, or return a warning string if it cannot be sent."""
         if not self.client:
             return "⚠️ OPENAI_API_KEY not configured. Please set it in the .env file. / 尚未配置 OPENAI_API_KEY，请在 .env 文件中设置。"
 
@@ -152,21 +439,24 @@ HR staff can easily modify and reuse them.
 Output the full JD and annotations in English first. Then add a `---` divider, followed by a complete Chinese translation of the JD prose and annotations. Boolean search strings inside code blocks are universal — do NOT translate them; only translate the surrounding prose, headings, and annotations.
 """
 
-        try:
-            response = self._call_llm(
-                model=self.strong_model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"❌ Generation failed / 生成失败: {str(e)}"
+        return {
+            "model": self.strong_model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+        }
 
     def generate_interview_scorecard(self, jd_text: str) -> str:
         """Generate a BARS structured interview scorecard + STAR question bank from the JD."""
+        return self._complete_request(self._scorecard_request(jd_text), "❌ Generation failed / 生成失败", "scorecard")
+
+    def stream_interview_scorecard(self, jd_text: str) -> TextStream:
+        """Streaming variant of generate_interview_scorecard — a TextStream of text deltas."""
+        return self._stream_request(self._scorecard_request(jd_text), "❌ Generation failed / 生成失败")
+
+    def _scorecard_request(self, jd_text: str) -> dict | str:
         if not self.client:
             return "⚠️ OPENAI_API_KEY not configured. / 尚未配置 OPENAI_API_KEY。"
 
@@ -198,21 +488,26 @@ For each dimension provide:
 Output the full scorecard and STAR questions in English first. Then add a `---` divider, followed by a complete Chinese translation of all prose, table headers, anchor descriptions, and questions.
 """
 
-        try:
-            response = self._call_llm(
-                model=self.strong_model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"❌ Generation failed / 生成失败: {str(e)}"
+        return {
+            "model": self.strong_model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2,
+        }
 
     def generate_outreach_message(self, jd_text: str, candidate_info: str) -> str:
         """Generate high-conversion cold outreach (Email + LinkedIn InMail)."""
+        request = self._outreach_request(jd_text, candidate_info)
+        return self._complete_request(request, "❌ Generation failed / 生成失败", "outreach")
+
+    def stream_outreach_message(self, jd_text: str, candidate_info: str) -> TextStream:
+        """Streaming variant of generate_outreach_message — a TextStream of text deltas."""
+        request = self._outreach_request(jd_text, candidate_info)
+        return self._stream_request(request, "❌ Generation failed / 生成失败")
+
+    def _outreach_request(self, jd_text: str, candidate_info: str) -> dict | str:
         if not self.client:
             return "⚠️ OPENAI_API_KEY not configured. / 尚未配置 OPENAI_API_KEY。"
 
@@ -251,18 +546,14 @@ The outreach Email and InMail MUST remain in English only (they will be sent to
 After both versions, add a `---` divider, then provide a **Chinese HR Summary (中文摘要给 HR)** — a concise 5-8 bullet summary in Chinese explaining: the key personalization hooks used, the value proposition highlighted, and the CTA strategy. This is NOT a full translation — it's a quick brief for internal Chinese-speaking HR staff.
 """
 
-        try:
-            response = self._call_llm(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"❌ Generation failed / 生成失败: {str(e)}"
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.5,
+        }
 
     def evaluate_resume(self, jd_text: str, resume_text: str) -> str:
         """Evaluate resume against JD using a hard 100-point quantitative rubric."""
@@ -273,83 +564,146 @@ After both versions, add a `---` divider, then provide a **Chinese HR Summary (
         if total_len > MAX_INPUT_CHARS:
             return f"⚠️ Input too long ({total_len:,} chars). Please shorten to under {MAX_INPUT_CHARS:,} chars. / 输入过长（{total_len:,} 字符），请缩短至 {MAX_INPUT_CHARS:,} 字符以内。"
 
-        prompt = f"""
-You are an exceptionally rigorous and objective technical interviewer at Alauda.
-Evaluate this candidate's resume against the JD using the hard quantitative scoring rubric below.
-No gut-feeling scores — strict mathematical addition only. Show your reasoning per dimension.
+        try:
+            response = self._call_llm(
+                model=self.model,
+                messages=self._resume_eval_messages(jd_text, resume_text),
+                temperature=0.0,
+                kind="resume_eval",
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            return f"❌ Resume evaluation failed / 简历评估失败: {str(e)}"
 
-[Job Description (JD)]:
+    def evaluate_resume_structured(self, jd_text: str, resume_text: str, model: str | None = None) -> ResumeScore:
+        """Score a resume with the 100-point rubric as validated JSON (no Markdown to parse).
+
+        Much shorter completion than evaluate_resume; render the result with
+        ResumeScore.render_markdown(). Raises on a missing client, oversized
+        input or a response that fails validation — never a silent zero.
+        """
+        if not self.client:
+            raise RuntimeError("OPENAI_API_KEY not configured")
+        total_len = len(jd_text) + len(resume_text)
+        if total_len > MAX_INPUT_CHARS:
+            raise ValueError(f"Input too long ({total_len:,} chars)")
+        response = self._call_llm(**self.resume_score_request(jd_text, resume_text, model), kind="resume_score")
+        return parse_resume_score(response.choices[0].message.content)
+
+    def resume_score_request(self, jd_text: str, resume_text: str, model: str | None = None) -> dict:
+        """Chat-completion kwargs for structured scoring — also the body of an offline batch request."""
+        model = model or self.model
+        return {
+            "model": model,
+            "messages": self._structured_eval_messages(jd_text, resume_text, model),
+            "temperature": 0.0,
+        }
+
+    def evaluate_resumes_batch(self, jd_text: str, resumes: dict[str, str]) -> dict[str, ResumeScore]:
+        """Score several resumes against one JD in a single request.
+
+        ``resumes`` maps caller ids to resume text. Returns scores keyed by the
+        same ids; candidates the model skipped are simply absent. Raises on a
+        missing client, an oversized batch or a response that fails validation,
+        so callers can fall back to evaluate_resume per candidate.
+        """
+        if not self.client:
+            raise RuntimeError("OPENAI_API_KEY not configured")
+        total_len = len(jd_text) + sum(len(t) for t in resumes.values())
+        if total_len > MAX_INPUT_CHARS:
+            raise ValueError(f"Batch input too long ({total_len:,} chars)")
+
+        # Short positional ids keep the prompt compact and avoid leaking internal ids
+        aliases = {f"C{i}": key for i, key in enumerate(resumes, 1)}
+        response = self._call_llm(
+            model=self.model,
+            messages=self._batch_eval_messages(
+                jd_text, {alias: resumes[key] for alias, key in aliases.items()}
+            ),
+            temperature=0.0,
+            kind="resume_batch",
+        )
+        parsed = BatchResumeScores.model_validate_json(
+            _strip_code_fences(response.choices[0].message.content)
+        )
+        scores: dict[str, ResumeScore] = {}
+        for score in parsed.results:
+            key = aliases.get(score.candidate_id)
+            if key is not None and key not in scores:
+                scores[key] = score
+        return scores
+
+    def _use_prompt_cache_markers(self, model: str) -> bool:
+        if self.prompt_cache in ("on", "true", "1"):
+            return True
+        if self.prompt_cache in ("off", "false", "0"):
+            return False
+        # OpenAI caches shared prefixes automatically; Claude needs explicit breakpoints
+        return "claude" in model.lower()
+
+    def _resume_eval_messages(self, jd_text: str, resume_text: str, model: str | None = None) -> list[dict]:
+        """Messages with a stable prefix (system + rubric + JD) and the resume as the only varying suffix.
+
+        Every evaluation against the same HC shares the prefix byte-for-byte, so
+        providers with prefix caching bill and process it as cached input.
+        """
+        suffix = f"""
+[Candidate Resume (Parsed Text)]:
 <user_input>
-{jd_text}
+{resume_text}
 </user_input>
+"""
+        return self._cacheable_messages(RESUME_RUBRIC + RESUME_MARKDOWN_FORMAT, jd_text, suffix, model)
 
+    def _structured_eval_messages(self, jd_text: str, resume_text: str, model: str | None = None) -> list[dict]:
+        suffix = f"""
 [Candidate Resume (Parsed Text)]:
 <user_input>
 {resume_text}
 </user_input>
+"""
+        return self._cacheable_messages(RESUME_RUBRIC + RESUME_JSON_FORMAT, jd_text, suffix, model)
 
-[MANDATORY SCORING RUBRIC — 100 points total]:
-
-1. Mission Match (0–40 pts)
-   - 40 pts: End-to-end ownership of solving an identical business problem
-             (e.g., led OpenShift replacement, drove $1M+ enterprise migrations as DRI)
-   - 30 pts: Led similar projects with measurable outcomes, slightly narrower scope
-   - 20 pts: Participated in similar projects but was NOT the decision-maker or lead
-   - 10 pts: Tangentially related background; relevant industry but wrong role type
-   -  0 pts: No relevant B2B enterprise delivery experience whatsoever
-
-2. Tech Stack Depth (0–40 pts)
-   - 40 pts: Expert-level architecture depth in ALL required technologies
-             (designs systems, not just operates them; K8s internals, CNI, custom controllers)
-   - 30 pts: Strong hands-on across most required tech; architect-level in core areas
-   - 20 pts: Hands-on K8s/cloud but limited to application/ops layer — not architecture depth
-   - 10 pts: Basic exposure; familiar with the stack but lacks production-scale evidence
-   -  0 pts: Tech stack severely misaligned with JD requirements
-
-3. Deal Breaker Avoidance (0 or 20 pts — binary, NO partial credit)
-   - 20 pts: Triggers ZERO deal breakers (B2B confirmed, English fluency evident, travel acceptable)
-   -  0 pts: Violates ANY single deal breaker → automatic disqualification flag, stop here
-
-[OUTPUT FORMAT — strictly follow this structure]:
-
-### 📊 Quantified Assessment
-- **Total Score**: [sum of 3 dimensions] / 100
-- **Score Breakdown**:
-  - Mission Match: [X] / 40 — Reasoning: ...
-  - Tech Stack Depth: [X] / 40 — Reasoning: ...
-  - Deal Breaker Avoidance: [X] / 20 — Reasoning: ...
-- **Verdict**: Strong Match (≥80) | Borderline Pass (60–79) | Disqualified (<60)
-
-### ✨ Core Highlights
-- [1–2 genuine strengths directly aligned with the JD Mission and Tech Stack]
-- (Write "No standout highlights identified." if none exist)
-
-### 🚨 Red Flags & Deal Breaker Warnings
-- [Explicitly state whether any deal breaker is triggered — bold it if yes]
-- [Flag vague or likely-inflated language: e.g., wrote "managed" but never "architected"]
-
-### 🎯 Phone Screen Probing Questions
-- [2 sharp, targeted questions to verify suspicious claims or fill evidence gaps]
+    def _batch_eval_messages(self, jd_text: str, resumes: dict[str, str], model: str | None = None) -> list[dict]:
+        """Same prefix layout as _resume_eval_messages, with several tagged resumes as the suffix."""
+        blocks = "".join(
+            f'\n<candidate id="{cid}">\n<user_input>\n{text}\n</user_input>\n</candidate>\n'
+            for cid, text in resumes.items()
+        )
+        suffix = f"\n[Candidate Resumes (Parsed Text)]:\n{blocks}"
+        return self._cacheable_messages(RESUME_RUBRIC + RESUME_BATCH_FORMAT, jd_text, suffix, model)
 
-[BILINGUAL FORMAT]:
-Output the full evaluation in English first using the format above. Then add a `---` divider, followed by a complete Chinese translation of the entire evaluation (scores, reasoning, highlights, red flags, and probing questions).
+    def _cacheable_messages(self, instructions: str, jd_text: str, suffix: str, model: str | None) -> list[dict]:
+        prefix = f"""{instructions}
+[Job Description (JD)]:
+<user_input>
+{jd_text}
+</user_input>
 """
-
-        try:
-            response = self._call_llm(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.0,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"❌ Resume evaluation failed / 简历评估失败: {str(e)}"
+        if not self._use_prompt_cache_markers(model or self.model):
+            return [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prefix + suffix},
+            ]
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": suffix},
+            ]},
+        ]
 
     def answer_playbook_question(self, query: str, context_docs: str) -> str:
         """Answer user questions grounded strictly in the retrieved Playbook segments."""
+        request = self._playbook_request(query, context_docs)
+        return self._complete_request(request, "❌ Q&A failed / 问答失败", "playbook_qa")
+
+    def stream_playbook_answer(self, query: str, context_docs: str) -> TextStream:
+        """Streaming variant of answer_playbook_question — a TextStream of text deltas."""
+        request = self._playbook_request(query, context_docs)
+        return self._stream_request(request, "❌ Q&A failed / 问答失败")
+
+    def _playbook_request(self, query: str, context_docs: str) -> dict | str:
         if not self.client:
             return "⚠️ OPENAI_API_KEY not configured. / 尚未配置 OPENAI_API_KEY。"
 
@@ -383,17 +737,13 @@ Do NOT fabricate, generalize, or infer beyond what is documented.
 Output the full answer in English first. Then add a `---` divider, followed by a complete Chinese translation of the answer.
 """
 
-        try:
-            response = self._call_llm(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"❌ Q&A failed / 问答失败: {str(e)}"
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,
+        }
 
     def translate_hc_fields(self, fields: dict) -> dict:
         """
@@ -401,7 +751,6 @@ Output the full answer in English first. Then add a `---` divider, followed by a
         Technical terms (Kubernetes, Docker, etc.) are preserved as-is.
         Returns the original fields unchanged if translation fails.
         """
-        import json as _json
         if not self.client:
             return fields
 
@@ -414,7 +763,7 @@ Rules:
 
 Input JSON:
 <user_input>
-{_json.dumps(fields, ensure_ascii=False, indent=2)}
+{json.dumps(fields, ensure_ascii=False, indent=2)}
 </user_input>
 """
         try:
@@ -422,12 +771,9 @@ Input JSON:
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
+                kind="translate",
             )
-            content = response.choices[0].message.content.strip()
-            # Strip markdown code fences if the model wraps output
-            if content.startswith("```"):
-                content = content[content.find("\n") + 1:]
-                content = content[:content.rfind("```")].strip()
+            content = _strip_code_fences(response.choices[0].message.content)
             parsed = TranslatedHCFields.model_validate_json(content)
             return parsed.model_dump()
         except Exception:
@@ -461,20 +807,21 @@ Requirements:
                 model=self.strong_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
+                kind="knowledge_extract",
             )
             return response.choices[0].message.content
         except Exception as e:
             return f"❌ Knowledge extraction failed / 知识提取失败: {str(e)}"
 
     def extract_text_from_file(self, file_name: str, file_bytes: bytes) -> str:
-        """Parse uploaded resume file (PDF, DOCX, or TXT) and return extracted text."""
+        """Parse uploaded resume file (PDF, DOCX, or TXT) and return extracted text.
+
+        PDF pages are separated by PAGE_SEPARATOR so header/footer clean-up can tell page edges apart.
+        """
         try:
             if file_name.lower().endswith('.pdf'):
                 reader = PdfReader(io.BytesIO(file_bytes))
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                return PAGE_SEPARATOR.join((page.extract_text() or "") + "\n" for page in reader.pages)
             elif file_name.lower().endswith('.docx'):
                 import docx
                 doc = docx.Document(io.BytesIO(file_bytes))
@@ -515,6 +862,7 @@ Resume text:
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.0,
+                kind="candidate_info",
             )
             content = response.choices[0].message.content.strip()
             if content.startswith("```"):
@@ -0,0 +1,183 @@
+"""Resume text preprocessing before LLM scoring.
+
+PDF extraction leaves repeated page headers/footers, page numbers and
+whitespace runs in ``parsed_text``; pages are separated by PAGE_SEPARATOR.
+``compact_resume`` normalises whitespace, drops lines repeated at the top or
+bottom of several pages (never repeated body content such as an employer
+name held across roles), detects the usual resume sections and — only if the
+result is still over the token budget — trims the least important sections
+first, so experience and skills survive intact.
+
+Token counts use tiktoken when installed, else a characters-per-token estimate.
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Per-resume input budget for scoring; a dense two-page CV is ~1.5-2.5k tokens
+RESUME_TOKEN_BUDGET = 3000
+TOKENIZER_ENCODING = "o200k_base"
+# Page break marker in extracted text (form feed, as pdftotext emits)
+PAGE_SEPARATOR = "\f"
+# A short line at the top or bottom of this many pages or more is header/footer boilerplate
+BOILERPLATE_MIN_REPEATS = 2
+_BOILERPLATE_MAX_LEN = 80
+# Lines at each end of a page that may hold a header or footer
+_PAGE_EDGE_LINES = 2
+# Sections never shrink below this many tokens (keeps the heading and first lines)
+_MIN_SECTION_TOKENS = 40
+
+# Section name -> heading pattern (English and Chinese resume conventions)
+SECTION_PATTERNS = {
+    "summary": r"(professional\s+)?summary|profile|about\s+me|objective|个人简介|自我评价|个人总结|求职意向",
+    "experience": r"(work|professional|employment)?\s*(experience|history)|career|工作经历|工作经验|职业经历",
+    "projects": r"(key\s+)?projects?(\s+experience)?|项目经历|项目经验",
+    "skills": r"(technical\s+|core\s+)?(skills|competencies|expertise)|tech(nical)?\s+stack|专业技能|技能|技术栈",
+    "education": r"education(al background)?|academic|教育背景|教育经历|学历",
+    "certifications": r"certifications?|licenses?|awards?|证书|资格认证|获奖",
+}
+# Trimmed first when over budget (least important first)
+_TRIM_ORDER = ("education", "certifications", "summary", "projects", "skills", "header", "experience")
+
+_HEADING_RES = {
+    name: re.compile(rf"^\W*(?:{pattern})\W*$", re.IGNORECASE)
+    for name, pattern in SECTION_PATTERNS.items()
+}
+# Page numbers only: a bare 1-3 digit line ("2", "- 2 -"), "n of m" / "n/m", "Page n" or
+# "第 n 页" — never longer digit runs such as phone numbers or years
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:[-–—\s]*\d{1,3}[-–—\s]*"
+    r"|(?:page\s*)?\d{1,3}\s*(?:of|/)\s*\d{1,3}"
+    r"|page\s*\d{1,3}"
+    r"|第\s*\d{1,3}\s*页(?:\s*[,，/]?\s*共\s*\d{1,3}\s*页)?)$",
+    re.IGNORECASE,
+)
+_ZERO_WIDTH_RE = re.compile(r"[\u200b-\u200d\ufeff]")
+_SPACE_RUN_RE = re.compile(r"[ \t\u00a0\u3000]+")
+
+_encoder = None
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception:
+            logger.info("tiktoken unavailable, estimating tokens from character counts")
+            _encoder = False
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, preferring a line boundary."""
+    encoder = _get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        cut = encoder.decode(tokens[:max_tokens])
+    else:
+        if len(text) <= max_tokens * 4:
+            return text
+        cut = text[:max_tokens * 4]
+    newline = cut.rfind("\n")
+    return cut[:newline] if newline > len(cut) // 2 else cut
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse space runs, strip lines and squeeze blank-line runs to one; page separators are kept."""
+    text = _ZERO_WIDTH_RE.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+    pages = []
+    for page in text.split(PAGE_SEPARATOR):
+        lines = [_SPACE_RUN_RE.sub(" ", line).strip() for line in page.split("\n")]
+        page = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+        if page:
+            pages.append(page)
+    return f"\n{PAGE_SEPARATOR}\n".join(pages)
+
+
+def _page_edges(lines: list[str]) -> list[int]:
+    """Indexes of the first and last few non-empty lines of a page."""
+    content = [i for i, line in enumerate(lines) if line]
+    return sorted(set(content[:_PAGE_EDGE_LINES] + content[-_PAGE_EDGE_LINES:]))
+
+
+def drop_boilerplate(text: str) -> str:
+    """Remove page numbers and short lines repeated at the top or bottom of pages (headers/footers).
+
+    Only page edges are considered, so content repeated inside pages survives.
+    The page separators are removed from the result.
+    """
+    pages = [page.split("\n") for page in text.split(PAGE_SEPARATOR)]
+    edges = [_page_edges(lines) for lines in pages]
+    counts = Counter()
+    for lines, edge in zip(pages, edges):
+        counts.update({lines[i].lower() for i in edge if len(lines[i]) <= _BOILERPLATE_MAX_LEN})
+    kept_pages = []
+    for lines, edge in zip(pages, edges):
+        drop = {
+            i for i in edge
+            if _PAGE_NUMBER_RE.match(lines[i])
+            or (counts[lines[i].lower()] >= BOILERPLATE_MIN_REPEATS and not _section_of(lines[i]))
+        }
+        kept_pages.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return re.sub(r"\n{3,}", "\n\n", "\n\n".join(kept_pages)).strip()
+
+
+def _section_of(line: str) -> str | None:
+    if len(line) > 40:
+        return None
+    for name, heading_re in _HEADING_RES.items():
+        if heading_re.match(line):
+            return name
+    return None
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Split into (section, text) pairs in document order; text before any heading is 'header'."""
+    sections: list[tuple[str, list[str]]] = [("header", [])]
+    for line in text.split("\n"):
+        name = _section_of(line)
+        if name:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def compact_resume(text: str, token_budget: int = RESUME_TOKEN_BUDGET) -> str:
+    """Normalise, de-boilerplate and, if needed, trim a resume to the token budget."""
+    text = drop_boilerplate(normalize_whitespace(text))
+    if count_tokens(text) <= token_budget:
+        return text
+
+    sections = split_sections(text)
+    sizes = [count_tokens(body) for _, body in sections]
+    over = sum(sizes) - token_budget
+    for name in _TRIM_ORDER:
+        for i, (section, body) in enumerate(sections):
+            if over <= 0:
+                break
+            if section != name or sizes[i] <= _MIN_SECTION_TOKENS:
+                continue
+            keep = max(_MIN_SECTION_TOKENS, sizes[i] - over)
+            trimmed = truncate_to_tokens(body, keep)
+            over -= sizes[i] - count_tokens(trimmed)
+            sections[i] = (section, trimmed)
+            sizes[i] = count_tokens(trimmed)
+    compacted = "\n\n".join(body for _, body in sections)
+    # Section floors can leave us slightly over; enforce the hard budget last
+    return truncate_to_tokens(compacted, token_budget)
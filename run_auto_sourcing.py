@@ -4,6 +4,15 @@
 Usage:
     python run_auto_sourcing.py              # incremental scan
     python run_auto_sourcing.py --full       # force full scan
+    python run_auto_sourcing.py --full --batch   # score via the offline batch API (cheaper, up to 24h)
+    python run_auto_sourcing.py --daemon     # stay resident: scheduled runs + runs on new uploads / approved HCs
+    python run_auto_sourcing.py --max-duration 90 --max-calls 2000   # time-boxed: highest-priority work first
+    python run_auto_sourcing.py --max-cost 5 --max-tokens 3000000    # spend-capped (prices: LLM_[STRONG_]INPUT_PRICE / LLM_[STRONG_]OUTPUT_PRICE)
+    python run_auto_sourcing.py --full --estimate                    # print the estimated spend and exit
+
+Run limits default to SOURCING_MAX_DURATION (minutes), SOURCING_MAX_CALLS,
+SOURCING_MAX_TOKENS and SOURCING_MAX_COST (USD), which also bound daemon runs
+and auto-sourcing jobs started from the web app.
 
 Cron example (every Sunday 2:00 AM):
     0 2 * * 0 cd /path/to/Recruitment && python run_auto_sourcing.py >> logs/auto_sourcing.log 2>&1
@@ -12,6 +21,7 @@ Cron example (every Sunday 2:00 AM):
 import argparse
 import logging
 import os
+import signal
 import sys
 from datetime import datetime
 
@@ -29,22 +39,101 @@ logging.basicConfig(
 logger = logging.getLogger("auto_sourcing")
 
 
+def _run_batch(agent, sourcer, args) -> str:
+    from batch_sourcing import BatchSourcer, LocalBatchBackend, OpenAIBatchBackend
+
+    if not agent.client:
+        raise RuntimeError("OPENAI_API_KEY not configured — batch mode needs an LLM client")
+    if args.batch_backend == "local":
+        backend = LocalBatchBackend(lambda body: agent.client.chat.completions.create(**body).model_dump())
+    else:
+        backend = OpenAIBatchBackend(agent.client)
+    return BatchSourcer(sourcer, backend).run(force_full=args.full, poll_interval=args.poll_interval)
+
+
+def _run_limits(args) -> dict:
+    """AutoSourcer.run keyword limits: the SOURCING_MAX_* env vars, overridden by any CLI flag given."""
+    from sourcing_budget import run_limits_from_env
+
+    limits = run_limits_from_env()
+    flags = {
+        "max_duration": args.max_duration * 60 if args.max_duration else None,
+        "max_calls": args.max_calls,
+        "max_tokens": args.max_tokens,
+        "max_cost": args.max_cost,
+    }
+    limits.update({name: value for name, value in flags.items() if value is not None})
+    return limits
+
+
+def _run_daemon(sourcer, args) -> None:
+    from sourcing_daemon import SourcingDaemon, single_instance
+
+    daemon = SourcingDaemon(sourcer, watch_interval=args.watch_interval, run_limits=_run_limits(args))
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        with single_instance():
+            daemon.run_forever()
+    except RuntimeError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run automated talent sourcing")
     parser.add_argument("--full", action="store_true", help="Force full scan instead of incremental")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit all evaluations as one offline batch, poll, then ingest the results")
+    parser.add_argument("--batch-backend", choices=["openai", "local"], default="openai",
+                        help="Batch endpoint: OpenAI-compatible /v1/batches, or a local file-based stand-in")
+    parser.add_argument("--poll-interval", type=float, default=60, help="Seconds between batch status polls")
+    parser.add_argument("--max-duration", type=float,
+                        help="Stop dispatching new evaluations after this many minutes (run ends 'partial'; "
+                             "default SOURCING_MAX_DURATION)")
+    parser.add_argument("--max-calls", type=int,
+                        help="Stop after this many scoring requests (run ends 'partial'; default SOURCING_MAX_CALLS)")
+    parser.add_argument("--max-tokens", type=int,
+                        help="Stop before exceeding this many prompt + completion tokens (run ends 'partial'; "
+                             "default SOURCING_MAX_TOKENS)")
+    parser.add_argument("--max-cost", type=float,
+                        help="Stop before exceeding this cost in USD (run ends 'partial'; default SOURCING_MAX_COST)")
+    parser.add_argument("--estimate", action="store_true",
+                        help="Only estimate the run's requests, tokens and cost from resume lengths, then exit")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident: run on a schedule and shortly after new uploads or HC approvals")
+    parser.add_argument("--watch-interval", type=float, default=60,
+                        help="Daemon mode: seconds between database polls")
     args = parser.parse_args()
 
     from recruitment_agent import RecruitmentAgent
     from auto_sourcer import AutoSourcer
 
     logger.info("=== Auto Sourcing Run Started at %s ===", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-    logger.info("Mode: %s", "FULL" if args.full else "INCREMENTAL")
+    if args.daemon:
+        logger.info("Mode: DAEMON")
+    else:
+        logger.info("Mode: %s%s", "FULL" if args.full else "INCREMENTAL", " (BATCH)" if args.batch else "")
 
     agent = RecruitmentAgent()
     sourcer = AutoSourcer(agent)
 
+    if args.daemon:
+        _run_daemon(sourcer, args)
+        return
+    if args.estimate:
+        est = sourcer.estimate(force_full=args.full)
+        print(f"Estimated: {est['requests']} request(s) for {est['pairs']} HC-talent pair(s), "
+              f"{est['prompt_tokens'] + est['completion_tokens']:,} tokens, ${est['cost_usd']:.2f} "
+              f"(before borderline re-scores)")
+        return
+
     try:
-        run_id = sourcer.run(force_full=args.full)
+        if args.batch:
+            run_id = _run_batch(agent, sourcer, args)
+        else:
+            run_id = sourcer.run(force_full=args.full, **_run_limits(args))
         runs = sourcer.get_run_history()
         run_info = next((r for r in runs if r["id"] == run_id), None)
 
@@ -52,10 +141,15 @@ def main():
             logger.info("Run completed successfully:")
             logger.info("  Run ID:      %s", run_id)
             logger.info("  Type:        %s", run_info["run_type"])
+            logger.info("  Status:      %s", run_info["status"])
             logger.info("  HCs matched: %d", run_info["hc_count"])
             logger.info("  Scanned:     %d resumes", run_info["talent_scanned"])
             logger.info("  Matches:     %d (score >= 60)", run_info["matches_found"])
-            logger.info("  Duration:    %.1fs", run_info["duration_seconds"])
+            logger.info("  Duration:    %.1fs", run_info["duration_seconds"] or 0)
+            if run_info["llm_calls"] is not None:
+                logger.info("  Spend:       %d calls, %d tokens, $%.2f (estimated $%.2f)",
+                            run_info["llm_calls"], (run_info["prompt_tokens"] or 0) + (run_info["completion_tokens"] or 0),
+                            run_info["cost_usd"] or 0, run_info["estimated_cost_usd"] or 0)
         else:
             logger.info("Run completed. ID: %s", run_id)
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Standalone knowledge-base refresh script for cron / CLI execution.
+
+Re-harvests the source pages of Playbook fragments that are expired or expire
+soon, replaces superseded fragments, recompiles the Dynamic Playbook and
+updates the RAG index incrementally.
+
+Usage:
+    python run_knowledge_refresh.py                    # fragments expiring within 14 days
+    python run_knowledge_refresh.py --within-days 30   # refresh further ahead
+    python run_knowledge_refresh.py --force            # ignore the crawl cache, re-extract every page
+
+Cron example (every day 3:00 AM):
+    0 3 * * * cd /path/to/Recruitment && python run_knowledge_refresh.py >> logs/knowledge_refresh.log 2>&1
+"""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Ensure project root is on path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+load_dotenv(override=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("knowledge_refresh")
+
+
+def main():
+    from knowledge_refresh import REFRESH_WINDOW_DAYS
+
+    parser = argparse.ArgumentParser(description="Re-harvest expiring knowledge fragments")
+    parser.add_argument("--within-days", type=int, default=REFRESH_WINDOW_DAYS,
+                        help="Refresh fragments expiring within this many days (expired ones always included)")
+    parser.add_argument("--force", action="store_true",
+                        help="Bypass the crawl cache and re-extract every page")
+    args = parser.parse_args()
+
+    from recruitment_agent import RecruitmentAgent
+    from knowledge_harvester import KnowledgeHarvester
+    from knowledge_refresh import KnowledgeRefresher
+
+    logger.info("=== Knowledge Refresh Started at %s ===", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    agent = RecruitmentAgent()
+    if not agent.client:
+        logger.error("OPENAI_API_KEY not configured — cannot extract knowledge")
+        sys.exit(1)
+    refresher = KnowledgeRefresher(KnowledgeHarvester(agent))
+
+    try:
+        run_id = refresher.run(within_days=args.within_days, force=args.force)
+        run = next((r for r in refresher.get_run_history() if r["id"] == run_id), None)
+        if run:
+            logger.info("Run completed successfully:")
+            logger.info("  Run ID:      %s", run_id)
+            logger.info("  Sources:     %d checked", run["sources_checked"])
+            logger.info("  Refreshed:   %d (%d old fragment(s) retired)", run["refreshed"], run["fragments_retired"])
+            logger.info("  Unchanged:   %d (TTL renewed)", run["unchanged"])
+            logger.info("  Failed:      %d", run["failed"])
+            logger.info("  RAG chunks:  +%d / -%d", run["chunks_added"], run["chunks_removed"])
+            logger.info("  Duration:    %.1fs", run["duration_seconds"] or 0)
+    except Exception:
+        logger.exception("Knowledge refresh failed")
+        sys.exit(1)
+
+    logger.info("=== Knowledge Refresh Finished ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Token / cost / call budget for an auto-sourcing run.
+
+Before a request is dispatched its tokens are estimated from the resume and
+JD lengths (no tokenizer needed); the run stops dispatching once the next
+request would push the committed spend over any limit. Every actual LLM
+request is charged: batch-scoring fallbacks go through ``try_start`` and
+hedged duplicates through ``admit_hedge``. Spend is the agent's
+reported usage when it reports any (``RecruitmentAgent.usage_listener``),
+otherwise the estimates of the requests that were made.
+
+Prices are USD per million tokens, from ``LLM_INPUT_PRICE`` and
+``LLM_OUTPUT_PRICE`` (defaults match the default fast model). Requests to the
+run's strong model (cascade re-scores, and their hedges) are priced from
+``LLM_STRONG_INPUT_PRICE`` and ``LLM_STRONG_OUTPUT_PRICE`` instead.
+
+Unattended runs (CLI, daemon and web-app jobs) take their limits from
+``SOURCING_MAX_DURATION`` (minutes), ``SOURCING_MAX_CALLS``,
+``SOURCING_MAX_TOKENS`` and ``SOURCING_MAX_COST`` (USD); see ``run_limits_from_env``.
+"""
+
+import os
+import threading
+
+# Rough characters per token for mixed English / Chinese resumes
+CHARS_PER_TOKEN = 4
+# Scoring instructions + rubric + output format sent with every request
+PROMPT_OVERHEAD_TOKENS = 1200
+# Completion tokens per scored resume: one structured ResumeScore JSON object
+# (scores, verdict, candidate id and a rationale of at most 3 sentences)
+COMPLETION_TOKENS_PER_RESUME = 150
+DEFAULT_INPUT_PRICE = 1.0
+DEFAULT_OUTPUT_PRICE = 5.0
+DEFAULT_STRONG_INPUT_PRICE = 3.0
+DEFAULT_STRONG_OUTPUT_PRICE = 15.0
+
+
+def estimate_request(jd_text: str, resumes: list[str]) -> tuple[int, int]:
+    """(prompt_tokens, completion_tokens) estimate for one scoring request."""
+    chars = len(jd_text) + sum(len(r) for r in resumes)
+    return PROMPT_OVERHEAD_TOKENS + chars // CHARS_PER_TOKEN, COMPLETION_TOKENS_PER_RESUME * len(resumes)
+
+
+def _env_price(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _env_limit(name: str, cast):
+    value = os.environ.get(name, "").strip()
+    return cast(value) if value else None
+
+
+def run_limits_from_env() -> dict:
+    """``AutoSourcer.run`` keyword limits from the SOURCING_MAX_* env vars (None where unset)."""
+    minutes = _env_limit("SOURCING_MAX_DURATION", float)
+    return {
+        "max_duration": minutes * 60 if minutes else None,
+        "max_calls": _env_limit("SOURCING_MAX_CALLS", int),
+        "max_tokens": _env_limit("SOURCING_MAX_TOKENS", int),
+        "max_cost": _env_limit("SOURCING_MAX_COST", float),
+    }
+
+
+class RunBudget:
+    """Thread-safe spend ledger with optional token, cost and call limits.
+
+    Ledgers are [prompt_tokens, completion_tokens, cost_usd]; each request is
+    priced at its model's rate when it is charged.
+    """
+
+    def __init__(self, max_tokens: int | None = None, max_cost: float | None = None,
+                 max_calls: int | None = None, input_price: float | None = None,
+                 output_price: float | None = None, strong_model: str | None = None,
+                 strong_input_price: float | None = None, strong_output_price: float | None = None):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.max_calls = max_calls
+        self.input_price = input_price if input_price is not None else _env_price(
+            "LLM_INPUT_PRICE", DEFAULT_INPUT_PRICE)
+        self.output_price = output_price if output_price is not None else _env_price(
+            "LLM_OUTPUT_PRICE", DEFAULT_OUTPUT_PRICE)
+        self.strong_model = strong_model
+        self.strong_input_price = strong_input_price if strong_input_price is not None else _env_price(
+            "LLM_STRONG_INPUT_PRICE", DEFAULT_STRONG_INPUT_PRICE)
+        self.strong_output_price = strong_output_price if strong_output_price is not None else _env_price(
+            "LLM_STRONG_OUTPUT_PRICE", DEFAULT_STRONG_OUTPUT_PRICE)
+        self.calls = 0
+        self._started = [0, 0, 0.0]
+        self._reported = [0, 0, 0.0]
+        self._estimated = [0, 0, 0.0]
+        self._in_flight = [0, 0, 0.0]
+        self._lock = threading.Lock()
+
+    def cost(self, prompt_tokens: int, completion_tokens: int, model: str | None = None) -> float:
+        """USD for the tokens at ``model``'s rate: the strong model's prices, else the fast ones."""
+        if model is not None and model == self.strong_model:
+            prices = (self.strong_input_price, self.strong_output_price)
+        else:
+            prices = (self.input_price, self.output_price)
+        return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+    def _charge(self, estimate: tuple[int, int], model: str | None) -> tuple[int, int, float]:
+        return estimate[0], estimate[1], self.cost(estimate[0], estimate[1], model)
+
+    @staticmethod
+    def _add(ledger: list, charge: tuple, sign: int = 1) -> None:
+        for i, value in enumerate(charge):
+            ledger[i] += sign * value
+
+    def _committed(self, extra: tuple = (0, 0, 0.0)) -> tuple[int, int, float]:
+        spent = self._reported if any(self._reported) else self._estimated
+        return tuple(spent[i] + self._in_flight[i] + extra[i] for i in range(3))
+
+    def _fits(self, charge: tuple[int, int, float]) -> bool:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return False
+        prompt, completion, cost = self._committed(charge)
+        if self.max_tokens is not None and prompt + completion > self.max_tokens:
+            return False
+        return self.max_cost is None or cost <= self.max_cost
+
+    def allows(self, estimate: tuple[int, int], model: str | None = None) -> bool:
+        """Whether a request of this estimated size, sent to ``model``, still fits every limit."""
+        with self._lock:
+            return self._fits(self._charge(estimate, model))
+
+    def _start(self, charge: tuple[int, int, float]) -> None:
+        self.calls += 1
+        self._add(self._started, charge)
+        self._add(self._in_flight, charge)
+
+    def start(self, estimate: tuple[int, int], model: str | None = None) -> None:
+        with self._lock:
+            self._start(self._charge(estimate, model))
+
+    def try_start(self, estimate: tuple[int, int], model: str | None = None) -> bool:
+        """Atomically check the limits and start the request; False (nothing started) if it does not fit."""
+        with self._lock:
+            charge = self._charge(estimate, model)
+            if not self._fits(charge):
+                return False
+            self._start(charge)
+            return True
+
+    def admit_hedge(self, model: str | None = None) -> bool:
+        """Hedge guard: charge a duplicate of an in-flight ``model`` request if it still fits.
+
+        The duplicate is estimated at the average size of the requests started
+        so far, priced at ``model``'s rate, and counted as spent straight away.
+        """
+        with self._lock:
+            if not self.calls:
+                return False
+            charge = self._charge((self._started[0] // self.calls, self._started[1] // self.calls), model)
+            if not self._fits(charge):
+                return False
+            self._start(charge)
+            self._add(self._in_flight, charge, -1)
+            self._add(self._estimated, charge)
+            return True
+
+    def finish(self, estimate: tuple[int, int], model: str | None = None) -> None:
+        with self._lock:
+            charge = self._charge(estimate, model)
+            self._add(self._in_flight, charge, -1)
+            self._add(self._estimated, charge)
+
+    def record_usage(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """usage_listener hook: actual tokens reported by the LLM API, priced at ``model``'s rate."""
+        with self._lock:
+            self._add(self._reported, self._charge((prompt_tokens or 0, completion_tokens or 0), model))
+
+    def spend(self) -> dict:
+        with self._lock:
+            prompt, completion, cost = self._committed()
+            return {"llm_calls": self.calls, "prompt_tokens": prompt, "completion_tokens": completion,
+                    "cost_usd": round(cost, 4), "spend_estimated": not any(self._reported)}
@@ -0,0 +1,189 @@
+"""Resident auto-sourcing daemon (run_auto_sourcing.py --daemon).
+
+Keeps one ``RecruitmentAgent`` / ``AutoSourcer`` loaded and polls the database
+instead of paying the import and start-up cost on every cron invocation:
+
+- a full run when the last full run is older than FULL_RUN_INTERVAL_DAYS
+- an incremental run when the last run is older than INCREMENTAL_INTERVAL_HOURS
+- an incremental run shortly after new talents are imported
+- a targeted run (whole pool vs. that HC) for a newly approved HC the web app
+  has not already queued one for
+
+Every run gets the same ``run_limits`` (max_duration, max_calls, max_tokens,
+max_cost — see ``AutoSourcer.run``), so unattended spend stays bounded. A run
+stopped by those limits ends 'partial' and counts for the schedule like a
+completed one; the rest of its scan is picked up by the next scheduled
+incremental run, which skips pairs whose watermark is current.
+
+Only one daemon may run per database; ``single_instance`` holds an exclusive
+lock file for the daemon's lifetime.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from auto_sourcer import AutoSourcer
+from db import get_db
+from job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# Seconds between database polls
+WATCH_INTERVAL = 60
+# New uploads must be quiet this long before a run starts (lets bulk imports finish)
+SETTLE_SECONDS = 120
+# Scheduled full re-scan of the whole pool
+FULL_RUN_INTERVAL_DAYS = 7
+# Scheduled incremental run when nothing else triggered one
+INCREMENTAL_INTERVAL_HOURS = 24
+# Wait this long after a failed run before the schedule retries
+FAILURE_BACKOFF_SECONDS = 900
+# Run statuses that satisfy the schedule ('partial': stopped by run_limits)
+SCHEDULED_STATUSES = ("completed", "partial")
+LOCK_PATH = "data/auto_sourcing.lock"
+
+
+@contextmanager
+def single_instance(path: str = LOCK_PATH):
+    """Hold an exclusive lock on path; raises RuntimeError if another daemon holds it."""
+    import fcntl
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            fh.seek(0)
+            raise RuntimeError(f"Another auto-sourcing daemon is running (lock {path}, pid {fh.read().strip() or '?'})")
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+class SourcingDaemon:
+    """Decides when to run the resident AutoSourcer and runs it."""
+
+    def __init__(self, sourcer: AutoSourcer, watch_interval: float = WATCH_INTERVAL,
+                 settle_seconds: float = SETTLE_SECONDS, run_limits: dict | None = None):
+        self.sourcer = sourcer
+        self.run_limits = run_limits or {}
+        self.watch_interval = watch_interval
+        self.settle_seconds = settle_seconds
+        self._seen: tuple | None = None
+        self._pending: tuple | None = None
+        self._changed_at: datetime | None = None
+        self._failed_at: datetime | None = None
+        self._stop = threading.Event()
+
+    def _snapshot(self) -> tuple[int, frozenset]:
+        """(newest talent rowid, approved HC ids). uploaded_at is date-only, so rowid marks new imports."""
+        conn = get_db(self.sourcer.db_path)
+        newest = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM talent_pool").fetchone()[0]
+        approved = conn.execute("SELECT id FROM hc_requests WHERE status = 'Approved'").fetchall()
+        return newest, frozenset(r[0] for r in approved)
+
+    def _last_run(self, run_type: str | None = None) -> tuple[datetime, str] | None:
+        """(run_date, status) of the latest completed or partial non-targeted run."""
+        sql = (f"SELECT run_date, status FROM sourcing_runs WHERE status IN "
+               f"({', '.join('?' for _ in SCHEDULED_STATUSES)}) AND run_type != 'targeted'")
+        params: tuple = SCHEDULED_STATUSES
+        if run_type:
+            sql += " AND run_type = ?"
+            params += (run_type,)
+        row = get_db(self.sourcer.db_path).execute(sql + " ORDER BY run_date DESC, rowid DESC LIMIT 1",
+                                                   params).fetchone()
+        return (datetime.strptime(row[0], "%Y-%m-%d %H:%M"), row[1]) if row else None
+
+    def due(self, now: datetime | None = None) -> tuple[str, str] | None:
+        """Return (run_type, reason) if a run should start now, else None."""
+        now = now or datetime.now()
+        if self._failed_at and now - self._failed_at < timedelta(seconds=FAILURE_BACKOFF_SECONDS):
+            return None
+        snapshot = self._snapshot()
+        if self._seen is None:
+            # First poll: changes made while the daemon was down are covered by the schedule
+            self._seen = snapshot
+        elif snapshot != self._seen:
+            newest, approved = snapshot
+            if newest > self._seen[0] or approved - self._seen[1]:
+                if snapshot != self._pending:
+                    self._pending, self._changed_at = snapshot, now
+                if now - self._changed_at >= timedelta(seconds=self.settle_seconds):
+                    if approved - self._seen[1]:
+                        return "targeted", "newly approved HC"
+                    return "incremental", "new talents"
+            else:
+                # Only deletions / closed HCs: nothing new to score
+                self._seen = snapshot
+
+        last_full = self._last_run("full")
+        if last_full is None or now - last_full[0] >= timedelta(days=FULL_RUN_INTERVAL_DAYS):
+            return "full", "scheduled full scan"
+        last_date, last_status = self._last_run()
+        if now - last_date >= timedelta(hours=INCREMENTAL_INTERVAL_HOURS):
+            if last_status == "partial":
+                return "incremental", "continue scan stopped by run limits"
+            return "incremental", "scheduled incremental scan"
+        return None
+
+    def tick(self, now: datetime | None = None) -> str | None:
+        """Poll once and run the sourcer if due. Returns the run_id, or None if nothing ran."""
+        now = now or datetime.now()
+        decision = self.due(now)
+        if decision is None:
+            return None
+        if JobQueue(self.sourcer.db_path).active_job("auto_sourcing"):
+            logger.info("Auto-sourcing job already running from the web app, deferring")
+            return None
+
+        run_type, reason = decision
+        snapshot = self._snapshot()
+        hc_ids = None
+        if run_type == "targeted":
+            hc_ids = sorted(snapshot[1] - self._seen[1] - self._queued_hc_ids())
+            if not hc_ids:
+                # The web app's approval hook already queued runs for these HCs
+                self._seen = (self._seen[0], snapshot[1])
+                return None
+        logger.info("Starting %s run (%s)", run_type, reason)
+        try:
+            run_id = self.sourcer.run(force_full=run_type == "full", hc_ids=hc_ids, **self.run_limits)
+        except Exception:
+            logger.exception("Daemon %s run failed", run_type)
+            self._failed_at = now
+            return None
+        if run_type == "targeted":
+            # New talents still pending are picked up by the next incremental run
+            self._seen = (self._seen[0], snapshot[1])
+        else:
+            self._seen = snapshot
+        self._pending, self._failed_at = None, None
+        logger.info("Run %s finished", run_id)
+        return run_id
+
+    def _queued_hc_ids(self) -> set[str]:
+        """HC ids with a targeted auto-sourcing job queued, running or completed."""
+        jobs = JobQueue(self.sourcer.db_path).list_jobs(limit=100, kind="auto_sourcing")
+        return {hc_id for job in jobs if job["status"] in ("queued", "running", "completed")
+                for hc_id in (job["params"].get("hc_ids") or [])}
+
+    def run_forever(self) -> None:
+        logger.info("Auto-sourcing daemon started (pid %d, polling every %ss)", os.getpid(), self.watch_interval)
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Daemon poll failed")
+            self._stop.wait(self.watch_interval)
+        logger.info("Auto-sourcing daemon stopped")
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -4,9 +4,11 @@ import hashlib
 import logging
 import os
 import uuid
+from collections.abc import Callable
 from datetime import date
 
 from db import get_db
+from resume_preprocessor import compact_resume
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +56,11 @@ class TalentPoolManager:
                 stats["errors"].append(f"{name}: {e}")
         return stats
 
-    def import_from_directory(self, dir_path: str, agent) -> dict:
+    def import_from_directory(self, dir_path: str, agent,
+                              progress: Callable[[float, str], None] | None = None) -> dict:
         """Scan a directory for resume files and import them.
 
+        ``progress(fraction, file_name)`` is called before each file.
         Returns same stats dict as import_files.
         """
         stats = {"imported": 0, "skipped_dup": 0, "skipped_unsupported": 0, "errors": []}
@@ -65,7 +69,10 @@ class TalentPoolManager:
             stats["errors"].append(f"Directory not found: {dir_path}")
             return stats
 
-        for fname in sorted(os.listdir(dir_path)):
+        names = sorted(os.listdir(dir_path))
+        for i, fname in enumerate(names, 1):
+            if progress:
+                progress((i - 1) / len(names), fname)
             if not fname.lower().endswith(SUPPORTED_EXTENSIONS):
                 stats["skipped_unsupported"] += 1
                 continue
@@ -109,13 +116,15 @@ class TalentPoolManager:
         talent_id = f"tp_{uuid.uuid4().hex[:12]}"
         conn.execute(
             """INSERT INTO talent_pool
-               (id, file_name, file_hash, parsed_text, candidate_name, email, phone, linkedin_url, tags, uploaded_at, is_active)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)""",
+               (id, file_name, file_hash, parsed_text, compact_text, candidate_name, email, phone, linkedin_url,
+                tags, uploaded_at, is_active)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)""",
             (
                 talent_id,
                 file_name,
                 file_hash,
                 parsed_text,
+                compact_resume(parsed_text),
                 info.get("candidate_name", ""),
                 info.get("email", ""),
                 info.get("phone", ""),
@@ -127,6 +136,20 @@ class TalentPoolManager:
         conn.commit()
         return "ok"
 
+    def backfill_compact_text(self) -> int:
+        """Compute compact_text for talents imported before preprocessing existed. Returns rows updated."""
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT id, parsed_text FROM talent_pool WHERE compact_text IS NULL"
+        ).fetchall()
+        for row in rows:
+            conn.execute(
+                "UPDATE talent_pool SET compact_text = ? WHERE id = ?",
+                (compact_resume(row["parsed_text"] or ""), row["id"]),
+            )
+        conn.commit()
+        return len(rows)
+
     # ------------------------------------------------------------------
     # Query
     # ------------------------------------------------------------------
@@ -159,6 +182,7 @@ class TalentPoolManager:
         """Permanently delete a talent and its related shortlist entries."""
         conn = self._conn()
         conn.execute("DELETE FROM shortlist WHERE talent_id = ?", (talent_id,))
+        conn.execute("DELETE FROM evaluation_watermarks WHERE talent_id = ?", (talent_id,))
         cur = conn.execute("DELETE FROM talent_pool WHERE id = ?", (talent_id,))
         conn.commit()
         return cur.rowcount > 0
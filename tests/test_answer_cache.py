@@ -0,0 +1,80 @@
+"""Tests for answer_cache.py — Playbook Q&A answer cache."""
+
+from answer_cache import AnswerCache, normalize_question
+from knowledge_manager import playbook_version
+
+
+class _FakeEmbeddings:
+    """Maps a few known questions onto fixed vectors."""
+
+    VECTORS = {
+        "what is the ep salary threshold": [1.0, 0.0, 0.0],
+        "what's the ep salary threshold": [0.99, 0.05, 0.0],
+        "what are cpf rates": [0.0, 1.0, 0.0],
+    }
+
+    def embed_query(self, text):
+        return self.VECTORS.get(text, [0.0, 0.0, 1.0])
+
+
+def test_normalize_question():
+    assert normalize_question("  What is the EP   salary threshold？ ") == "what is the ep salary threshold"
+
+
+def test_exact_hit_after_put():
+    cache = AnswerCache()
+    assert cache.get("What is the EP salary threshold?", "ctx", "v1") is None
+    cache.put("What is the EP salary threshold?", "ctx", "v1", "SGD 5,600")
+    assert cache.get("what is the EP salary threshold", "ctx", "v1") == "SGD 5,600"
+
+
+def test_miss_when_context_or_version_changes():
+    cache = AnswerCache()
+    cache.put("q", "ctx", "v1", "answer")
+    assert cache.get("q", "different ctx", "v1") is None
+    assert cache.get("q", "ctx", "v2") is None
+
+
+def test_near_duplicate_question_served_with_embeddings():
+    cache = AnswerCache(embeddings=_FakeEmbeddings())
+    cache.put("What is the EP salary threshold?", "ctx A", "v1", "SGD 5,600")
+    assert cache.get("What's the EP salary threshold?", "ctx B", "v1") == "SGD 5,600"
+    assert cache.get("What are CPF rates?", "ctx C", "v1") is None
+
+
+def test_near_duplicate_ignores_other_versions():
+    cache = AnswerCache(embeddings=_FakeEmbeddings())
+    cache.put("What is the EP salary threshold?", "ctx", "v1", "old answer")
+    assert cache.get("What's the EP salary threshold?", "ctx", "v2") is None
+
+
+def test_invalidate_keeps_current_version():
+    cache = AnswerCache()
+    cache.put("q1", "ctx", "v1", "a1")
+    cache.put("q2", "ctx", "v2", "a2")
+    assert cache.invalidate(keep_version="v2") == 1
+    assert cache.get("q1", "ctx", "v1") is None
+    assert cache.get("q2", "ctx", "v2") == "a2"
+
+
+def test_compile_invalidates_answers_from_older_playbook(km, tmp_path):
+    out = str(tmp_path / "playbook.md")
+    km.add_fragment(region="Singapore", category="Visa", content="EP threshold is SGD 5,600")
+    km.compile_to_markdown(output_file=out)
+    v1 = playbook_version(out)
+
+    cache = AnswerCache()
+    cache.put("q", "ctx", v1, "answer")
+    # Recompiling identical fragments keeps the version (timestamp line is ignored)
+    km.compile_to_markdown(output_file=out)
+    assert playbook_version(out) == v1
+    assert cache.get("q", "ctx", v1) == "answer"
+
+    km.add_fragment(region="Singapore", category="Visa", content="EP threshold rises to SGD 6,000")
+    km.compile_to_markdown(output_file=out)
+    assert playbook_version(out) != v1
+    assert cache.get("q", "ctx", v1) is None
+
+
+def test_playbook_version_when_file_missing(tmp_path):
+    assert playbook_version(str(tmp_path / "missing.md")) == "none"
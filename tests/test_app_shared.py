@@ -83,11 +83,11 @@ class TestEmbCacheKey:
         result = _emb_cache_key()
         assert isinstance(result, tuple)
 
-    def test_tuple_has_two_elements(self):
-        """_emb_cache_key returns a 2-tuple (EMBEDDING_API_KEY, EMBEDDING_API_BASE)."""
+    def test_tuple_has_four_elements(self):
+        """_emb_cache_key returns (EMBEDDING_API_KEY, EMBEDDING_API_BASE, EMBEDDING_BACKEND, LOCAL_EMBEDDING_MODEL)."""
         from app_shared import _emb_cache_key
         result = _emb_cache_key()
-        assert len(result) == 2
+        assert len(result) == 4
 
     def test_reflects_env_variables(self):
         """_emb_cache_key captures the current embedding env values."""
@@ -95,9 +95,11 @@ class TestEmbCacheKey:
         with patch.dict(os.environ, {
             "EMBEDDING_API_KEY": "emb-key-456",
             "EMBEDDING_API_BASE": "https://emb.api/v1",
+            "EMBEDDING_BACKEND": "hashing",
+            "LOCAL_EMBEDDING_MODEL": "",
         }, clear=False):
             result = _emb_cache_key()
-            assert result == ("emb-key-456", "https://emb.api/v1")
+            assert result == ("emb-key-456", "https://emb.api/v1", "hashing", "")
 
     def test_different_env_produces_different_key(self):
         """Changing an embedding env var must change the cache key."""
@@ -107,3 +109,27 @@ class TestEmbCacheKey:
         with patch.dict(os.environ, {"EMBEDDING_API_KEY": "emb-B"}, clear=False):
             key_b = _emb_cache_key()
         assert key_a != key_b
+
+
+# ======================================================================
+# stream_failed
+# ======================================================================
+
+class TestStreamFailed:
+
+    def test_complete_generation_is_not_failed(self):
+        from app_shared import stream_failed
+        from recruitment_agent import TextStream
+        stream = TextStream(lambda s: iter(["# JD"]))
+        assert not stream_failed(stream, "# JD\n\nBuild the platform.\n\n- Kubernetes")
+        # Model text that happens to start a paragraph with ❌ is still a success
+        assert not stream_failed(stream, "# JD\n\nBuild the platform.\n\n❌ Not a fit: no Kubernetes experience")
+
+    def test_failed_stream_or_empty_result_failed(self):
+        from app_shared import stream_failed
+        from recruitment_agent import TextStream
+        stream = TextStream(lambda s: iter(["# JD"]))
+        assert stream_failed(stream, "")
+        assert stream_failed(stream, None)
+        stream.failed = True
+        assert stream_failed(stream, "# JD\n\nBuild the platform.")
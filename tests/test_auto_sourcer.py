@@ -3,6 +3,8 @@
 import pytest
 
 from auto_sourcer import AutoSourcer
+from db import get_db
+from sourcing_budget import RunBudget
 from hc_manager import HCManager
 from talent_pool_manager import TalentPoolManager
 from candidate_manager import CandidateManager
@@ -111,6 +113,13 @@ def test_parse_score_low():
     assert verdict == "Disqualified"
 
 
+def test_parse_score_deal_breaker_overrides_verdict():
+    sourcer = AutoSourcer(FakeAgent())
+    eval_md = ("**Total Score**: 80 / 100\n  - Deal Breaker Avoidance: 0 / 20 — Reasoning: no B2B\n"
+               "- **Verdict**: Strong Match")
+    assert sourcer._parse_score(eval_md) == (80.0, "Disqualified")
+
+
 # ------------------------------------------------------------------
 # Full Run
 # ------------------------------------------------------------------
@@ -208,6 +217,186 @@ def test_incremental_run(tmp_path):
     assert second_run["run_type"] == "incremental"
 
 
+class CountingAgent(FakeAgent):
+    model = "fast-v1"
+
+    def __init__(self):
+        self.calls = 0
+
+    def evaluate_resume(self, jd_text, resume_text):
+        self.calls += 1
+        return super().evaluate_resume(jd_text, resume_text)
+
+
+def test_incremental_run_rescores_only_stale_pairs(tmp_path, monkeypatch):
+    agent = CountingAgent()
+    hm = HCManager(db_path=str(tmp_path / "x.json"))
+    tpm = TalentPoolManager()
+    hc_id = _seed_hc(hm)
+    tpm.import_files([FakeUploadedFile(f"cv{i}.pdf", f"resume {i}".encode()) for i in range(3)], agent)
+    sourcer = AutoSourcer(agent)
+
+    sourcer.run(force_full=True)
+    assert agent.calls == 3
+    sourcer.run()
+    assert agent.calls == 3  # same-day uploads are not re-scored
+
+    # Resume text changed → only that pair
+    talent_id = tpm.get_all_talents()[0]["id"]
+    get_db().execute("UPDATE talent_pool SET compact_text = 'updated resume' WHERE id = ?", (talent_id,))
+    sourcer.run()
+    assert agent.calls == 4
+
+    # HC content changed → every pair of that HC
+    get_db().execute("UPDATE hc_requests SET mission = 'New mission' WHERE id = ?", (hc_id,))
+    sourcer.run()
+    assert agent.calls == 7
+
+    # Rubric or model changed → everything
+    monkeypatch.setattr("auto_sourcer.RUBRIC_VERSION", "3")
+    sourcer.run()
+    assert agent.calls == 10
+    agent.model = "fast-v2"
+    sourcer.run()
+    assert agent.calls == 13
+    sourcer.run()
+    assert agent.calls == 13
+
+
+def test_targeted_run_scores_whole_pool_against_one_hc_best_match_first(tmp_path, monkeypatch):
+    agent = FakeAgent()
+    hm = HCManager(db_path=str(tmp_path / "x.json"))
+    tpm = TalentPoolManager()
+    _seed_hc(hm)
+    for name, content in [("java.pdf", b"java"), ("k8s.pdf", b"k8s"), ("go.pdf", b"go")]:
+        tpm.import_files([FakeUploadedFile(name, content)], agent)
+    sourcer = AutoSourcer(agent)
+    sourcer.run(force_full=True)
+    hc_id = _seed_hc(hm)
+
+    resumes = {"java.pdf": "Java Spring developer", "k8s.pdf": "Kubernetes operator Go Docker",
+               "go.pdf": "Go backend developer"}
+    monkeypatch.setattr("auto_sourcer.resume_text", lambda t: resumes[t["file_name"]])
+    monkeypatch.setattr("auto_sourcer.MAX_WORKERS", 1)
+    scored = []
+    monkeypatch.setattr(sourcer, "_evaluate_group",
+                        lambda jd, talents, budget=None: scored.extend(t["file_name"] for t in talents) or {})
+
+    run_id = sourcer.run(hc_ids=[hc_id])
+
+    run = next(r for r in sourcer.get_run_history() if r["id"] == run_id)
+    assert (run["run_type"], run["hc_count"]) == ("targeted", 1)
+    # Prefiltered: no overlap with "Kubernetes, Go, Docker" → not scored; best match first
+    assert scored == ["k8s.pdf", "go.pdf"]
+
+
+def _approved_hc(hm, role_title, tech_stack, urgency):
+    hc_id = hm.submit_request(department="Engineering", role_title=role_title, location="Singapore",
+                              urgency=urgency, mission="", tech_stack=tech_stack, deal_breakers="",
+                              selling_point="")
+    hm.update_status(hc_id, "Approved")
+    return hc_id
+
+
+def test_priority_order_and_call_limit_make_partial_run(tmp_path, monkeypatch):
+    agent = FakeAgent()
+    hm = HCManager(db_path=str(tmp_path / "x.json"))
+    _approved_hc(hm, "SRE", "Kubernetes", "🔥🔥🔥 Critical — project blocked on hire")
+    _approved_hc(hm, "Frontend", "React", "🔥🔥 Normal")
+    TalentPoolManager().import_files(
+        [FakeUploadedFile(name, name.encode()) for name in ("kubernetes.pdf", "react.pdf", "cobol.pdf")], agent)
+    monkeypatch.setattr("auto_sourcer.MAX_WORKERS", 1)
+    sourcer = AutoSourcer(agent)
+    order = []
+    monkeypatch.setattr(sourcer, "_evaluate_group", lambda jd, talents, budget=None: order.extend(
+        ("SRE" if "SRE" in jd else "FE", t["file_name"]) for t in talents) or {})
+
+    run_id = sourcer.run(force_full=True, max_calls=4)
+
+    # Urgent HC's best match, then the normal HC's best match beats the urgent HC's non-match
+    assert order == [("SRE", "kubernetes.pdf"), ("FE", "react.pdf"), ("SRE", "react.pdf"), ("SRE", "cobol.pdf")]
+    run = next(r for r in sourcer.get_run_history() if r["id"] == run_id)
+    assert (run["status"], run["talent_scanned"]) == ("partial", 4)
+
+
+def test_cancelled_run_keeps_scored_candidates(tmp_path, monkeypatch):
+    from job_queue import JobCancelled
+
+    agent = FakeAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    TalentPoolManager().import_files([FakeUploadedFile(f"{n}.pdf", n.encode()) for n in ("a", "b", "c")], agent)
+    monkeypatch.setattr("auto_sourcer.MAX_WORKERS", 1)
+    sourcer = AutoSourcer(agent)
+    calls = []
+
+    def _progress(fraction, message):
+        calls.append(fraction)
+        if len(calls) == 2:
+            raise JobCancelled("job_x")
+
+    with pytest.raises(JobCancelled):
+        sourcer.run(force_full=True, progress=_progress)
+
+    run = sourcer.get_run_history()[0]
+    assert (run["status"], run["talent_scanned"], run["matches_found"]) == ("cancelled", 1, 1)
+    assert len(sourcer.get_shortlist(run_id=run["id"])) == 1
+
+
+def test_zero_duration_run_is_partial_without_calls(tmp_path):
+    agent = CountingAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talent(TalentPoolManager(), agent)
+    sourcer = AutoSourcer(agent)
+    run_id = sourcer.run(max_duration=1e-9)
+    assert sourcer.get_run_history()[0]["status"] == "partial"
+    assert agent.calls == 0 and sourcer.get_shortlist(run_id=run_id) == []
+
+
+class UsageReportingAgent(CountingAgent):
+    """Reports 2000 prompt + 500 completion tokens per call through usage_listener."""
+    usage_listener = None
+
+    def evaluate_resume(self, jd_text, resume_text):
+        if self.usage_listener:
+            self.usage_listener(self.model, 2000, 500)
+        return super().evaluate_resume(jd_text, resume_text)
+
+
+def test_cost_budget_stops_run_and_records_spend(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_INPUT_PRICE", "1.0")
+    monkeypatch.setenv("LLM_OUTPUT_PRICE", "5.0")
+    monkeypatch.setattr("auto_sourcer.MAX_WORKERS", 1)
+    agent = UsageReportingAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talents(TalentPoolManager(), agent, 4)
+    sourcer = AutoSourcer(agent)
+    assert sourcer.estimate()["requests"] == 4
+
+    # Each call costs $0.0045 reported; room for two calls plus an estimate, not three
+    run_id = sourcer.run(force_full=True, max_cost=0.011)
+
+    run = next(r for r in sourcer.get_run_history() if r["id"] == run_id)
+    assert agent.calls == 2
+    assert (run["status"], run["llm_calls"]) == ("partial", 2)
+    assert (run["prompt_tokens"], run["completion_tokens"], run["cost_usd"]) == (4000, 1000, 0.009)
+    assert run["estimated_cost_usd"] > 0
+    assert agent.usage_listener is None
+    assert agent.hedge_guard is None
+
+
+def test_approval_hook_queues_targeted_job(hc_manager, monkeypatch):
+    import hc_manager as hc_module
+    from job_queue import JobQueue, enqueue_targeted_sourcing
+
+    monkeypatch.setattr(hc_module, "APPROVAL_HOOKS", [])
+    hc_module.register_approval_hook(enqueue_targeted_sourcing)
+    hc_module.register_approval_hook(enqueue_targeted_sourcing)
+    hc_id = _seed_hc(hc_manager)
+
+    jobs = JobQueue().list_jobs(kind="auto_sourcing")
+    assert [job["params"] for job in jobs] == [{"hc_ids": [hc_id]}]
+
+
 # ------------------------------------------------------------------
 # Disposition
 # ------------------------------------------------------------------
@@ -325,3 +514,222 @@ def test_build_jd_from_hc(tmp_path):
     assert "Senior K8s Engineer" in jd
     assert "Singapore" in jd
     assert "Kubernetes" in jd
+
+
+# ------------------------------------------------------------------
+# Batch scoring
+# ------------------------------------------------------------------
+
+class BatchAgent(FakeAgent):
+    """Scores batches with 70 points but 'forgets' the last candidate of each batch."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batch_calls = []
+        self.single_calls = 0
+
+    def evaluate_resumes_batch(self, jd_text, resumes):
+        from recruitment_agent import ResumeScore
+        self.batch_calls.append(list(resumes))
+        if self.fail:
+            raise ValueError("invalid JSON")
+        return {
+            key: ResumeScore(mission_match=30, tech_stack_depth=20, deal_breaker_avoidance=20)
+            for key in list(resumes)[:-1]
+        }
+
+    def evaluate_resume(self, jd_text, resume_text):
+        self.single_calls += 1
+        return super().evaluate_resume(jd_text, resume_text)
+
+
+def _seed_talents(tpm, agent, n):
+    tpm.import_files([FakeUploadedFile(f"cv{i}.pdf", f"resume {i}".encode()) for i in range(n)], agent)
+
+
+def test_batch_scoring_with_single_fallback_for_missing(tmp_path):
+    """Small resumes go through batch requests; candidates missing from the response are scored singly."""
+    agent = BatchAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talents(TalentPoolManager(), agent, 3)
+
+    sourcer = AutoSourcer(agent)
+    sourcer.run(force_full=True)
+
+    assert len(agent.batch_calls) == 1 and len(agent.batch_calls[0]) == 3
+    assert agent.single_calls == 1
+    scores = sorted(r["score"] for r in sourcer.get_shortlist())
+    assert scores == [70.0, 70.0, 85.0]
+    assert all("Total Score" in r["evaluation_md"] for r in sourcer.get_shortlist())
+
+
+def test_batch_scoring_failure_falls_back_to_single(tmp_path):
+    agent = BatchAgent(fail=True)
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talents(TalentPoolManager(), agent, 3)
+
+    sourcer = AutoSourcer(agent)
+    sourcer.run(force_full=True)
+
+    assert agent.single_calls == 3
+    assert [r["score"] for r in sourcer.get_shortlist()] == [85.0, 85.0, 85.0]
+
+
+def test_batch_fallback_requests_count_toward_call_limit(tmp_path):
+    agent = BatchAgent(fail=True)
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talents(TalentPoolManager(), agent, 3)
+
+    sourcer = AutoSourcer(agent)
+    run_id = sourcer.run(force_full=True, max_calls=2)
+
+    # One batch request plus one fallback; the other two talents wait for a later run
+    assert agent.single_calls == 1
+    run = sourcer.get_run_history()[0]
+    assert (run["status"], run["llm_calls"]) == ("partial", 2)
+    assert len(sourcer.get_shortlist(run_id=run_id)) == 1
+
+
+def test_plan_batches_keeps_large_resumes_single(monkeypatch):
+    import auto_sourcer
+    monkeypatch.setattr(auto_sourcer, "BATCH_SCORING_SIZE", 2)
+    sourcer = AutoSourcer(BatchAgent())
+    talents = [{"id": f"t{i}", "parsed_text": "x" * 10} for i in range(3)]
+    talents.append({"id": "big", "parsed_text": "x" * (auto_sourcer.BATCH_RESUME_MAX_CHARS + 1)})
+    groups = sourcer._plan_batches(talents)
+    assert [[t["id"] for t in g] for g in groups] == [["t0", "t1"], ["t2"], ["big"]]
+    # Agents without batch support always score singly
+    assert len(AutoSourcer(FakeAgent())._plan_batches(talents)) == 4
+
+
+# ------------------------------------------------------------------
+# Structured scoring
+# ------------------------------------------------------------------
+
+class StructuredAgent(FakeAgent):
+    """Agent exposing structured JSON scoring; the Markdown path must not be used."""
+
+    def evaluate_resume_structured(self, jd_text, resume_text):
+        from recruitment_agent import ResumeScore
+        if "broken" in resume_text:
+            raise ValueError("response failed validation")
+        return ResumeScore(mission_match=30, tech_stack_depth=30, deal_breaker_avoidance=0,
+                           rationale="Deal breaker: no B2B delivery.")
+
+    def evaluate_resume(self, jd_text, resume_text):
+        raise AssertionError("Markdown scoring should not be called")
+
+
+def test_structured_scoring_used_when_available(tmp_path):
+    agent = StructuredAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talent(TalentPoolManager(), agent)
+
+    sourcer = AutoSourcer(agent)
+    sourcer.run(force_full=True)
+
+    row = sourcer.get_shortlist()[0]
+    assert row["score"] == 60.0
+    assert row["verdict"] == "Disqualified"
+    assert "Deal breaker: no B2B delivery." in row["evaluation_md"]
+    # A deal-breaker violation keeps the candidate off the shortlist despite the total
+    assert sourcer.get_shortlist(qualified="qualified") == []
+    assert sourcer.get_shortlist(qualified="disqualified") == [row]
+    assert sourcer.get_run_history()[0]["matches_found"] == 0
+
+
+def test_structured_scoring_failure_is_not_recorded_as_zero(tmp_path):
+    """A validation failure skips the talent instead of shortlisting it as 0 / Disqualified."""
+    agent = StructuredAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    _seed_talent(TalentPoolManager(), agent, name="broken.pdf")
+
+    sourcer = AutoSourcer(agent)
+    sourcer.run(force_full=True)
+
+    assert sourcer.get_run_history()[0]["status"] == "completed"
+    assert sourcer.get_shortlist() == []
+
+
+# ------------------------------------------------------------------
+# Model cascade
+# ------------------------------------------------------------------
+
+class CascadeAgent(FakeAgent):
+    """Fast model gives 55 (borderline) or 95 (clear-cut); strong model gives 70."""
+
+    model = "fast"
+    strong_model = "strong"
+
+    def __init__(self):
+        self.models_used = []
+
+    def evaluate_resume_structured(self, jd_text, resume_text, model=None):
+        from recruitment_agent import ResumeScore
+        self.models_used.append(model or self.model)
+        if model == self.strong_model:
+            return ResumeScore(mission_match=30, tech_stack_depth=20, deal_breaker_avoidance=20)
+        if "clear" in resume_text:
+            return ResumeScore(mission_match=40, tech_stack_depth=35, deal_breaker_avoidance=20)
+        return ResumeScore(mission_match=20, tech_stack_depth=15, deal_breaker_avoidance=20)
+
+
+def test_cascade_rescores_only_borderline(tmp_path, monkeypatch):
+    import auto_sourcer
+    monkeypatch.setattr(auto_sourcer, "BATCH_SCORING_SIZE", 1)
+    agent = CascadeAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    TalentPoolManager().import_files(
+        [FakeUploadedFile("a.pdf", b"a"), FakeUploadedFile("b.pdf", b"b")], agent,
+    )
+    # Make one resume clear-cut
+    agent.extract_text_from_file = lambda name, data: f"Parsed: {name} clear"
+    TalentPoolManager().import_files([FakeUploadedFile("c.pdf", b"c")], agent)
+
+    sourcer = AutoSourcer(agent)
+    sourcer.run(force_full=True)
+
+    rows = {r["file_name"]: r for r in sourcer.get_shortlist()}
+    assert agent.models_used.count("strong") == 2
+    assert (rows["a.pdf"]["fast_score"], rows["a.pdf"]["strong_score"], rows["a.pdf"]["score"]) == (55, 70, 70)
+    assert rows["a.pdf"]["verdict"] == "Borderline Pass"
+    assert (rows["c.pdf"]["fast_score"], rows["c.pdf"]["strong_score"], rows["c.pdf"]["score"]) == (95, None, 95)
+
+
+def test_cascade_rescores_are_charged_at_the_strong_models_rate(tmp_path, monkeypatch):
+    import auto_sourcer
+    monkeypatch.setattr(auto_sourcer, "BATCH_SCORING_SIZE", 1)
+    agent = CascadeAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    TalentPoolManager().import_files([FakeUploadedFile("a.pdf", b"a")], agent)
+    sourcer = AutoSourcer(agent)
+    work, jds = sourcer._plan_work(sourcer.hm.get_approved_requests(), sourcer.tpm.get_all_talents(), True, None)
+    fast = work[0]
+    strong = (fast[0], fast[1], "strong", fast[3], fast[4][0])
+    budget = RunBudget(input_price=1.0, output_price=5.0, strong_model="strong",
+                       strong_input_price=3.0, strong_output_price=15.0)
+
+    (tokens, fast_model), (strong_tokens, strong_model) = (sourcer._request_estimate(fast, jds),
+                                                           sourcer._request_estimate(strong, jds))
+
+    assert tokens == strong_tokens and (fast_model, strong_model) == (None, "strong")
+    assert budget.cost(*strong_tokens, strong_model) == pytest.approx(3 * budget.cost(*tokens, fast_model))
+
+
+def test_cascade_disabled_when_models_match(tmp_path):
+    agent = CascadeAgent()
+    agent.strong_model = "fast"
+    assert AutoSourcer(agent)._cascade_model() is None
+    assert AutoSourcer(FakeAgent())._cascade_model() is None
+
+
+def test_init_db_adds_cascade_columns_to_existing_shortlist():
+    """Databases created before the cascade gain fast_score / strong_score on startup."""
+    import sqlite3
+    from db import init_db
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE shortlist (id TEXT PRIMARY KEY, hc_id TEXT, talent_id TEXT, score REAL)")
+    init_db(conn)
+    init_db(conn)  # idempotent
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(shortlist)")}
+    assert {"fast_score", "strong_score"} <= columns
@@ -0,0 +1,150 @@
+"""Tests for batch_sourcing — offline batch-API sourcing runs."""
+
+import json
+
+import pytest
+
+from auto_sourcer import AutoSourcer
+from batch_sourcing import BatchSourcer, LocalBatchBackend
+from hc_manager import HCManager
+from talent_pool_manager import TalentPoolManager
+from tests.test_auto_sourcer import FakeAgent, FakeUploadedFile, _seed_hc
+
+
+class BatchRequestAgent(FakeAgent):
+    model = "fast"
+
+    def resume_score_request(self, jd_text, resume_text, model=None):
+        return {"model": model or self.model,
+                "messages": [{"role": "user", "content": f"{jd_text}\n{resume_text}"}],
+                "temperature": 0.0}
+
+
+def _complete(body):
+    """Score 80 for resume 0, garbage for resume 2, 40 otherwise."""
+    text = body["messages"][0]["content"]
+    if "cv2" in text:
+        content = "not json"
+    elif "cv0" in text:
+        content = json.dumps({"mission_match": 30, "tech_stack_depth": 30, "deal_breaker_avoidance": 20})
+    else:
+        content = json.dumps({"mission_match": 10, "tech_stack_depth": 10, "deal_breaker_avoidance": 20})
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def _setup(tmp_path, n=3):
+    agent = BatchRequestAgent()
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    TalentPoolManager().import_files(
+        [FakeUploadedFile(f"cv{i}.pdf", f"resume {i}".encode()) for i in range(n)], agent,
+    )
+    return agent, AutoSourcer(agent)
+
+
+def test_prepare_writes_one_request_per_pair(tmp_path):
+    agent, sourcer = _setup(tmp_path)
+    batch = BatchSourcer(sourcer, LocalBatchBackend(_complete, workdir=str(tmp_path)), workdir=str(tmp_path))
+
+    run_id, path, count = batch.prepare(force_full=True)
+
+    lines = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert count == len(lines) == 3
+    assert lines[0]["url"] == "/v1/chat/completions"
+    assert lines[0]["body"]["model"] == "fast"
+    assert len({line["custom_id"] for line in lines}) == 3
+    # Not 'submitted' until the backend has accepted the batch
+    assert sourcer.get_run_history()[0]["status"] == "running"
+
+
+def test_prepare_selects_the_same_pairs_as_a_synchronous_run(tmp_path, monkeypatch):
+    agent, sourcer = _setup(tmp_path)
+    batch = BatchSourcer(sourcer, LocalBatchBackend(_complete, workdir=str(tmp_path)), workdir=str(tmp_path))
+    planned = []
+    plan_work = sourcer._plan_work
+    monkeypatch.setattr(sourcer, "_plan_work", lambda *args: planned.append(args) or plan_work(*args))
+    # Frozen / already-decided talents are skipped through the shared planner
+    monkeypatch.setattr(sourcer, "_should_skip", lambda talent_id, hc_id: talent_id == talents[0]["id"])
+    talents = sourcer.tpm.get_all_talents()
+
+    _, _, count = batch.prepare(force_full=True)
+
+    assert len(planned) == 1 and count == 2
+
+
+def test_submit_failure_marks_run_failed_without_batch(tmp_path):
+    agent, sourcer = _setup(tmp_path, n=1)
+    backend = LocalBatchBackend(_complete, workdir=str(tmp_path))
+
+    def _reject(path):
+        raise ConnectionError("batch endpoint down")
+
+    backend.submit = _reject
+    batch = BatchSourcer(sourcer, backend, workdir=str(tmp_path))
+    with pytest.raises(ConnectionError):
+        batch.run(force_full=True, poll_interval=0)
+    run = sourcer.get_run_history()[0]
+    assert (run["status"], run["batch_id"]) == ("failed", None)
+    assert batch.get_pending_run() is None
+
+
+def test_batch_run_ingests_results_into_shortlist(tmp_path):
+    agent, sourcer = _setup(tmp_path)
+    batch = BatchSourcer(sourcer, LocalBatchBackend(_complete, workdir=str(tmp_path)), workdir=str(tmp_path))
+
+    run_id = batch.run(force_full=True, poll_interval=0)
+
+    run = sourcer.get_run_history()[0]
+    assert run["id"] == run_id
+    assert run["status"] == "completed"
+    assert run["batch_id"].startswith("localbatch_")
+    assert (run["talent_scanned"], run["matches_found"]) == (3, 1)
+    # The unparseable result is left unscored so the next run retries it
+    rows = sorted((r["file_name"], r["score"]) for r in sourcer.get_shortlist())
+    assert rows == [("cv0.pdf", 80.0), ("cv1.pdf", 40.0)]
+
+    # Only the unscored pair is stale for the next incremental batch
+    _, path, count = batch.prepare()
+    assert count == 1
+    assert "cv2.pdf" in json.loads(open(path, encoding="utf-8").readline())["body"]["messages"][0]["content"]
+
+
+class _SlowBackend:
+    """Reports 'in_progress' once before completing; records submissions."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.submitted = 0
+        self.polls = 0
+
+    def submit(self, path):
+        self.submitted += 1
+        return self.inner.submit(path)
+
+    def status(self, batch_id):
+        self.polls += 1
+        return "in_progress" if self.polls == 1 else self.inner.status(batch_id)
+
+    def results(self, batch_id):
+        return self.inner.results(batch_id)
+
+
+def test_pending_batch_is_resumed_not_resubmitted(tmp_path):
+    agent, sourcer = _setup(tmp_path, n=1)
+    backend = _SlowBackend(LocalBatchBackend(_complete, workdir=str(tmp_path)))
+    batch = BatchSourcer(sourcer, backend, workdir=str(tmp_path))
+    run_id, path, _ = batch.prepare(force_full=True)
+    batch._mark_submitted(run_id, backend.inner.submit(path))
+
+    assert batch.run(poll_interval=0) == run_id
+    assert backend.submitted == 0
+    assert backend.polls == 2
+    assert sourcer.get_run_history()[0]["status"] == "completed"
+
+
+def test_failed_batch_marks_run_failed(tmp_path):
+    agent, sourcer = _setup(tmp_path, n=1)
+    backend = LocalBatchBackend(_complete, workdir=str(tmp_path))
+    backend.status = lambda batch_id: "expired"
+    BatchSourcer(sourcer, backend, workdir=str(tmp_path)).run(force_full=True, poll_interval=0)
+    assert sourcer.get_run_history()[0]["status"] == "failed"
+    assert sourcer.get_shortlist() == []
@@ -1,20 +1,31 @@
 """Tests for document_parser.py — KeywordSearchEmbeddings & RAGSystem."""
 
 import os
-import sys
 from unittest.mock import patch, MagicMock
 
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
-# ---------------------------------------------------------------------------
-# Prevent Streamlit import side-effects.  document_parser.py does
-# `import streamlit as st` at module level, and invalidate_rag_index() calls
-# `st.cache_resource.clear()`.  We inject a lightweight mock before the first
-# import so the real Streamlit is never loaded during testing.
-# ---------------------------------------------------------------------------
-_st_mock = MagicMock()
-sys.modules.setdefault("streamlit", _st_mock)
+from document_parser import (
+    CachedEmbeddings,
+    KeywordSearchEmbeddings,
+    RAGSystem,
+    load_chunks,
+    mmr_select,
+    reciprocal_rank_fusion,
+    save_chunks,
+)
 
-from document_parser import KeywordSearchEmbeddings, RAGSystem, invalidate_rag_index  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def _isolated_index_paths(tmp_path):
+    """Keep persisted indexes and the chunk store out of the real data/ directory."""
+    with patch("document_parser.FAISS_INDEX_PATH", str(tmp_path / "faiss_index")), \
+            patch("document_parser.BM25_INDEX_PATH", str(tmp_path / "bm25_index.json")), \
+            patch("document_parser.CHUNK_STORE_PATH", str(tmp_path / "rag_chunks.jsonl")), \
+            patch("document_parser.SOURCE_MANIFEST_PATH", str(tmp_path / "rag_sources.json")):
+        yield
 
 
 # ======================================================================
@@ -65,6 +76,62 @@ class TestKeywordSearchEmbeddings:
         assert emb(text) == emb.embed_query(text)
 
 
+# ======================================================================
+# CachedEmbeddings
+# ======================================================================
+
+class _CountingEmbeddings:
+    """Deterministic fake backend that records every text it embeds."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.extend(texts)
+        return [[float(len(t)), 0.5, -1.0] for t in texts]
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text)), 0.5, -1.0]
+
+
+class TestCachedEmbeddings:
+
+    def test_rebuild_only_embeds_new_text(self):
+        """A second embed_documents call only sends texts not seen before."""
+        backend = _CountingEmbeddings()
+        emb = CachedEmbeddings(backend, model_name="m1")
+        first = emb.embed_documents(["alpha", "beta"])
+        second = emb.embed_documents(["alpha", "beta", "gamma"])
+
+        assert backend.calls == ["alpha", "beta", "gamma"]
+        assert second[:2] == first
+        assert second[2] == [5.0, 0.5, -1.0]
+
+    def test_duplicate_texts_in_batch_embedded_once(self):
+        backend = _CountingEmbeddings()
+        emb = CachedEmbeddings(backend, model_name="m1")
+        result = emb.embed_documents(["same", "same", "other"])
+
+        assert backend.calls == ["same", "other"]
+        assert result[0] == result[1]
+
+    def test_query_embeddings_are_cached(self):
+        """Repeated questions reuse the stored query vector."""
+        backend = _CountingEmbeddings()
+        emb = CachedEmbeddings(backend, model_name="m1")
+        assert emb.embed_query("What is the EP threshold?") == emb.embed_query("What is the EP threshold?")
+        assert len(backend.calls) == 1
+        assert emb.hits == 1 and emb.misses == 1
+
+    def test_cache_is_keyed_by_model(self):
+        """Switching embedding models never serves vectors from the old model."""
+        backend = _CountingEmbeddings()
+        CachedEmbeddings(backend, model_name="m1").embed_documents(["alpha"])
+        CachedEmbeddings(backend, model_name="m2").embed_documents(["alpha"])
+        assert backend.calls == ["alpha", "alpha"]
+
+
 # ======================================================================
 # RAGSystem — initialisation & properties
 # ======================================================================
@@ -109,6 +176,267 @@ class TestRAGSystemRetrieve:
             assert result == ""
 
 
+class TestRAGSystemKeywordRetrieve:
+
+    def _write_playbook(self, data_dir):
+        data_dir.mkdir()
+        (data_dir / "playbook.md").write_text(
+            "# Singapore\n\nEmployment Pass minimum salary is SGD 5,600.\n\n"
+            + "filler text " * 120
+            + "\n\n# CPF\n\nCPF contribution rates for employers are 17 percent.\n",
+            encoding="utf-8",
+        )
+
+    def test_keyword_mode_ranks_by_bm25_without_faiss(self, tmp_path):
+        """Keyword mode builds a BM25 index (no FAISS store) and returns ranked chunks."""
+        data_dir = tmp_path / "data"
+        self._write_playbook(data_dir)
+        with patch.dict(os.environ, {"EMBEDDING_API_KEY": ""}, clear=False), \
+                patch("document_parser.BM25_INDEX_PATH", str(tmp_path / "bm25.json")):
+            rag = RAGSystem(data_dir=str(data_dir))
+            assert rag.load_and_index() is True
+            assert rag.vector_store is None
+            result = rag.retrieve("CPF contribution rates", k=1)
+            assert "17 percent" in result
+            assert "SGD 5,600" not in result
+
+    def test_keyword_index_persisted_and_reused(self, tmp_path):
+        """A second RAGSystem loads the persisted BM25 index instead of re-parsing documents."""
+        data_dir = tmp_path / "data"
+        self._write_playbook(data_dir)
+        index_path = str(tmp_path / "bm25.json")
+        with patch.dict(os.environ, {"EMBEDDING_API_KEY": ""}, clear=False), \
+                patch("document_parser.BM25_INDEX_PATH", index_path):
+            RAGSystem(data_dir=str(data_dir)).load_and_index()
+            assert os.path.exists(index_path)
+
+            rag = RAGSystem(data_dir=str(data_dir))
+            with patch("document_parser.TextLoader") as loader:
+                assert rag.load_and_index() is True
+                loader.assert_not_called()
+            assert "SGD 5,600" in rag.retrieve("Employment Pass salary", k=1)
+
+
+class TestSourceManifest:
+
+    def _cold_start(self, data_dir):
+        with patch.dict(os.environ, {"EMBEDDING_API_KEY": ""}, clear=False):
+            rag = RAGSystem(data_dir=str(data_dir))
+            assert rag.load_and_index() is True
+        return rag
+
+    def test_new_document_triggers_rebuild_of_persisted_index(self, tmp_path):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "a.md").write_text("Employment Pass salary SGD 5,600.\n", encoding="utf-8")
+        self._cold_start(data_dir)
+        (data_dir / "b.md").write_text("CPF contribution rates are 17 percent.\n", encoding="utf-8")
+
+        assert "17 percent" in self._cold_start(data_dir).retrieve("CPF contribution rates", k=1)
+
+    def test_loaded_system_picks_up_modified_document(self, tmp_path):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        source = data_dir / "a.md"
+        source.write_text("Employment Pass salary SGD 5,600.\n", encoding="utf-8")
+        rag = self._cold_start(data_dir)
+        source.write_text("Employment Pass salary SGD 5,900 from 2026.\n", encoding="utf-8")
+        os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 1_000_000))
+
+        assert rag.load_and_index() is True
+        assert "5,900" in rag.retrieve("Employment Pass salary", k=1)
+
+    def test_unchanged_sources_reuse_persisted_index(self, tmp_path):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "a.md").write_text("Employment Pass salary SGD 5,600.\n", encoding="utf-8")
+        self._cold_start(data_dir)
+        with patch("document_parser.TextLoader") as loader:
+            self._cold_start(data_dir)
+            loader.assert_not_called()
+
+
+class TestChunkStore:
+
+    def _write_pdf_like_docs(self, data_dir):
+        data_dir.mkdir()
+        (data_dir / "a.md").write_text("Employment Pass salary SGD 5,600.\n", encoding="utf-8")
+        (data_dir / "b.md").write_text("Employment Pass salary SGD 5,600.\n", encoding="utf-8")
+
+    def test_chunks_persisted_with_metadata_and_deduplicated(self, tmp_path):
+        data_dir = tmp_path / "data"
+        self._write_pdf_like_docs(data_dir)
+        with patch.dict(os.environ, {"EMBEDDING_API_KEY": ""}, clear=False):
+            RAGSystem(data_dir=str(data_dir)).load_and_index()
+        chunks = load_chunks(str(tmp_path / "rag_chunks.jsonl"))
+        assert len(chunks) == 1
+        assert chunks[0].metadata["source"].endswith(".md")
+        assert len(chunks[0].metadata["chunk_hash"]) == 16
+
+    def test_cold_start_loads_chunks_lazily(self, tmp_path):
+        """A restarted keyword-mode RAGSystem reads neither documents nor chunks until queried."""
+        data_dir = tmp_path / "data"
+        self._write_pdf_like_docs(data_dir)
+        with patch.dict(os.environ, {"EMBEDDING_API_KEY": ""}, clear=False):
+            RAGSystem(data_dir=str(data_dir)).load_and_index()
+            rag = RAGSystem(data_dir=str(data_dir))
+            with patch("document_parser.TextLoader") as loader:
+                assert rag.load_and_index() is True
+                loader.assert_not_called()
+            assert rag._all_chunks is None
+            assert "SGD 5,600" in rag.retrieve("Employment Pass salary")
+            assert rag._all_chunks is not None
+
+    def test_save_load_round_trip_keeps_page(self, tmp_path):
+        path = str(tmp_path / "chunks.jsonl")
+        doc = Document(page_content="CPF rates", metadata={"source": "x.pdf", "page": 3, "chunk_hash": "abc"})
+        save_chunks([doc], path)
+        loaded = load_chunks(path)[0]
+        assert loaded.page_content == "CPF rates"
+        assert loaded.metadata == {"source": "x.pdf", "page": 3, "chunk_hash": "abc"}
+
+
+# ======================================================================
+# Hybrid retrieval — RRF fusion, MMR de-duplication, end-to-end
+# ======================================================================
+
+class _BagOfWordsEmbeddings(Embeddings):
+    """Tiny deterministic embedder: one dimension per vocabulary word."""
+
+    VOCAB = ["salary", "employment", "pass", "cpf", "contribution", "visa", "notice", "overtime"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        lower = text.lower()
+        return [float(lower.count(w)) + 0.01 for w in self.VOCAB]
+
+
+class TestReciprocalRankFusion:
+
+    def test_doc_ranked_high_in_both_lists_wins(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]])
+        assert [t for t, _ in fused][:2] in (["a", "b"], ["b", "a"])
+        assert dict(fused)["a"] == dict(fused)["b"]
+        assert dict(fused)["a"] > dict(fused)["c"]
+
+    def test_union_of_both_rankings(self):
+        fused = reciprocal_rank_fusion([["a"], ["b"]])
+        assert {t for t, _ in fused} == {"a", "b"}
+
+    def test_duplicates_within_a_ranking_counted_once(self):
+        fused = dict(reciprocal_rank_fusion([["a", "a"]]))
+        assert fused["a"] == 1.0 / 61
+
+
+class TestMMRSelect:
+
+    def test_near_duplicate_chunks_dropped(self):
+        text = "Employment Pass minimum salary is SGD 5,600 for new applicants in Singapore"
+        candidates = [(text, 1.0), (text + " today", 0.9), ("CPF contribution rates are 17 percent", 0.5)]
+        assert mmr_select(candidates, k=2) == [text, "CPF contribution rates are 17 percent"]
+
+    def test_respects_k_and_empty_input(self):
+        assert mmr_select([], k=3) == []
+        assert len(mmr_select([("a b", 1.0), ("c d", 0.5), ("e f", 0.2)], k=2)) == 2
+
+
+class TestRAGSystemHybridRetrieve:
+
+    def _make_rag(self, tmp_path):
+        data_dir = tmp_path / "data"
+        if not data_dir.exists():
+            data_dir.mkdir()
+            (data_dir / "playbook.md").write_text(
+                "Employment Pass minimum salary is SGD 5,600.\n\n" + "filler words " * 100
+                + "\n\nCPF contribution rates for employers are 17 percent.\n\n" + "more padding " * 100
+                + "\n\nNotice periods and overtime rules under the Malaysia Employment Act.\n",
+                encoding="utf-8",
+            )
+        with patch.dict(os.environ, {"EMBEDDING_API_KEY": "sk-test", "RAG_RETRIEVAL_MODE": "hybrid"}, clear=False):
+            rag = RAGSystem(data_dir=str(data_dir))
+        rag.embeddings = _BagOfWordsEmbeddings()
+        return rag
+
+    def test_hybrid_builds_both_indexes_and_fuses(self, tmp_path):
+        rag = self._make_rag(tmp_path)
+        with patch("document_parser.FAISS_INDEX_PATH", str(tmp_path / "faiss")), \
+                patch("document_parser.BM25_INDEX_PATH", str(tmp_path / "bm25.json")):
+            assert rag.load_and_index() is True
+            assert rag.vector_store is not None
+            assert rag.keyword_index is not None
+            result = rag.retrieve("CPF contribution", k=1)
+        assert "17 percent" in result
+
+    def test_hybrid_falls_back_to_lexical_when_vector_search_fails(self, tmp_path):
+        rag = self._make_rag(tmp_path)
+        with patch("document_parser.FAISS_INDEX_PATH", str(tmp_path / "faiss")), \
+                patch("document_parser.BM25_INDEX_PATH", str(tmp_path / "bm25.json")):
+            rag.load_and_index()
+            with patch.object(rag.vector_store, "similarity_search", side_effect=RuntimeError("boom")):
+                result = rag.retrieve("overtime notice periods", k=1)
+        assert "Malaysia Employment Act" in result
+
+    def test_hybrid_vector_search_runs_on_the_callers_thread(self, tmp_path):
+        """The shared RAGSystem must not funnel every session's query through one worker thread."""
+        import threading
+
+        rag = self._make_rag(tmp_path)
+        rag.load_and_index()
+        threads = []
+        search = rag.vector_store.similarity_search
+        with patch.object(rag.vector_store, "similarity_search",
+                          side_effect=lambda *a, **kw: threads.append(threading.current_thread()) or search(*a, **kw)):
+            rag.retrieve("CPF contribution", k=1)
+        assert threads == [threading.current_thread()]
+
+    def test_bm25_rebuilt_from_faiss_docstore_when_missing(self, tmp_path):
+        """Loading a saved FAISS index without a BM25 file rebuilds BM25 from the docstore."""
+        faiss_path = str(tmp_path / "faiss")
+        bm25_path = tmp_path / "bm25.json"
+        with patch("document_parser.FAISS_INDEX_PATH", faiss_path), \
+                patch("document_parser.BM25_INDEX_PATH", str(bm25_path)):
+            self._make_rag(tmp_path).load_and_index()
+            bm25_path.unlink()
+
+            rag = self._make_rag(tmp_path)
+            with patch("document_parser.TextLoader") as loader:
+                assert rag.load_and_index() is True
+                loader.assert_not_called()
+            assert rag.keyword_index is not None and len(rag.keyword_index) > 0
+            assert bm25_path.exists()
+
+
+    def test_refresh_source_swaps_only_changed_chunks(self, tmp_path):
+        rag = self._make_rag(tmp_path)
+        rag.load_and_index()
+        path = os.path.join(rag.data_dir, "playbook.md")
+        before = len(rag.all_chunks)
+        text = open(path, encoding="utf-8").read()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text.replace("17 percent", "20 percent from 2026"))
+
+        embedded = []
+        original = rag.embeddings.embed_documents
+        rag.embeddings.embed_documents = lambda texts: embedded.extend(texts) or original(texts)
+        stats = rag.refresh_source(path)
+
+        assert stats["added"] >= 1 and stats["removed"] >= 1 and not stats["rebuilt"]
+        assert len(embedded) == stats["added"] < before
+        assert len(rag.all_chunks) == before - stats["removed"] + stats["added"]
+        assert len(rag.vector_store.docstore._dict) == len(rag.all_chunks)
+        result = rag.retrieve("CPF contribution rates", k=1)
+        assert "20 percent from 2026" in result
+        assert "17 percent" not in result
+
+    def test_refresh_source_noop_when_file_unchanged(self, tmp_path):
+        rag = self._make_rag(tmp_path)
+        rag.load_and_index()
+        stats = rag.refresh_source(os.path.join(rag.data_dir, "playbook.md"))
+        assert (stats["added"], stats["removed"]) == (0, 0)
+
+
 # ======================================================================
 # RAGSystem.load_and_index
 # ======================================================================
@@ -136,28 +464,3 @@ class TestRAGSystemLoadAndIndex:
             rag = RAGSystem(data_dir=str(tmp_path))
             rag.vector_store = MagicMock()  # pretend it is already built
             assert rag.load_and_index() is True
-
-
-# ======================================================================
-# invalidate_rag_index
-# ======================================================================
-
-class TestInvalidateRagIndex:
-
-    def test_invalidate_does_not_crash_when_no_index_exists(self, tmp_path):
-        """invalidate_rag_index runs without error even if the FAISS index dir is absent."""
-        # Patch FAISS_INDEX_PATH to a guaranteed non-existent path
-        with patch("document_parser.FAISS_INDEX_PATH", str(tmp_path / "nonexistent_faiss")):
-            # Should not raise
-            invalidate_rag_index()
-
-    def test_invalidate_removes_existing_index_dir(self, tmp_path):
-        """invalidate_rag_index removes the persisted FAISS index directory."""
-        fake_index = tmp_path / "faiss_index"
-        fake_index.mkdir()
-        (fake_index / "index.faiss").write_text("dummy")
-
-        with patch("document_parser.FAISS_INDEX_PATH", str(fake_index)):
-            invalidate_rag_index()
-
-        assert not fake_index.exists()
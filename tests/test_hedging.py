@@ -0,0 +1,126 @@
+"""Tests for hedging — duplicate slow LLM calls, bounded by a spend cap."""
+
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from hedging import Hedger
+
+
+def _warm(hedger, seconds=0.01, n=20):
+    for _ in range(n):
+        hedger._observe(seconds)
+
+
+def test_no_hedge_while_warming_up():
+    hedger = Hedger(min_delay=0.0)
+    assert hedger.threshold() is None
+    assert hedger.call(lambda: "ok") == "ok"
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_threshold_uses_percentile_with_floor():
+    hedger = Hedger(percentile=90, min_delay=0.0)
+    for i in range(1, 21):
+        hedger._observe(i / 10)
+    assert hedger.threshold() == pytest.approx(1.9)
+    hedger.min_delay = 5.0
+    assert hedger.threshold() == 5.0
+
+
+def test_latency_windows_are_kept_per_model_and_kind():
+    hedger = Hedger(percentile=90, min_delay=0.0)
+    for _ in range(20):
+        hedger._observe(0.5, "fast", "resume_score")
+        hedger._observe(30.0, "strong", "jd")
+    assert hedger.threshold("fast", "resume_score") == 0.5
+    assert hedger.threshold("strong", "jd") == 30.0
+    assert hedger.threshold("fast", "jd") is None
+    assert hedger.stats()["threshold_s"] == {"fast/resume_score": 0.5, "strong/jd": 30.0}
+
+
+def test_slow_call_is_hedged_and_hedge_wins():
+    hedger = Hedger(min_delay=0.0, max_ratio=1.0)
+    _warm(hedger)
+    release = threading.Event()
+    attempts = []
+    discarded = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(2)  # the first attempt hangs
+            return "slow"
+        return "fast"
+
+    assert hedger.call(fn, on_discard=discarded.append) == "fast"
+    release.set()
+    time.sleep(0.05)
+    stats = hedger.stats()
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    assert discarded == ["slow"]
+
+
+def test_spend_cap_limits_hedges():
+    hedger = Hedger(min_delay=0.0, max_ratio=0.0)
+    _warm(hedger)
+    assert hedger.call(lambda: time.sleep(0.05) or "done") == "done"
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_guard_can_veto_hedges():
+    hedger = Hedger(min_delay=0.0, max_ratio=1.0)
+    _warm(hedger)
+    asked = []
+    assert hedger.call(lambda: time.sleep(0.05) or "done", may_hedge=lambda: asked.append(1) or False) == "done"
+    assert asked == [1]
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_failed_attempt_falls_through_to_other():
+    hedger = Hedger(min_delay=0.0, max_ratio=1.0)
+    _warm(hedger)
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.1)
+            raise TimeoutError("primary died")
+        time.sleep(0.2)
+        return "hedge"
+
+    assert hedger.call(fn) == "hedge"
+
+
+def test_all_attempts_failing_raises():
+    hedger = Hedger(min_delay=0.0, max_ratio=1.0)
+    _warm(hedger)
+
+    def fn():
+        time.sleep(0.05)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        hedger.call(fn)
+
+
+def test_from_env_disabled_by_default():
+    with patch.dict(os.environ, {"LLM_HEDGING": ""}):
+        assert Hedger.from_env() is None
+    with patch.dict(os.environ, {"LLM_HEDGING": "on", "HEDGE_MAX_RATIO": "0.1"}):
+        assert Hedger.from_env().max_ratio == 0.1
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "test-key", "LLM_HEDGING": "on"})
+def test_call_llm_routes_through_hedger():
+    from recruitment_agent import RecruitmentAgent
+    agent = RecruitmentAgent()
+    agent.client = MagicMock()
+    agent.client.chat.completions.create.return_value = MagicMock(usage=None)
+    agent._call_llm(model="m", messages=[], temperature=0.0, kind="resume_score")
+    assert agent.hedger.stats()["calls"] == 1
+    assert list(agent.hedger.stats()["threshold_s"]) == ["m/resume_score"]
@@ -0,0 +1,63 @@
+"""Tests for html_extractor — main-content extraction and chunk selection."""
+
+from html_extractor import chunk_sections, extract_sections, relevance_query, select_context
+
+PAGE = """<?xml version="1.0" encoding="utf-8"?>
+<html><head><title>EP guide</title><style>p {color: red}</style></head>
+<body class="has-sidebar">
+  <header><a href="/">Home</a> <a href="/about">About us</a></header>
+  <div class="cookie-banner"><p>We use cookies to improve your experience.</p></div>
+  <nav><ul><li>Services</li><li>Contact</li></ul></nav>
+  <main>
+    <h1>Singapore Employment Pass Guide</h1>
+    <p>This guide covers the <b>Employment Pass</b> for foreign professionals.</p>
+    <h2>Qualifying salary</h2>
+    <ul><li>SGD 5,600 minimum from January 2025</li><li>Higher for financial services</li></ul>
+    <h2>COMPASS framework</h2>
+    <p>Candidates must score 40 points under COMPASS.</p>
+    <div class="related-posts"><p>Read also: our office party recap</p></div>
+  </main>
+  <aside><p>Subscribe to our newsletter</p></aside>
+  <footer><p>© 2025 Acme Advisory</p></footer>
+  <script>track();</script>
+</body></html>"""
+
+
+def test_extracts_main_content_sections_without_boilerplate():
+    sections = extract_sections(PAGE)
+
+    assert [heading for heading, _ in sections] == [
+        "Singapore Employment Pass Guide", "Qualifying salary", "COMPASS framework",
+    ]
+    assert sections[1][1] == "SGD 5,600 minimum from January 2025\nHigher for financial services"
+    text = " ".join(body for _, body in sections)
+    for noise in ("cookies", "Services", "newsletter", "Acme", "track", "office party", "About us"):
+        assert noise not in text
+
+
+def test_flat_text_page_and_garbage_input():
+    assert extract_sections("<html><body><div>Just some text</div></body></html>") == [("", "Just some text")]
+    assert extract_sections("") == []
+
+
+def test_chunks_keep_their_heading():
+    sections = [("Notice periods", "\n".join(f"Rule {i}: " + "x" * 80 for i in range(30)))]
+    chunks = chunk_sections(sections, max_chars=500)
+    assert len(chunks) > 1
+    assert all(c.startswith("Notice periods\n") and len(c) <= 500 for c in chunks)
+
+
+def test_select_context_prefers_relevant_chunks_within_budget():
+    filler = [(f"Firm news {i}", "Our partners attended a gala dinner and golf day. " * 20) for i in range(20)]
+    sections = filler[:10] + [("Employment Pass salary", "Minimum qualifying salary SGD 5,600 for the visa.")] + filler[10:]
+
+    context = select_context(sections, relevance_query("Singapore", "Visa & Work Permit / 签证与工作许可"), budget=3000)
+
+    assert len(context) <= 3000
+    assert "SGD 5,600" in context
+    assert context.count("Firm news") < 20
+
+
+def test_select_context_returns_everything_when_it_fits():
+    sections = [("A", "alpha"), ("B", "beta")]
+    assert select_context(sections, "unrelated", budget=1000) == "A\nalpha\n\nB\nbeta"
@@ -0,0 +1,53 @@
+"""Tests for http_client — shared pooled httpx clients."""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import http_client
+
+
+@pytest.fixture(autouse=True)
+def _fresh_clients():
+    http_client.close_http_clients()
+    yield
+    http_client.close_http_clients()
+
+
+def test_client_is_shared_per_tls_mode():
+    insecure = http_client.get_http_client(verify=False)
+    assert http_client.get_http_client(verify=False) is insecure
+    assert http_client.get_http_client(verify=True) is not insecure
+
+
+def test_closed_client_is_replaced():
+    client = http_client.get_http_client()
+    client.close()
+    assert http_client.get_http_client() is not client
+
+
+def test_limits_and_timeouts_from_env():
+    with patch.dict(os.environ, {"HTTP_MAX_CONNECTIONS": "42", "HTTP_KEEPALIVE_EXPIRY": "5",
+                                 "HTTP_CONNECT_TIMEOUT": "3", "HTTP_READ_TIMEOUT": "bogus"}):
+        limits = http_client.http_limits()
+        timeout = http_client.http_timeout()
+    assert limits.max_connections == 42
+    assert limits.keepalive_expiry == 5.0
+    assert timeout.connect == 3.0
+    assert timeout.read == http_client.DEFAULT_READ_TIMEOUT
+
+
+def test_http2_falls_back_without_h2():
+    with patch.dict(os.environ, {"HTTP2": "1"}), patch.dict(sys.modules, {"h2": None}):
+        assert http_client._http2_enabled() is False
+    with patch.dict(os.environ, {"HTTP2": ""}):
+        assert http_client._http2_enabled() is False
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+def test_agent_uses_shared_client():
+    from recruitment_agent import RecruitmentAgent
+    agent = RecruitmentAgent()
+    assert agent.client._client is http_client.get_http_client(verify=False)
@@ -0,0 +1,185 @@
+"""Tests for job_queue — persistent background jobs."""
+
+import os
+import socket
+import sqlite3
+import time
+
+import pytest
+
+import job_queue
+import db as db_mod
+from job_queue import JobCancelled, JobQueue, JobWorker, register_job, stage_uploads
+from tests.test_auto_sourcer import FakeAgent, FakeUploadedFile
+
+
+@pytest.fixture(autouse=True)
+def _test_handlers(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_queue, "JOB_HANDLERS", dict(job_queue.JOB_HANDLERS))
+    monkeypatch.setattr(job_queue, "UPLOAD_DIR", str(tmp_path / "uploads"))
+
+    @register_job("echo")
+    def _echo(ctx, params):
+        ctx.progress(0.5, "halfway")
+        return {"echo": params["value"], "agent": type(ctx.agent).__name__}
+
+    @register_job("boom")
+    def _boom(ctx, params):
+        raise RuntimeError("exploded")
+
+    @register_job("cancel_me")
+    def _cancel_me(ctx, params):
+        ctx.queue.cancel(ctx.job_id)
+        ctx.progress(0.1, "checking")
+        raise AssertionError("progress should have raised JobCancelled")
+
+
+def test_submit_and_run_records_status_progress_and_result():
+    queue = JobQueue()
+    job_id = queue.submit("echo", {"value": 42})
+    assert queue.get(job_id)["status"] == "queued"
+
+    assert JobWorker(queue, agent_factory=FakeAgent).run_pending() == 1
+
+    job = queue.get(job_id)
+    assert job["status"] == "completed"
+    assert job["result"] == {"echo": 42, "agent": "FakeAgent"}
+    assert job["progress"] == 1.0 and job["message"] == "halfway"
+    assert job["started_at"] and job["finished_at"]
+
+
+def test_failures_and_unknown_kinds():
+    queue = JobQueue()
+    job_id = queue.submit("boom")
+    JobWorker(queue).run_pending()
+    assert (queue.get(job_id)["status"], queue.get(job_id)["error"]) == ("failed", "exploded")
+    with pytest.raises(ValueError):
+        queue.submit("nope")
+
+
+def test_cancel_queued_and_running_jobs():
+    queue = JobQueue()
+    queued = queue.submit("echo", {"value": 1})
+    assert queue.cancel(queued)
+    running = queue.submit("cancel_me")
+
+    assert JobWorker(queue).run_pending() == 1
+    assert queue.get(queued)["status"] == "cancelled"
+    assert queue.get(running)["status"] == "cancelled"
+    assert not queue.cancel(running)
+
+
+def test_jobs_are_claimed_once_in_fifo_order():
+    queue = JobQueue()
+    first, second = queue.submit("echo", {"value": 1}), queue.submit("echo", {"value": 2})
+    assert queue.claim_next()["id"] == first
+    assert queue.claim_next()["id"] == second
+    assert queue.claim_next() is None
+    assert queue.active_job("echo")["id"] == first
+
+
+def _running_job(queue, worker, heartbeat_at=None):
+    job_id = queue.submit("echo", {"value": 1})
+    queue.claim_next()
+    conn = db_mod.get_db()
+    conn.execute("UPDATE jobs SET worker = ?, heartbeat_at = COALESCE(?, heartbeat_at) WHERE id = ?",
+                 (worker, heartbeat_at, job_id))
+    conn.commit()
+    return job_id
+
+
+def test_interrupted_jobs_from_dead_workers_are_failed(monkeypatch):
+    queue = JobQueue()
+    job_id = _running_job(queue, f"{socket.gethostname()}:4242:oldboot")
+    monkeypatch.setattr(job_queue, "_pid_alive", lambda pid: False)
+    assert queue.recover_interrupted() == 1
+    assert queue.get(job_id)["status"] == "failed"
+
+
+def test_restarted_process_with_same_host_and_pid_recovers_old_jobs(monkeypatch):
+    """A container restarted as PID 1 looks alive by host:pid; the boot id tells it apart."""
+    queue = JobQueue()
+    job_id = _running_job(queue, f"{socket.gethostname()}:{os.getpid()}:oldboot")
+    monkeypatch.setattr(job_queue, "_pid_alive", lambda pid: True)
+    assert queue.recover_interrupted() == 1
+    assert "exited" in queue.get(job_id)["error"]
+
+
+def test_own_running_jobs_are_not_recovered():
+    queue = JobQueue()
+    job_id = queue.submit("echo", {"value": 1})
+    queue.claim_next()
+    assert queue.recover_interrupted() == 0
+    assert queue.get(job_id)["status"] == "running"
+
+
+def test_silent_remote_worker_is_recovered_after_staleness_cutoff():
+    queue = JobQueue()
+    job_id = _running_job(queue, "other-host:1:abc")
+    assert queue.recover_interrupted() == 0
+    _running_job(queue, "other-host:1:abc", heartbeat_at="2000-01-01 00:00:00")
+    assert queue.recover_interrupted() == 1
+    assert queue.get(job_id)["status"] == "running"
+
+
+def test_background_worker_threads_process_jobs():
+    # Worker threads share the connection, as the app's get_db() singleton allows
+    db_mod.set_connection(sqlite3.connect(":memory:", check_same_thread=False))
+    queue = JobQueue()
+    worker = JobWorker(queue, poll_interval=0.01).start()
+    try:
+        job_id = queue.submit("echo", {"value": "bg"})
+        deadline = time.time() + 5
+        while queue.get(job_id)["status"] != "completed" and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop(timeout=2)
+    assert queue.get(job_id)["result"]["echo"] == "bg"
+
+
+def test_talent_import_job_imports_staged_uploads_and_cleans_up(tpm):
+    directory = stage_uploads([FakeUploadedFile("a.txt", b"alice resume"), FakeUploadedFile("b.txt", b"bob resume")])
+    queue = JobQueue()
+    job_id = queue.submit("talent_import", {"directory": directory, "cleanup": True})
+
+    JobWorker(queue, agent_factory=FakeAgent).run_pending()
+
+    job = queue.get(job_id)
+    assert job["status"] == "completed", job["error"]
+    assert job["result"]["imported"] == 2
+    assert len(tpm.get_all_talents()) == 2
+    assert not os.path.exists(directory)
+
+
+def test_resume_evaluation_job_keeps_upload_order():
+    files = [FakeUploadedFile(name, f"resume {name}".encode()) for name in ("z.txt", "a.txt", "z.txt")]
+    queue = JobQueue()
+    job_id = queue.submit("resume_evaluation", {"jd": "Go engineer", "directory": stage_uploads(files, numbered=True)})
+
+    JobWorker(queue, agent_factory=FakeAgent).run_pending()
+
+    results = queue.get(job_id)["result"]["results"]
+    assert [r["file_name"] for r in results] == ["z.txt", "a.txt", "z.txt"]
+    assert all(r["evaluation"] and not r["error"] for r in results)
+
+
+def test_auto_sourcing_job_is_bounded_by_env_run_limits(tmp_path, tpm, monkeypatch):
+    from auto_sourcer import AutoSourcer
+    from hc_manager import HCManager
+    from tests.test_auto_sourcer import _seed_hc
+
+    monkeypatch.setenv("SOURCING_MAX_CALLS", "1")
+    hc_id = _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    tpm.import_files([FakeUploadedFile(f"cv{i}.pdf", f"resume {i}".encode()) for i in range(3)], FakeAgent())
+    queue = JobQueue()
+    job_id = queue.submit("auto_sourcing", {"hc_ids": [hc_id]})
+
+    JobWorker(queue, agent_factory=FakeAgent).run_pending()
+
+    run_id = queue.get(job_id)["result"]["run_id"]
+    run = next(r for r in AutoSourcer(FakeAgent()).get_run_history() if r["id"] == run_id)
+    assert (run["status"], run["llm_calls"]) == ("partial", 1)
+
+
+def test_job_cancelled_is_an_exception():
+    assert issubclass(JobCancelled, Exception)
@@ -0,0 +1,69 @@
+"""Tests for keyword_index.py — tokenizer and BM25Index."""
+
+from keyword_index import BM25Index, tokenize
+
+
+class TestTokenize:
+
+    def test_latin_words_lowercased_without_stopwords(self):
+        assert tokenize("What is the EP Minimum Salary?") == ["ep", "minimum", "salary"]
+
+    def test_cjk_runs_become_bigrams(self):
+        assert tokenize("公积金") == ["公积", "积金"]
+
+    def test_single_cjk_char_kept_as_unigram(self):
+        assert tokenize("EP 与 CPF") == ["ep", "与", "cpf"]
+
+    def test_mixed_script_and_symbols(self):
+        assert tokenize("C++ 与K8s签证") == ["c++", "与", "k8s", "签证"]
+
+
+class TestBM25Index:
+
+    DOCS = [
+        "Singapore Employment Pass minimum salary is SGD 5,600 for new applicants.",
+        "CPF contribution rates for employers in Singapore are 17 percent.",
+        "Malaysia Employment Act amendments cover overtime and notice periods.",
+        "新加坡 EP 签证最低薪资要求为 5600 新元。",
+    ]
+
+    def test_ranks_most_relevant_first(self):
+        index = BM25Index.build(self.DOCS)
+        hits = index.search("CPF contribution rates", k=3)
+        assert hits[0][0] == 1
+        assert all(hits[i][1] >= hits[i + 1][1] for i in range(len(hits) - 1))
+
+    def test_non_matching_docs_omitted(self):
+        index = BM25Index.build(self.DOCS)
+        assert [doc_id for doc_id, _ in index.search("overtime")] == [2]
+
+    def test_chinese_query_matches_chinese_doc(self):
+        index = BM25Index.build(self.DOCS)
+        assert index.search("EP 签证薪资", k=1)[0][0] == 3
+
+    def test_no_match_returns_empty(self):
+        index = BM25Index.build(self.DOCS)
+        assert index.search("quantum chromodynamics") == []
+
+    def test_custom_keys_preserved(self):
+        index = BM25Index.build(["alpha beta", "gamma"], keys=["h1", "h2"])
+        doc_id, _ = index.search("gamma")[0]
+        assert index.keys[doc_id] == "h2"
+
+    def test_persisted_file_holds_no_document_text(self, tmp_path):
+        path = tmp_path / "bm25.json"
+        BM25Index.build(["Employment Pass salary"], keys=["h1"]).save(str(path))
+        assert "Employment Pass salary" not in path.read_text(encoding="utf-8")
+
+    def test_empty_index(self):
+        index = BM25Index.build([])
+        assert len(index) == 0
+        assert index.search("anything") == []
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        index = BM25Index.build(self.DOCS)
+        path = str(tmp_path / "bm25.json")
+        index.save(path)
+        loaded = BM25Index.load(path)
+        assert loaded.keys == index.keys
+        assert loaded.search("Employment Pass salary") == index.search("Employment Pass salary")
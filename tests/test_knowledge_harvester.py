@@ -0,0 +1,151 @@
+"""Tests for knowledge_harvester — concurrent multi-URL harvesting."""
+
+import threading
+import time
+
+import httpx
+
+from knowledge_harvester import KnowledgeHarvester, _HostThrottle
+
+PAGE = "<html><nav>Menu</nav><p>{}</p><script>x()</script></html>"
+POLICY = "Singapore EP minimum qualifying salary rises to SGD 5,600 from January 2025. " * 2
+
+
+class FakeAgent:
+    def __init__(self):
+        self.calls = []
+
+    def extract_web_knowledge(self, target_url, region, category, raw_text):
+        self.calls.append(target_url)
+        if "irrelevant" in target_url:
+            return "EXTRACTION_FAILED"
+        return f"Fact from {target_url}"
+
+
+def _client(pages: dict[str, tuple[int, str]]):
+    def handler(request):
+        status, body = pages[str(request.url)]
+        return httpx.Response(status, text=body)
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def _source(url):
+    return {"url": url, "region": "Singapore", "category": "Official Law / 官方政策法规", "label": url}
+
+
+def test_harvest_stores_fragments_and_reports_each_source(km):
+    pages = {
+        "https://a.example/ep": (200, PAGE.format(POLICY)),
+        "https://b.example/irrelevant": (200, PAGE.format(POLICY)),
+        "https://c.example/blocked": (200, PAGE.format("Access denied")),
+        "https://d.example/missing": (404, "not found"),
+    }
+    agent = FakeAgent()
+    harvester = KnowledgeHarvester(agent, km=km, client=_client(pages), host_min_interval=0)
+    seen = []
+
+    results = harvester.harvest([_source(url) for url in pages], on_result=seen.append)
+
+    assert [r["status"] for r in results] == ["added", "no_knowledge", "too_short", "error"]
+    assert len(seen) == 4
+    assert "Menu" not in harvester.fetch_page("https://a.example/ep")["text"]
+    fragments = km.get_all_fragments()
+    assert [(f["source_url"], f["content"]) for f in fragments] == [
+        ("https://a.example/ep", "Fact from https://a.example/ep"),
+    ]
+    # Blocked and failed pages never reach the LLM
+    assert sorted(agent.calls) == ["https://a.example/ep", "https://b.example/irrelevant"]
+
+
+def test_forced_reharvest_of_same_content_is_duplicate(km):
+    pages = {"https://a.example/ep": (200, PAGE.format(POLICY))}
+    harvester = KnowledgeHarvester(FakeAgent(), km=km, client=_client(pages), host_min_interval=0)
+    assert harvester.harvest_one(_source("https://a.example/ep"))["status"] == "added"
+    assert harvester.harvest_one(_source("https://a.example/ep"), force=True)["status"] == "duplicate"
+
+
+class TestCrawlCache:
+    URL = "https://a.example/ep"
+
+    def _conditional_client(self, body, seen):
+        """Serves ETag "v1"; answers 304 when the client presents it."""
+        def handler(request):
+            seen.append(dict(request.headers))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=body(), headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Sep 2025 00:00:00 GMT"})
+        return httpx.Client(transport=httpx.MockTransport(handler))
+
+    def test_304_skips_llm(self, km):
+        seen, agent = [], FakeAgent()
+        harvester = KnowledgeHarvester(agent, km=km, client=self._conditional_client(lambda: PAGE.format(POLICY), seen),
+                                       host_min_interval=0)
+        assert harvester.harvest_one(_source(self.URL))["status"] == "added"
+        assert harvester.harvest_one(_source(self.URL))["status"] == "unchanged"
+        assert seen[1]["if-none-match"] == '"v1"'
+        assert seen[1]["if-modified-since"] == "Mon, 01 Sep 2025 00:00:00 GMT"
+        assert len(agent.calls) == 1
+
+    def test_same_text_without_validators_skips_llm(self, km):
+        agent = FakeAgent()
+        # Markup noise around identical visible text still hashes the same
+        bodies = iter([PAGE.format(POLICY), "<div><script>y()</script>" + PAGE.format(POLICY) + "</div>"])
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=next(bodies))))
+        harvester = KnowledgeHarvester(agent, km=km, client=client, host_min_interval=0)
+        harvester.harvest_one(_source(self.URL))
+        assert harvester.harvest_one(_source(self.URL))["status"] == "unchanged"
+        assert len(agent.calls) == 1
+
+    def test_changed_text_is_reextracted(self, km):
+        agent = FakeAgent()
+        bodies = iter([PAGE.format(POLICY), PAGE.format(POLICY + " Updated for 2026.")])
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=next(bodies))))
+        harvester = KnowledgeHarvester(agent, km=km, client=client, host_min_interval=0)
+        harvester.harvest_one(_source(self.URL))
+        assert harvester.harvest_one(_source(self.URL))["status"] == "duplicate"
+        assert len(agent.calls) == 2
+
+    def test_failed_extraction_is_not_cached(self, km):
+        class FailingAgent(FakeAgent):
+            def extract_web_knowledge(self, *args):
+                super().extract_web_knowledge(*args)
+                return "❌ Knowledge extraction failed / 知识提取失败: timeout"
+
+        agent = FailingAgent()
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=PAGE.format(POLICY))))
+        harvester = KnowledgeHarvester(agent, km=km, client=client, host_min_interval=0)
+        assert harvester.harvest_one(_source(self.URL))["status"] == "error"
+        assert harvester.harvest_one(_source(self.URL))["status"] == "error"
+        assert len(agent.calls) == 2
+
+
+def test_host_throttle_caps_concurrency_per_host():
+    throttle = _HostThrottle(concurrency=1, min_interval=0)
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def hit(host):
+        with throttle.slot(host):
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+    threads = [threading.Thread(target=hit, args=(host,)) for host in ["a", "a", "a", "b", "b"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == {"a": 1, "b": 1}
+
+
+def test_host_throttle_spaces_request_starts():
+    throttle = _HostThrottle(concurrency=4, min_interval=0.05)
+    starts = []
+    for _ in range(3):
+        with throttle.slot("a"):
+            starts.append(time.monotonic())
+    assert starts[2] - starts[0] >= 0.09
@@ -0,0 +1,87 @@
+"""Tests for knowledge_refresh — expiry-driven re-harvest runs."""
+
+import httpx
+
+from knowledge_harvester import KnowledgeHarvester
+from knowledge_refresh import KnowledgeRefresher
+from tests.test_knowledge_harvester import PAGE, POLICY, FakeAgent
+
+CATEGORY = "Official Law / 官方政策法规"
+
+
+class FakeRAG:
+    def __init__(self):
+        self.refreshed = []
+
+    def refresh_source(self, path):
+        self.refreshed.append(path)
+        return {"added": 2, "removed": 1, "rebuilt": False}
+
+
+def _refresher(km, tmp_path, pages):
+    def handler(request):
+        status, body = pages[str(request.url)]
+        return httpx.Response(status, text=body)
+
+    harvester = KnowledgeHarvester(FakeAgent(), km=km, client=httpx.Client(transport=httpx.MockTransport(handler)),
+                                   host_min_interval=0)
+    rag = FakeRAG()
+    return KnowledgeRefresher(harvester, rag=rag, playbook_path=str(tmp_path / "playbook.md")), rag
+
+
+def test_refresh_replaces_renews_and_logs(km, tmp_path):
+    changed, same, broken, fresh = (f"https://{h}.example/p" for h in "abcd")
+    km.add_fragment("Singapore", CATEGORY, "Old EP salary rule", source_url=changed, ttl_days=-1)
+    # FakeAgent extracts "Fact from <url>", so this source re-extracts to identical content
+    km.add_fragment("Singapore", CATEGORY, f"Fact from {same}", source_url=same, ttl_days=5)
+    km.add_fragment("Malaysia", CATEGORY, "Broken page rule", source_url=broken, ttl_days=-1)
+    km.add_fragment("Malaysia", CATEGORY, "Fresh rule", source_url=fresh, ttl_days=60)
+    pages = {changed: (200, PAGE.format(POLICY)), same: (200, PAGE.format(POLICY)), broken: (500, "")}
+    refresher, rag = _refresher(km, tmp_path, pages)
+
+    run_id = refresher.run(within_days=14)
+
+    by_url = {f["source_url"]: f for f in km.get_all_fragments()}
+    assert by_url[changed]["content"] == f"Fact from {changed}"
+    assert km.get_expiry_status(by_url[same]) == "ok"
+    assert km.get_expiry_status(by_url[broken]) == "expired"
+    assert len(by_url) == 4
+    assert rag.refreshed == [str(tmp_path / "playbook.md")]
+    assert (tmp_path / "playbook.md").exists()
+
+    run = refresher.get_run_history()[0]
+    assert run["id"] == run_id and run["status"] == "completed"
+    assert (run["sources_checked"], run["refreshed"], run["unchanged"], run["failed"]) == (3, 1, 1, 1)
+    assert (run["fragments_retired"], run["chunks_added"], run["chunks_removed"]) == (1, 2, 1)
+
+
+def test_nothing_expiring_skips_recompile(km, tmp_path):
+    km.add_fragment("Singapore", CATEGORY, "Fresh rule", source_url="https://a.example/p", ttl_days=60)
+    km.add_fragment("Singapore", CATEGORY, "Manual rule", ttl_days=-1)
+    refresher, rag = _refresher(km, tmp_path, {})
+
+    refresher.run()
+
+    assert rag.refreshed == []
+    run = refresher.get_run_history()[0]
+    assert (run["status"], run["sources_checked"]) == ("completed", 0)
+
+
+def test_source_feeding_several_regions_is_refreshed_per_region(km, tmp_path):
+    url = "https://a.example/p"
+    km.add_fragment("Singapore", CATEGORY, "Old SG rule", source_url=url, ttl_days=-1)
+    km.add_fragment("Malaysia", CATEGORY, "Old MY rule", source_url=url, ttl_days=-1)
+
+    class RegionAgent(FakeAgent):
+        def extract_web_knowledge(self, url, region, category, context):
+            return f"Fact for {region} from {url}"
+
+    refresher, _rag = _refresher(km, tmp_path, {url: (200, PAGE.format(POLICY))})
+    refresher.harvester.agent = RegionAgent()
+
+    refresher.run()
+
+    assert sorted((f["region"], f["content"]) for f in km.get_all_fragments()) == [
+        ("Malaysia", f"Fact for Malaysia from {url}"), ("Singapore", f"Fact for Singapore from {url}")]
+    run = refresher.get_run_history()[0]
+    assert (run["sources_checked"], run["refreshed"], run["fragments_retired"]) == (2, 2, 2)
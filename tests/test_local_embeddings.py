@@ -0,0 +1,100 @@
+"""Tests for local_embeddings.py — offline embedding backends."""
+
+import math
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.modules.setdefault("streamlit", MagicMock())
+
+from local_embeddings import HashingEmbeddings, get_local_embeddings  # noqa: E402
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class TestHashingEmbeddings:
+
+    def test_vectors_are_unit_length_and_fixed_dim(self):
+        emb = HashingEmbeddings(dim=128)
+        vec = emb.embed_query("Employment Pass minimum salary")
+        assert len(vec) == 128
+        assert math.isclose(math.sqrt(sum(v * v for v in vec)), 1.0, rel_tol=1e-9)
+
+    def test_deterministic(self):
+        assert HashingEmbeddings().embed_query("CPF 公积金") == HashingEmbeddings().embed_query("CPF 公积金")
+
+    def test_related_text_is_closer(self):
+        emb = HashingEmbeddings()
+        query = emb.embed_query("employment pass salary")
+        related = emb.embed_query("Minimum salary for the Employment Pass is SGD 5,600")
+        unrelated = emb.embed_query("Notice periods under the Malaysia labour act")
+        assert _cosine(query, related) > _cosine(query, unrelated)
+
+    def test_batched_pool_matches_sequential(self):
+        texts = [f"document number {i} about visas" for i in range(10)]
+        pooled = HashingEmbeddings(batch_size=3, max_workers=3).embed_documents(texts)
+        sequential = HashingEmbeddings(batch_size=100, max_workers=1).embed_documents(texts)
+        assert pooled == sequential
+
+    def test_empty_text_gives_zero_vector(self):
+        assert set(HashingEmbeddings(dim=8).embed_query("")) == {0.0}
+
+
+class TestGetLocalEmbeddings:
+
+    def test_hashing_backend_reads_env(self):
+        with patch.dict(os.environ, {"HASHING_EMBEDDING_DIM": "64", "EMBEDDING_BATCH_SIZE": "16"}, clear=False):
+            emb = get_local_embeddings("hashing")
+        assert isinstance(emb, HashingEmbeddings)
+        assert emb.dim == 64 and emb.batch_size == 16
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError, match="Unknown local embedding backend"):
+            get_local_embeddings("word2vec")
+
+
+class TestRAGSystemLocalBackend:
+
+    def test_hashing_backend_enables_vector_mode(self, tmp_path):
+        from document_parser import RAGSystem
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "playbook.md").write_text("CPF contribution rates are 17 percent.\n", encoding="utf-8")
+        with patch.dict(os.environ, {"EMBEDDING_BACKEND": "hashing", "EMBEDDING_API_KEY": ""}, clear=False), \
+                patch("document_parser.FAISS_INDEX_PATH", str(tmp_path / "faiss")), \
+                patch("document_parser.BM25_INDEX_PATH", str(tmp_path / "bm25.json")), \
+                patch("document_parser.CHUNK_STORE_PATH", str(tmp_path / "chunks.jsonl")), \
+                patch("document_parser.SOURCE_MANIFEST_PATH", str(tmp_path / "sources.json")):
+            rag = RAGSystem(data_dir=str(data_dir))
+            assert rag.embedding_mode == "vector"
+            assert rag.load_and_index() is True
+            assert "17 percent" in rag.retrieve("CPF contribution")
+
+    def test_missing_sentence_transformers_falls_back_to_keyword(self):
+        from document_parser import RAGSystem
+        with patch.dict(os.environ, {"EMBEDDING_BACKEND": "sentence-transformers"}, clear=False), \
+                patch.dict(sys.modules, {"sentence_transformers": None}):
+            rag = RAGSystem(data_dir="/tmp/nonexistent_rag_test_dir")
+        assert rag.embedding_mode == "keyword"
+
+    def test_index_from_other_backend_is_rebuilt(self, tmp_path):
+        """Switching backends (different vector dimension) rebuilds instead of loading a stale index."""
+        from document_parser import RAGSystem
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "playbook.md").write_text("CPF contribution rates are 17 percent.\n", encoding="utf-8")
+        with patch("document_parser.FAISS_INDEX_PATH", str(tmp_path / "faiss")), \
+                patch("document_parser.BM25_INDEX_PATH", str(tmp_path / "bm25.json")), \
+                patch("document_parser.CHUNK_STORE_PATH", str(tmp_path / "chunks.jsonl")), \
+                patch("document_parser.SOURCE_MANIFEST_PATH", str(tmp_path / "sources.json")):
+            with patch.dict(os.environ, {"EMBEDDING_BACKEND": "hashing", "HASHING_EMBEDDING_DIM": "64"}, clear=False):
+                RAGSystem(data_dir=str(data_dir)).load_and_index()
+            with patch.dict(os.environ, {"EMBEDDING_BACKEND": "hashing", "HASHING_EMBEDDING_DIM": "32"}, clear=False):
+                rag = RAGSystem(data_dir=str(data_dir))
+                assert rag.load_and_index() is True
+            assert rag.vector_store.index.d == 32
+            assert "17 percent" in rag.retrieve("CPF contribution")
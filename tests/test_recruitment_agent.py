@@ -124,6 +124,16 @@ class TestExtractTextFromFile:
         result = agent.extract_text_from_file("cv.TXT", content.encode("utf-8"))
         assert result == content
 
+    def test_pdf_pages_separated_for_boilerplate_cleanup(self, monkeypatch):
+        """PDF pages are joined with PAGE_SEPARATOR."""
+        from types import SimpleNamespace
+        from resume_preprocessor import PAGE_SEPARATOR
+        pages = [SimpleNamespace(extract_text=lambda: "Jane Doe\nPage 1"),
+                 SimpleNamespace(extract_text=lambda: "Jane Doe\nPage 2")]
+        monkeypatch.setattr("recruitment_agent.PdfReader", lambda _stream: SimpleNamespace(pages=pages))
+        result = self._make_agent().extract_text_from_file("cv.pdf", b"%PDF")
+        assert result.split(PAGE_SEPARATOR) == ["Jane Doe\nPage 1\n", "Jane Doe\nPage 2\n"]
+
     def test_unsupported_format_returns_error_message(self):
         """An unsupported file extension returns a descriptive error string."""
         agent = self._make_agent()
@@ -158,3 +168,151 @@ class TestModuleConstants:
         """get_llm_usage_log returns at most 50 entries."""
         result = get_llm_usage_log()
         assert len(result) <= 50
+
+
+# ======================================================================
+# Resume evaluation prompt layout / prompt caching
+# ======================================================================
+
+class TestResumePromptLayout:
+
+    def _make_agent(self, model="claude-haiku-4-5-20251001", prompt_cache="auto"):
+        agent = RecruitmentAgent.__new__(RecruitmentAgent)
+        agent.model = model
+        agent.prompt_cache = prompt_cache
+        agent.system_prompt = "SYSTEM"
+        return agent
+
+    def test_prefix_is_identical_across_resumes(self):
+        """Only the final content part varies between resumes for the same JD."""
+        agent = self._make_agent()
+        a = agent._resume_eval_messages("JD text", "Resume A")
+        b = agent._resume_eval_messages("JD text", "Resume B")
+        assert a[0] == b[0]
+        assert a[1]["content"][0] == b[1]["content"][0]
+        assert "JD text" in a[1]["content"][0]["text"]
+        assert "Resume A" in a[1]["content"][-1]["text"]
+        assert "Resume A" not in a[1]["content"][0]["text"]
+
+    def test_cache_marker_on_prefix_for_claude(self):
+        agent = self._make_agent()
+        parts = agent._resume_eval_messages("JD", "CV")[1]["content"]
+        assert parts[0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in parts[1]
+
+    def test_plain_string_without_markers(self):
+        """Non-Claude models get a plain string, resume still last for automatic prefix caching."""
+        agent = self._make_agent(model="gpt-4o-mini")
+        content = agent._resume_eval_messages("JD", "CV")[1]["content"]
+        assert isinstance(content, str)
+        assert content.index("JD") < content.index("CV")
+
+    def test_prompt_cache_override(self):
+        assert isinstance(self._make_agent(model="gpt-4o", prompt_cache="on")._resume_eval_messages("JD", "CV")[1]["content"], list)
+        assert isinstance(self._make_agent(prompt_cache="off")._resume_eval_messages("JD", "CV")[1]["content"], str)
+
+    def test_cached_tokens_recorded_in_usage_log(self):
+        from types import SimpleNamespace
+        agent = self._make_agent()
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=50, total_tokens=1250,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+        agent._record_usage("m", usage)
+        assert get_llm_usage_log()[-1]["cached_tokens"] == 1024
+        agent._record_usage("m", SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2))
+        assert get_llm_usage_log()[-1]["cached_tokens"] == 0
+
+
+# ======================================================================
+# Structured resume scores / batch scoring
+# ======================================================================
+
+class TestResumeScore:
+
+    def test_total_and_verdict_recomputed(self):
+        from recruitment_agent import ResumeScore
+        score = ResumeScore(mission_match=30, tech_stack_depth=30, deal_breaker_avoidance=20,
+                            total=55, verdict="Disqualified")
+        assert score.total == 80
+        assert score.verdict == "Strong Match"
+
+    def test_deal_breaker_violation_disqualifies_regardless_of_total(self):
+        from recruitment_agent import ResumeScore
+        score = ResumeScore(mission_match=40, tech_stack_depth=40, deal_breaker_avoidance=0, verdict="Strong Match")
+        assert score.total == 80
+        assert score.verdict == "Disqualified"
+
+    def test_out_of_range_dimension_rejected(self):
+        import pytest
+        from pydantic import ValidationError
+        from recruitment_agent import ResumeScore
+        with pytest.raises(ValidationError):
+            ResumeScore(mission_match=45, tech_stack_depth=0, deal_breaker_avoidance=0)
+        with pytest.raises(ValidationError):
+            ResumeScore(mission_match=10, tech_stack_depth=0, deal_breaker_avoidance=10)
+
+    def test_render_markdown_is_parseable_by_auto_sourcer(self):
+        from auto_sourcer import AutoSourcer
+        from recruitment_agent import ResumeScore
+        md = ResumeScore(mission_match=20, tech_stack_depth=20, deal_breaker_avoidance=20).render_markdown()
+        assert AutoSourcer(agent=None)._parse_score(md) == (60.0, "Borderline Pass")
+
+
+def _agent_returning(content):
+    """Agent whose mocked client always answers with ``content``."""
+    from unittest.mock import MagicMock
+    agent = RecruitmentAgent.__new__(RecruitmentAgent)
+    agent.model = "gpt-4o-mini"
+    agent.prompt_cache = "auto"
+    agent.system_prompt = ""
+    agent.client = MagicMock()
+    choice = MagicMock()
+    choice.message.content = content
+    agent.client.chat.completions.create.return_value = MagicMock(choices=[choice], usage=None)
+    return agent
+
+
+class TestEvaluateResumesBatch:
+
+    def test_aliases_mapped_back_to_caller_ids(self):
+        content = """```json
+{"results": [
+ {"candidate_id": "C2", "mission_match": 10, "tech_stack_depth": 10, "deal_breaker_avoidance": 0,
+  "total": 20, "verdict": "Disqualified", "rationale": "thin"},
+ {"candidate_id": "C9", "mission_match": 40, "tech_stack_depth": 40, "deal_breaker_avoidance": 20,
+  "total": 100, "verdict": "Strong Match", "rationale": "unknown id"}
+]}
+```"""
+        agent = _agent_returning(content)
+        scores = agent.evaluate_resumes_batch("JD", {"tal_a": "resume a", "tal_b": "resume b"})
+        assert list(scores) == ["tal_b"]
+        assert scores["tal_b"].total == 20
+        prompt = agent.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert '<candidate id="C1">' in prompt and "tal_a" not in prompt
+
+    def test_invalid_response_raises(self):
+        import pytest
+        agent = _agent_returning("Sorry, I cannot do that.")
+        with pytest.raises(ValueError):
+            agent.evaluate_resumes_batch("JD", {"a": "x", "b": "y"})
+
+
+class TestEvaluateResumeStructured:
+
+    def test_valid_json_parsed(self):
+        agent = _agent_returning('{"mission_match": 40, "tech_stack_depth": 30, '
+                                 '"deal_breaker_avoidance": 20, "total": 90, '
+                                 '"verdict": "Strong Match", "rationale": "Led OpenShift migration."}')
+        score = agent.evaluate_resume_structured("JD", "resume")
+        assert (score.total, score.verdict) == (90, "Strong Match")
+        assert "Total Score**: 90 / 100" in score.render_markdown()
+
+    def test_model_override(self):
+        agent = _agent_returning('{"mission_match": 0, "tech_stack_depth": 0, "deal_breaker_avoidance": 0}')
+        agent.evaluate_resume_structured("JD", "resume", model="strong")
+        assert agent.client.chat.completions.create.call_args.kwargs["model"] == "strong"
+
+    def test_markdown_response_raises(self):
+        import pytest
+        agent = _agent_returning("### 📊 Quantified Assessment\n- **Total Score**: 85 / 100")
+        with pytest.raises(ValueError):
+            agent.evaluate_resume_structured("JD", "resume")
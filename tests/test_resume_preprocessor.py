@@ -0,0 +1,92 @@
+"""Tests for resume_preprocessor — whitespace, boilerplate, sections, token budget."""
+
+from resume_preprocessor import (
+    PAGE_SEPARATOR,
+    _PAGE_NUMBER_RE,
+    compact_resume,
+    count_tokens,
+    drop_boilerplate,
+    normalize_whitespace,
+    split_sections,
+    truncate_to_tokens,
+)
+
+
+def test_normalize_whitespace():
+    raw = "Jane  Doe \r\n\r\n\r\n\r\nSenior\t\tSRE​   \n   "
+    assert normalize_whitespace(raw) == "Jane Doe\n\nSenior SRE"
+
+
+def test_normalize_whitespace_keeps_page_separators():
+    assert normalize_whitespace("a  b\n\f\n\n c \f\f") == "a b\n\f\nc"
+
+
+def test_drop_boilerplate_removes_repeated_headers_and_page_numbers():
+    pages = [["ACME Resume Service", "Experience", "Built platform", "Page 1 of 3"],
+             ["ACME Resume Service", "More work", "2"],
+             ["ACME Resume Service", "Skills", "Go", "第 3 页"]]
+    text = drop_boilerplate(PAGE_SEPARATOR.join("\n".join(page) for page in pages))
+    assert "ACME Resume Service" not in text
+    assert "Page 1 of 3" not in text and "第 3 页" not in text
+    assert "Built platform" in text and "Go" in text
+    assert PAGE_SEPARATOR not in text
+
+
+def test_repeated_employer_and_title_inside_pages_are_kept():
+    pages = [["Jane Doe", "Experience", "Acme Corp", "Senior SRE", "Ran Kubernetes", "Acme Corp",
+              "Senior SRE", "Built CI", "Page 1"],
+             ["Jane Doe", "Acme Corp", "Senior SRE", "Migrated to GKE", "Kubernetes", "Kubernetes", "Page 2"]]
+    text = drop_boilerplate(PAGE_SEPARATOR.join("\n".join(page) for page in pages))
+    assert "Jane Doe" not in text
+    assert text.count("Acme Corp") == 3
+    assert text.count("Senior SRE") == 3
+    assert text.count("Kubernetes") == 3
+
+
+def test_digit_only_content_at_page_edges_is_kept():
+    text = compact_resume("Jane Doe\n13800138000\nExperience\nRan Kubernetes\nEducation\nMIT BSc\n2015")
+    assert "13800138000" in text and "2015" in text
+
+
+def test_page_number_forms():
+    for line in ("2", "- 2 -", "Page 2", "page 2 of 3", "2 / 3", "第 2 页", "第2页 共3页"):
+        assert _PAGE_NUMBER_RE.match(line), line
+    for line in ("2015", "13800138000", "2015 - 2019", "Page Rank"):
+        assert not _PAGE_NUMBER_RE.match(line), line
+
+
+def test_unpaged_text_keeps_repeated_lines():
+    text = drop_boilerplate("Acme Corp\nSRE\nAcme Corp\nSRE\nAcme Corp\nSRE")
+    assert text.count("Acme Corp") == 3
+
+
+def test_repeated_section_heading_is_kept():
+    text = drop_boilerplate("Experience\na\nExperience\nb\nExperience\nc")
+    assert text.count("Experience") == 3
+
+
+def test_split_sections_english_and_chinese():
+    text = "Jane Doe\njane@x.com\nWork Experience\nLed migration\n专业技能\nKubernetes\nEducation:\nBSc"
+    assert [name for name, _ in split_sections(text)] == ["header", "experience", "skills", "education"]
+
+
+def test_short_resume_is_only_cleaned():
+    assert compact_resume("Jane  Doe\n\n\n\nExperience\nSRE") == "Jane Doe\n\nExperience\nSRE"
+
+
+def test_long_resume_trims_low_priority_sections_first():
+    text = ("Jane Doe\nExperience\n" + "Led Kubernetes platform migration for a bank. " * 150
+            + "\nSkills\nKubernetes, Go, Terraform\nEducation\n" + "Coursework in many subjects. " * 300)
+    compact = compact_resume(text, token_budget=2000)
+    assert count_tokens(compact) <= 2000
+    assert "Kubernetes, Go, Terraform" in compact
+    # Experience is untouched; education absorbed the cut
+    assert compact.count("Led Kubernetes platform migration") == 150
+    assert compact.count("Coursework") < 300
+
+
+def test_truncate_to_tokens_respects_budget():
+    text = "\n".join(f"line {i} with several words" for i in range(200))
+    cut = truncate_to_tokens(text, 50)
+    assert count_tokens(cut) <= 50
+    assert text.startswith(cut)
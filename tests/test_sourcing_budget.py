@@ -0,0 +1,85 @@
+"""Tests for sourcing_budget — run spend estimates and limits."""
+
+from sourcing_budget import (
+    COMPLETION_TOKENS_PER_RESUME, PROMPT_OVERHEAD_TOKENS, RunBudget, estimate_request, run_limits_from_env,
+)
+
+
+def test_estimate_scales_with_resume_length_and_count():
+    prompt, completion = estimate_request("j" * 400, ["r" * 800, "r" * 800])
+    assert prompt == PROMPT_OVERHEAD_TOKENS + 500
+    assert completion == 2 * COMPLETION_TOKENS_PER_RESUME
+
+
+def test_limits_count_in_flight_requests():
+    budget = RunBudget(max_tokens=2500, input_price=1.0, output_price=5.0)
+    assert budget.allows((1000, 200))
+    budget.start((1000, 200))
+    assert budget.allows((1000, 200))
+    budget.start((1000, 200))
+    assert not budget.allows((1000, 200))
+    budget.finish((1000, 200))
+    assert budget.spend()["prompt_tokens"] == 2000
+
+
+def test_reported_usage_replaces_estimates_and_prices_cost():
+    budget = RunBudget(max_cost=0.01, max_calls=5, input_price=1.0, output_price=5.0)
+    budget.start((5000, 400))
+    budget.record_usage("fast", 3000, 300)
+    budget.finish((5000, 400))
+    spend = budget.spend()
+    assert (spend["prompt_tokens"], spend["completion_tokens"], spend["spend_estimated"]) == (3000, 300, False)
+    assert spend["cost_usd"] == 0.0045
+    assert budget.allows((3000, 300)) and not budget.allows((5000, 300))
+
+
+def test_call_limit():
+    budget = RunBudget(max_calls=1)
+    budget.start((1, 1))
+    assert not budget.allows((1, 1))
+
+
+def test_try_start_checks_and_starts_atomically():
+    budget = RunBudget(max_calls=1)
+    assert budget.try_start((1, 1))
+    assert not budget.try_start((1, 1))
+    assert budget.calls == 1
+
+
+def test_hedges_are_charged_at_the_average_request_size():
+    budget = RunBudget(max_calls=3, max_tokens=2500)
+    assert not budget.admit_hedge()  # nothing in flight to duplicate
+    budget.start((800, 100))
+    assert budget.admit_hedge()
+    assert budget.spend()["llm_calls"] == 2
+    assert budget.spend()["prompt_tokens"] == 1600
+    # A second hedge would exceed the token limit
+    assert not budget.admit_hedge()
+
+
+def test_strong_model_requests_and_usage_are_priced_at_strong_rates():
+    budget = RunBudget(max_cost=0.02, input_price=1.0, output_price=5.0, strong_model="strong",
+                       strong_input_price=3.0, strong_output_price=15.0)
+    budget.record_usage("fast", 1000, 100)
+    budget.record_usage("strong", 1000, 100)
+    assert budget.spend()["cost_usd"] == 0.0015 + 0.0045
+    # The same request fits at the fast rate but not at the strong one
+    assert budget.allows((4000, 400)) and not budget.allows((4000, 400), "strong")
+
+
+def test_hedges_are_priced_at_their_models_rate():
+    budget = RunBudget(max_cost=0.01, input_price=1.0, output_price=5.0, strong_model="strong",
+                       strong_input_price=3.0, strong_output_price=15.0)
+    budget.start((1000, 100))
+    assert budget.admit_hedge("strong")
+    assert budget.spend()["cost_usd"] == 0.0015 + 0.0045
+
+
+def test_run_limits_from_env(monkeypatch):
+    for name in ("SOURCING_MAX_DURATION", "SOURCING_MAX_CALLS", "SOURCING_MAX_TOKENS", "SOURCING_MAX_COST"):
+        monkeypatch.delenv(name, raising=False)
+    assert set(run_limits_from_env().values()) == {None}
+    monkeypatch.setenv("SOURCING_MAX_DURATION", "90")
+    monkeypatch.setenv("SOURCING_MAX_COST", "2.5")
+    limits = run_limits_from_env()
+    assert (limits["max_duration"], limits["max_cost"], limits["max_calls"]) == (5400, 2.5, None)
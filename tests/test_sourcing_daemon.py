@@ -0,0 +1,141 @@
+"""Tests for sourcing_daemon — resident scheduling and change-triggered runs."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from auto_sourcer import AutoSourcer
+from hc_manager import HCManager
+from job_queue import JobQueue
+from sourcing_daemon import SourcingDaemon, single_instance
+from tests.test_auto_sourcer import FakeAgent, FakeUploadedFile, _seed_hc
+
+T0 = datetime(2026, 3, 2, 9, 0)
+
+
+def _daemon():
+    sourcer = AutoSourcer(FakeAgent())
+    return SourcingDaemon(sourcer, settle_seconds=120), sourcer
+
+
+def _run_types(sourcer):
+    return sorted(r["run_type"] for r in sourcer.get_run_history())
+
+
+def test_first_poll_runs_scheduled_full_scan_then_idles(tmp_path):
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    daemon, sourcer = _daemon()
+    assert daemon.tick(T0) is not None
+    assert _run_types(sourcer) == ["full"]
+    assert daemon.tick(datetime.now() + timedelta(minutes=5)) is None
+
+
+def test_daemon_runs_are_bounded_by_run_limits(tmp_path, tpm):
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    tpm.import_files([FakeUploadedFile(f"cv{i}.pdf", f"resume {i}".encode()) for i in range(3)], FakeAgent())
+    sourcer = AutoSourcer(FakeAgent())
+    daemon = SourcingDaemon(sourcer, run_limits={"max_calls": 1})
+
+    run_id = daemon.tick(T0)
+
+    run = sourcer.get_run_history()[0]
+    assert (run["id"], run["status"], run["llm_calls"]) == (run_id, "partial", 1)
+
+
+def test_capped_run_is_continued_on_schedule_not_rerun_in_full(tmp_path, tpm, monkeypatch):
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    tpm.import_files([FakeUploadedFile(f"cv{i}.pdf", f"resume {i}".encode()) for i in range(3)], FakeAgent())
+    sourcer = AutoSourcer(FakeAgent())
+    daemon = SourcingDaemon(sourcer, run_limits={"max_calls": 1})
+    runs = []
+    run = sourcer.run
+    monkeypatch.setattr(sourcer, "run", lambda force_full=False, **kw: runs.append(force_full) or run(force_full, **kw))
+    now = datetime.now()
+
+    first_id = daemon.tick(now)
+    for minutes in range(1, 5):
+        assert daemon.tick(now + timedelta(minutes=minutes)) is None
+    assert daemon.due(now + timedelta(hours=25)) == ("incremental", "continue scan stopped by run limits")
+    run_id = daemon.tick(now + timedelta(hours=25))
+
+    assert runs == [True, False]
+    # The continuation skips the pair the capped full run already scored
+    first = {s["talent_id"] for s in sourcer.get_shortlist(run_id=first_id)}
+    scored = {s["talent_id"] for s in sourcer.get_shortlist(run_id=run_id)}
+    assert len(first) == len(scored) == 1 and first != scored
+
+
+def test_new_uploads_trigger_incremental_run_after_settling(tmp_path, tpm):
+    _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    daemon, sourcer = _daemon()
+    now = datetime.now()
+    daemon.tick(now)
+
+    tpm.import_files([FakeUploadedFile("new.pdf", b"new resume")], FakeAgent())
+    assert daemon.tick(now + timedelta(seconds=60)) is None  # still settling
+    run_id = daemon.tick(now + timedelta(seconds=200))
+
+    assert _run_types(sourcer) == ["full", "incremental"]
+    assert len(sourcer.get_shortlist(run_id=run_id)) == 1
+    assert daemon.tick(now + timedelta(seconds=400)) is None
+
+
+def test_newly_approved_hc_triggers_targeted_run(tmp_path, tpm):
+    hm = HCManager(db_path=str(tmp_path / "x.json"))
+    tpm.import_files([FakeUploadedFile("kubernetes_go.pdf", b"old resume")], FakeAgent())
+    daemon, sourcer = _daemon()
+    now = datetime.now()
+    daemon.tick(now)
+    hc_id = _seed_hc(hm)
+    daemon.tick(now + timedelta(seconds=1))
+    assert daemon.due(now + timedelta(seconds=130)) == ("targeted", "newly approved HC")
+
+    run_id = daemon.tick(now + timedelta(seconds=130))
+    assert [s["hc_id"] for s in sourcer.get_shortlist(run_id=run_id)] == [hc_id]
+    assert "targeted" in _run_types(sourcer)
+
+
+def test_hc_already_queued_by_web_app_is_not_rescored(tmp_path):
+    daemon, sourcer = _daemon()
+    now = datetime.now()
+    daemon.tick(now)
+    runs = len(sourcer.get_run_history())
+    hc_id = _seed_hc(HCManager(db_path=str(tmp_path / "x.json")))
+    queue = JobQueue()
+    job_id = queue.submit("auto_sourcing", {"hc_ids": [hc_id]})
+    queue.finish(job_id, "completed")
+
+    daemon.tick(now + timedelta(seconds=1))
+    assert daemon.tick(now + timedelta(seconds=130)) is None
+    assert len(sourcer.get_run_history()) == runs
+
+
+def test_defers_while_web_app_job_is_running():
+    daemon, sourcer = _daemon()
+    JobQueue().submit("auto_sourcing", {})
+    assert daemon.tick(T0) is None
+    assert sourcer.get_run_history() == []
+
+
+def test_failed_run_backs_off(monkeypatch):
+    daemon, sourcer = _daemon()
+    calls = []
+
+    def boom(force_full=False, hc_ids=None):
+        calls.append(force_full)
+        raise RuntimeError("LLM down")
+
+    monkeypatch.setattr(sourcer, "run", boom)
+    assert daemon.tick(T0) is None
+    assert daemon.tick(T0 + timedelta(minutes=1)) is None
+    assert calls == [True]
+
+
+def test_single_instance_lock(tmp_path):
+    lock = str(tmp_path / "daemon.lock")
+    with single_instance(lock):
+        with pytest.raises(RuntimeError, match="Another auto-sourcing daemon"):
+            with single_instance(lock):
+                pass
+    with single_instance(lock):
+        pass
@@ -0,0 +1,108 @@
+import os
+from unittest.mock import MagicMock, patch
+
+from openai import RateLimitError
+
+import recruitment_agent
+from recruitment_agent import RecruitmentAgent
+
+
+def _make_rate_limit_error():
+    mock_response = MagicMock()
+    mock_response.status_code = 429
+    mock_response.headers = {}
+    mock_response.json.return_value = {"error": {"message": "rate limit", "type": "rate_limit"}}
+    return RateLimitError("rate limit", response=mock_response, body=None)
+
+
+def _chunk(content=None, usage=None):
+    """Build a fake ChatCompletionChunk; the final usage chunk has no choices."""
+    chunk = MagicMock()
+    chunk.usage = usage
+    if content is None:
+        chunk.choices = []
+    else:
+        choice = MagicMock()
+        choice.delta.content = content
+        chunk.choices = [choice]
+    return chunk
+
+
+def _usage(prompt=10, completion=5):
+    usage = MagicMock()
+    usage.prompt_tokens = prompt
+    usage.completion_tokens = completion
+    usage.total_tokens = prompt + completion
+    return usage
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+def test_stream_yields_deltas_and_records_usage():
+    """Deltas are yielded in order; usage from the final chunk lands in the ledger."""
+    agent = RecruitmentAgent()
+    agent.client = MagicMock()
+    agent.client.chat.completions.create.return_value = iter([
+        _chunk("Hello"), _chunk(""), _chunk(" world"), _chunk(usage=_usage(12, 3)),
+    ])
+    before = len(recruitment_agent._llm_usage_log)
+
+    stream = agent.stream_playbook_answer("What is ACP?", "context")
+    deltas = list(stream)
+
+    assert deltas == ["Hello", " world"]
+    assert not stream.failed
+    kwargs = agent.client.chat.completions.create.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert kwargs["stream_options"] == {"include_usage": True}
+    assert len(recruitment_agent._llm_usage_log) == before + 1
+    assert recruitment_agent._llm_usage_log[-1]["total_tokens"] == 15
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+def test_stream_retries_when_opening_fails():
+    """Transient errors while opening the stream are retried like _call_llm."""
+    agent = RecruitmentAgent()
+    agent.client = MagicMock()
+    agent.client.chat.completions.create.side_effect = [
+        _make_rate_limit_error(),
+        iter([_chunk("OK")]),
+    ]
+
+    with patch("tenacity.nap.time.sleep"):
+        deltas = list(agent.stream_outreach_message("JD", "candidate"))
+
+    assert deltas == ["OK"]
+    assert agent.client.chat.completions.create.call_count == 2
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+def test_stream_error_midway_keeps_partial_output():
+    """A stream that breaks after some output keeps it and appends the error line."""
+    def broken_stream():
+        yield _chunk("Partial")
+        raise ConnectionError("reset")
+
+    agent = RecruitmentAgent()
+    agent.client = MagicMock()
+    agent.client.chat.completions.create.return_value = broken_stream()
+
+    stream = agent.stream_interview_scorecard("JD")
+    text = "".join(stream)
+
+    assert text.startswith("Partial")
+    assert "❌ Generation failed" in text and "reset" in text
+    assert stream.failed
+
+
+def test_stream_without_client_yields_warning():
+    """With no API key the stream yields the same warning as the blocking call."""
+    agent = RecruitmentAgent.__new__(RecruitmentAgent)
+    agent.client = None
+    agent.model = agent.strong_model = "test"
+    agent.system_prompt = ""
+
+    stream = agent.stream_jd_and_xray("Dev", "SG", "Build", "Python", "None", "Great")
+    deltas = list(stream)
+
+    assert len(deltas) == 1 and stream.failed
+    assert deltas[0] == agent.generate_jd_and_xray("Dev", "SG", "Build", "Python", "None", "Great")
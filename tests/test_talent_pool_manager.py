@@ -123,3 +123,40 @@ def test_get_all_talents_since_date(tpm, agent):
     # Past date should return all
     talents = tpm.get_all_talents(since_date="2000-01-01")
     assert len(talents) == 1
+
+
+def test_import_stores_compact_text():
+    """Imported resumes carry a preprocessed compact_text alongside parsed_text."""
+    from talent_pool_manager import TalentPoolManager
+
+    class _Agent:
+        def extract_text_from_file(self, name, data):
+            return "Jane   Doe\n\n\n\nPage 1 of 2\nExperience\nSRE"
+
+        def extract_candidate_info(self, text):
+            return {}
+
+    class _File:
+        name = "cv.txt"
+
+        def read(self):
+            return b"cv"
+
+    tpm = TalentPoolManager()
+    tpm.import_files([_File()], _Agent())
+    talent = tpm.get_all()[0]
+    assert talent["parsed_text"].startswith("Jane   Doe")
+    assert talent["compact_text"] == "Jane Doe\n\nExperience\nSRE"
+
+
+def test_backfill_compact_text():
+    from db import get_db
+    from talent_pool_manager import TalentPoolManager
+
+    conn = get_db()
+    conn.execute("INSERT INTO talent_pool (id, file_hash, parsed_text) VALUES ('tp_old', 'h', 'A   B')")
+    conn.commit()
+    tpm = TalentPoolManager()
+    assert tpm.backfill_compact_text() == 1
+    assert tpm.get_talent("tp_old")["compact_text"] == "A B"
+    assert tpm.backfill_compact_text() == 0
@@ -11,14 +11,15 @@ load_dotenv(override=True)
 
 # Streamlit Cloud 部署时通过 Secrets 注入 LLM 凭据（优先级高于 .env）
 try:
-    for key in ["OPENAI_API_KEY", "OPENAI_API_BASE", "LLM_MODEL", "STRONG_MODEL", "EMBEDDING_API_KEY", "EMBEDDING_API_BASE"]:
+    for key in ["OPENAI_API_KEY", "OPENAI_API_BASE", "LLM_MODEL", "STRONG_MODEL", "EMBEDDING_API_KEY", "EMBEDDING_API_BASE",
+                "EMBEDDING_BACKEND", "LOCAL_EMBEDDING_MODEL", "PROMPT_CACHE"]:
         val = st.secrets.get(key, "")
         if val:
             os.environ[key] = val
 except Exception:
     logger.debug("No secrets.toml found — using .env for local development")
 
-from app_shared import bi, check_password, get_agent, inject_css, _llm_cache_key  # noqa: E402
+from app_shared import bi, check_password, get_agent, get_job_worker, inject_css, _llm_cache_key  # noqa: E402
 
 # 1. 页面级基础设置
 st.set_page_config(
@@ -35,8 +36,9 @@ inject_css()
 if not check_password():
     st.stop()
 
-# 4. 预热 Agent 缓存
+# 4. 预热 Agent 缓存，启动后台任务线程
 get_agent(_key=_llm_cache_key())
+get_job_worker()
 
 # 5. 侧边栏 Logo
 with st.sidebar: